@@ -0,0 +1,148 @@
+"""
+Shared outbound HTTP client for backend services.
+
+One pooled HTTP/2 client is reused for Arlington, Google Places and Mapbox
+calls so TLS sessions and TCP connections survive across requests. Claude
+calls share a single AsyncAnthropic client on a pool of its own.
+"""
+import asyncio
+import os
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    import anthropic
+
+# SDK retries per Claude call (the SDK default is also 2, made explicit here);
+# per-call deadlines are passed as `timeout=` or via with_options()
+ANTHROPIC_MAX_RETRIES = 2
+ANTHROPIC_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+# Claude requests allowed in flight at once across the process (see llm_slot)
+MAX_INFLIGHT_LLM = int(os.getenv("MAX_INFLIGHT_LLM", "8"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+_anthropic_client: Optional["anthropic.AsyncAnthropic"] = None
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+
+
+class AsyncByteReader:
+    """
+    Minimal async file-like wrapper over an async byte iterator (for ijson)
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes the reader with read(0) and discards the result, so
+        # that must not consume anything
+        if size == 0:
+            return b""
+        # b"" signals end of stream, so empty chunks from the source are
+        # skipped rather than passed on
+        data = self._pending
+        if not data:
+            async for chunk in self._chunks:
+                if chunk:
+                    data = chunk
+                    break
+        # Shorter reads are fine for ijson; bytes past `size` wait for the next
+        if 0 < size < len(data):
+            data, self._pending = data[:size], data[size:]
+        else:
+            self._pending = b""
+        return data
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the shared httpx.AsyncClient singleton.
+
+    Callers that need a tighter deadline than the 30s default should pass
+    `timeout=` on the individual request.
+
+    Returns:
+        httpx.AsyncClient: Pooled client with HTTP/2 enabled
+    """
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+
+    return _http_client
+
+
+def get_anthropic_client() -> "anthropic.AsyncAnthropic":
+    """
+    Get or create the shared Anthropic client singleton.
+
+    The SDK is imported here rather than at module level, so processes that
+    only use the plain HTTP client never load it.
+
+    Returns:
+        anthropic.AsyncAnthropic: Client with bounded retries over a pooled
+        HTTP/2 connection
+
+    Raises:
+        ValueError: If ANTHROPIC_API_KEY is not set
+    """
+    global _anthropic_client
+
+    if _anthropic_client is None or _anthropic_client.is_closed():
+        import anthropic
+
+        api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
+        _anthropic_client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            max_retries=ANTHROPIC_MAX_RETRIES,
+            timeout=ANTHROPIC_TIMEOUT,
+            http_client=httpx.AsyncClient(
+                http2=True,
+                timeout=ANTHROPIC_TIMEOUT,
+                limits=httpx.Limits(max_connections=40, max_keepalive_connections=20),
+            ),
+        )
+
+    return _anthropic_client
+
+
+def llm_slot() -> asyncio.Semaphore:
+    """
+    Process-wide semaphore that every Claude call runs inside
+
+    Bursts (e.g. many uploads, or audience matching for every zone) queue here
+    instead of all reaching the API at once and tripping its rate limits; the
+    SDK's own retries (which back off on 429s) happen while the slot is held.
+
+    Returns:
+        asyncio.Semaphore: MAX_INFLIGHT_LLM slots, use as `async with llm_slot():`
+    """
+    global _llm_semaphore
+
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(MAX_INFLIGHT_LLM)
+
+    return _llm_semaphore
+
+
+async def close_http_client() -> None:
+    """
+    Close the shared clients (called on application shutdown).
+    """
+    global _http_client, _anthropic_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+    if _anthropic_client is not None:
+        await _anthropic_client.close()
+        _anthropic_client = None
@@ -0,0 +1,40 @@
+"""
+JSON extraction for free-text Claude replies.
+
+Prompts ask for bare JSON, but replies sometimes arrive wrapped in markdown
+code fences or with a sentence before/after. These helpers decode the first
+complete value in one pass instead of slicing between the outermost braces.
+"""
+import json
+import re
+from typing import Any
+
+_CODE_FENCE_RE = re.compile(r"```(?:json)?")
+_DECODER = json.JSONDecoder()
+
+
+def first_json_value(text: str, opener: str = "{") -> Any:
+    """
+    Decode the first complete JSON value that starts with `opener`.
+
+    Code fences are dropped first; anything after the value (including more
+    braces) is ignored.
+
+    Args:
+        text: Claude response text
+        opener: "{" for an object, "[" for an array
+
+    Returns:
+        The decoded value
+
+    Raises:
+        ValueError: If no decodable value starting with `opener` is found
+    """
+    text = _CODE_FENCE_RE.sub("", text)
+    start = text.find(opener)
+    while start >= 0:
+        try:
+            return _DECODER.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            start = text.find(opener, start + 1)
+    raise ValueError("No JSON found in response")
@@ -8,13 +8,21 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import os
+import logging
 from dotenv import load_dotenv
 from app.routes import webhooks, saved_recommendations, flyer_uploads, recommendations_cache, analyze, geocoding, recommendations, data_ingestion, zones
 from app.middleware import RateLimitMiddleware
+from app.http_client import close_http_client
+from app.services.usage_tracker import usage_tracker
+from app.services.zones import zones_service
 
 # Load environment variables
 load_dotenv()
 
+# Configure logging once for the app (service modules only create loggers)
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="OpenPlaces API",
@@ -62,6 +70,28 @@ app.include_router(recommendations.router)
 app.include_router(data_ingestion.router)
 
 
+@app.on_event("startup")
+async def preload_static_zones():
+    """Parse zones.geojson before the first request instead of during it"""
+    try:
+        await zones_service.load_static_zones_async()
+    except FileNotFoundError as e:
+        # Zone routes report the missing file per request, as before
+        logger.error(f"Static zones not preloaded: {e}")
+
+
+@app.on_event("shutdown")
+async def flush_usage_logs():
+    """Write usage events still queued for the background writer"""
+    await usage_tracker.flush()
+
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    """Close the shared outbound HTTP client's connection pool"""
+    await close_http_client()
+
+
 @app.get("/")
 async def root():
     """Root endpoint - API information"""
@@ -6,9 +6,10 @@ UPDATED: Added abuse prevention (rate limiting, content moderation, usage tracki
 
 import logging
 from fastapi import APIRouter, File, UploadFile, HTTPException, Header
-from fastapi.responses import JSONResponse
-from typing import Optional
-from app.services.vision import analyze_flyer, VisionAnalysisError
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, AsyncIterator, Dict, Optional
+import orjson
+from app.services.vision import analyze_flyer, stream_flyer_fields, VisionAnalysisError
 from app.services.content_moderator import content_moderator
 from app.services.usage_tracker import usage_tracker, USAGE_LIMITS
 
@@ -17,6 +18,106 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["analyze"])
 
 
+async def _checked_upload(file: UploadFile, x_clerk_user_id: Optional[str]) -> bytes:
+    """
+    Run the auth, usage-limit, file and moderation checks for an analyze request
+
+    Returns:
+        The uploaded file bytes
+
+    Raises:
+        HTTPException: 401/429/400 when a check fails
+    """
+    # 🔒 ABUSE PREVENTION 1: Require authentication for expensive AI operations
+    if not x_clerk_user_id:
+        raise HTTPException(
+            status_code=401,
+            detail="Authentication required. Please sign in to analyze flyers."
+        )
+
+    # 🔒 ABUSE PREVENTION 2: Check daily usage limit
+    under_limit, usage_count = await usage_tracker.check_daily_limit(
+        x_clerk_user_id,
+        "analyze",
+        USAGE_LIMITS["analyze"]
+    )
+
+    if not under_limit:
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "error": "Daily limit exceeded",
+                "message": f"You've reached your daily limit of {USAGE_LIMITS['analyze']} AI analyses. "
+                           f"Please try again tomorrow or upgrade to a paid plan.",
+                "usage": usage_count,
+                "limit": USAGE_LIMITS["analyze"]
+            }
+        )
+
+    # Validate file type
+    allowed_types = ["image/jpeg", "image/png", "application/pdf"]
+    if file.content_type not in allowed_types:
+        logger.warning(f"Invalid file type uploaded: {file.content_type}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not supported. Please upload JPG, PNG, or PDF.",
+        )
+
+    # Validate file size (max 10MB, matching Story 3.1)
+    file_content = await file.read()
+    max_size = 10 * 1024 * 1024  # 10MB
+    if len(file_content) > max_size:
+        logger.warning(f"File too large: {len(file_content)} bytes")
+        raise HTTPException(
+            status_code=400,
+            detail="File is too large. Maximum size is 10MB. Please compress your image.",
+        )
+
+    # 🔒 ABUSE PREVENTION 3: Content moderation (check for inappropriate images)
+    is_safe, moderation_result = await content_moderator.moderate_image(file_content)
+
+    if not is_safe:
+        logger.warning(
+            f"Inappropriate content detected for user {x_clerk_user_id}: "
+            f"{moderation_result.get('reason', 'No reason provided')}"
+        )
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Content policy violation",
+                "message": "This image contains inappropriate content and cannot be processed.",
+                "reason": moderation_result.get("reason", "Content flagged by moderation system"),
+                "categories": moderation_result.get("flagged_categories", [])
+            }
+        )
+
+    logger.info(
+        f"Processing flyer upload: {file.filename} ({file.content_type}, {len(file_content)} bytes) "
+        f"for user {x_clerk_user_id}"
+    )
+
+    return file_content
+
+
+async def _log_analyze_usage(
+    user_id: str, file_content: bytes, file_type: str, result: Dict[str, Any]
+) -> None:
+    """
+    Record a completed analysis for usage limits and cost monitoring
+    """
+    # Estimate API cost (GPT-4 Vision ~$0.01 per request)
+    await usage_tracker.log_usage(
+        user_id=user_id,
+        operation_type="analyze",
+        cost_estimate=0.01,
+        metadata={
+            "file_size_bytes": len(file_content),
+            "file_type": file_type,
+            "confidence": result.get("confidence", "unknown")
+        }
+    )
+
+
 @router.post("/analyze")
 async def analyze_flyer_endpoint(
     file: UploadFile = File(...),
@@ -57,91 +158,13 @@ async def analyze_flyer_endpoint(
         504: Timeout (>45 seconds)
     """
     try:
-        # 🔒 ABUSE PREVENTION 1: Require authentication for expensive AI operations
-        if not x_clerk_user_id:
-            raise HTTPException(
-                status_code=401,
-                detail="Authentication required. Please sign in to analyze flyers."
-            )
-
-        # 🔒 ABUSE PREVENTION 2: Check daily usage limit
-        under_limit, usage_count = await usage_tracker.check_daily_limit(
-            x_clerk_user_id,
-            "analyze",
-            USAGE_LIMITS["analyze"]
-        )
-
-        if not under_limit:
-            raise HTTPException(
-                status_code=429,
-                detail={
-                    "error": "Daily limit exceeded",
-                    "message": f"You've reached your daily limit of {USAGE_LIMITS['analyze']} AI analyses. "
-                               f"Please try again tomorrow or upgrade to a paid plan.",
-                    "usage": usage_count,
-                    "limit": USAGE_LIMITS["analyze"]
-                }
-            )
-
-        # Validate file type
-        allowed_types = ["image/jpeg", "image/png", "application/pdf"]
-        if file.content_type not in allowed_types:
-            logger.warning(f"Invalid file type uploaded: {file.content_type}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"File type not supported. Please upload JPG, PNG, or PDF.",
-            )
-
-        # Validate file size (max 10MB, matching Story 3.1)
-        file_content = await file.read()
-        max_size = 10 * 1024 * 1024  # 10MB
-        if len(file_content) > max_size:
-            logger.warning(f"File too large: {len(file_content)} bytes")
-            raise HTTPException(
-                status_code=400,
-                detail="File is too large. Maximum size is 10MB. Please compress your image.",
-            )
-
-        # 🔒 ABUSE PREVENTION 3: Content moderation (check for inappropriate images)
-        is_safe, moderation_result = await content_moderator.moderate_image(file_content)
-
-        if not is_safe:
-            logger.warning(
-                f"Inappropriate content detected for user {x_clerk_user_id}: "
-                f"{moderation_result.get('reason', 'No reason provided')}"
-            )
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "error": "Content policy violation",
-                    "message": "This image contains inappropriate content and cannot be processed.",
-                    "reason": moderation_result.get("reason", "Content flagged by moderation system"),
-                    "categories": moderation_result.get("flagged_categories", [])
-                }
-            )
-
-        logger.info(
-            f"Processing flyer upload: {file.filename} ({file.content_type}, {len(file_content)} bytes) "
-            f"for user {x_clerk_user_id}"
-        )
+        file_content = await _checked_upload(file, x_clerk_user_id)
 
         # Story 3.2 AC: Call OpenAI Vision API (with 45-second timeout)
-        result = await analyze_flyer(
-            file_content=file_content, file_type=file.content_type, timeout=45.0
-        )
+        result = await analyze_flyer(file_content=file_content, file_type=file.content_type)
 
         # 🔒 ABUSE PREVENTION 4: Log usage for tracking and cost monitoring
-        # Estimate API cost (GPT-4 Vision ~$0.01 per request)
-        await usage_tracker.log_usage(
-            user_id=x_clerk_user_id,
-            operation_type="analyze",
-            cost_estimate=0.01,
-            metadata={
-                "file_size_bytes": len(file_content),
-                "file_type": file.content_type,
-                "confidence": result.get("confidence", "unknown")
-            }
-        )
+        await _log_analyze_usage(x_clerk_user_id, file_content, file.content_type, result)
 
         # Story 3.2 AC: Returns JSON
         return {"success": True, "data": result}
@@ -162,3 +185,65 @@ async def analyze_flyer_endpoint(
             status_code=500,
             detail="AI extraction unavailable. Please enter event details manually.",
         )
+
+
+def _sse(event: str, data: Any) -> bytes:
+    """
+    One Server-Sent Events message
+    """
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def _analysis_events(
+    file_content: bytes, file_type: str, user_id: str
+) -> AsyncIterator[bytes]:
+    """
+    SSE stream for /api/analyze/stream: a "field" event per extracted field,
+    then "complete" with the full result, or "error" with a fallback message
+    """
+    try:
+        async for item in stream_flyer_fields(file_content, file_type):
+            if "result" in item:
+                await _log_analyze_usage(user_id, file_content, file_type, item["result"])
+                yield _sse("complete", {"success": True, "data": item["result"]})
+            else:
+                yield _sse("field", item)
+    except VisionAnalysisError as e:
+        # Story 3.2 AC: Errors logged with fallback message (headers are
+        # already sent, so the failure is reported in-stream)
+        logger.error(f"Vision analysis error: {str(e)}")
+        yield _sse("error", {"success": False, "detail": str(e)})
+    except Exception as e:
+        logger.error(f"Unexpected error in /api/analyze/stream: {str(e)}")
+        yield _sse("error", {
+            "success": False,
+            "detail": "AI extraction unavailable. Please enter event details manually.",
+        })
+
+
+@router.post("/analyze/stream")
+async def analyze_flyer_stream_endpoint(
+    file: UploadFile = File(...),
+    x_clerk_user_id: Optional[str] = Header(None, alias="x-clerk-user-id")
+):
+    """
+    Analyze an uploaded flyer, streaming each field as Claude generates it
+
+    Same checks and result as /api/analyze, delivered as Server-Sent Events
+    so the UI can show the event name before the rest is extracted:
+
+        event: field
+        data: {"field": "event_name", "value": "..."}
+
+        event: complete
+        data: {"success": true, "data": {...}}
+
+    Failures before the stream starts return the same HTTP errors as
+    /api/analyze; later failures arrive as an "error" event.
+    """
+    file_content = await _checked_upload(file, x_clerk_user_id)
+    return StreamingResponse(
+        _analysis_events(file_content, file.content_type, x_clerk_user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
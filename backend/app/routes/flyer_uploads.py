@@ -6,9 +6,10 @@ Updated for TEXT user_id (Clerk IDs directly)
 from fastapi import APIRouter, HTTPException, Header, UploadFile, File
 from typing import Optional
 from datetime import datetime, timedelta
+import asyncio
 import logging
 import uuid
-from app.supabase_client import get_supabase_client
+from app.supabase_client import get_supabase_client, execute_async
 from app.services.vision import analyze_flyer
 
 logger = logging.getLogger(__name__)
@@ -18,6 +19,34 @@ ALLOWED_MIME_TYPES = ["image/jpeg", "image/png", "image/jpg", "application/pdf"]
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
 
+async def _extract_event_data(file_content: bytes, content_type: str) -> dict:
+    """
+    Extract event details from a flyer (Claude vision), normalized for the
+    flyer_uploads record - falls back to an untitled event if extraction fails
+    """
+    try:
+        event_data = await analyze_flyer(file_content, content_type)
+        # Normalize field names for consistency
+        return {
+            "name": event_data.get("event_name", "Untitled Event"),
+            "date": event_data.get("event_date", ""),
+            "time": event_data.get("event_time", ""),
+            "venue": event_data.get("venue", ""),
+            "target_audience": event_data.get("target_audience", []),
+            "event_type": event_data.get("event_type", "community event")
+        }
+    except Exception as e:
+        logger.warning(f"Event extraction failed: {e}")
+        return {
+            "name": "Untitled Event",
+            "date": "",
+            "time": "",
+            "venue": "",
+            "target_audience": [],
+            "event_type": "community event"
+        }
+
+
 @router.post("/upload")
 async def upload_flyer(
     file: UploadFile = File(...),
@@ -55,44 +84,27 @@ async def upload_flyer(
         unique_filename = f"{uuid.uuid4()}.{file_extension}"
         storage_path = f"{x_clerk_user_id}/{unique_filename}"
 
-        # Story 2.10 AC: Upload to Supabase Storage bucket 'flyers'
-        storage_result = supabase.storage.from_("flyers").upload(
-            storage_path,
-            file_content,
-            file_options={"content-type": file.content_type}
+        # Story 2.10 AC: Upload to Supabase Storage bucket 'flyers'.
+        # The storage client is synchronous, so the upload runs in a worker
+        # thread - concurrently with event extraction, which doesn't need it
+        storage_result, event_data = await asyncio.gather(
+            asyncio.to_thread(
+                supabase.storage.from_("flyers").upload,
+                storage_path,
+                file_content,
+                file_options={"content-type": file.content_type}
+            ),
+            _extract_event_data(file_content, file.content_type),
         )
 
         if hasattr(storage_result, 'error') and storage_result.error:
             logger.error(f"Storage upload error: {storage_result.error}")
             raise HTTPException(status_code=500, detail="Failed to upload file to storage")
 
-        # Extract event details using Google Vision OCR + GPT-4
-        try:
-            event_data = await analyze_flyer(file_content, file.content_type)
-            # Normalize field names for consistency
-            event_data = {
-                "name": event_data.get("event_name", "Untitled Event"),
-                "date": event_data.get("event_date", ""),
-                "time": event_data.get("event_time", ""),
-                "venue": event_data.get("venue", ""),
-                "target_audience": event_data.get("target_audience", []),
-                "event_type": event_data.get("event_type", "community event")
-            }
-        except Exception as e:
-            logger.warning(f"Event extraction failed: {e}")
-            event_data = {
-                "name": "Untitled Event",
-                "date": "",
-                "time": "",
-                "venue": "",
-                "target_audience": [],
-                "event_type": "community event"
-            }
-
         # Story 2.10 AC: Create record in flyer_uploads table with 7-day expiration
         expires_at = datetime.utcnow() + timedelta(days=7)
 
-        upload_record = supabase.table("flyer_uploads").insert({
+        upload_record = await execute_async(supabase.table("flyer_uploads").insert({
             "user_id": x_clerk_user_id,  # TEXT field with Clerk ID directly
             "storage_path": storage_path,
             "file_name": file.filename,
@@ -100,7 +112,7 @@ async def upload_flyer(
             "mime_type": file.content_type,
             "event_data": event_data,
             "expires_at": expires_at.isoformat()
-        }).execute()
+        }))
 
         if not upload_record.data:
             raise HTTPException(status_code=500, detail="Failed to create flyer record")
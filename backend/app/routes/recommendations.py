@@ -4,7 +4,7 @@ Provides endpoints for zone scoring and recommendations
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel
 import logging
 import asyncio
@@ -16,6 +16,7 @@ from app.services.recommendations import (
     DataSource,
 )
 from app.services.analytics import analytics_service
+from app.services.zones import Zone
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -150,6 +151,19 @@ def _format_timing_windows(timing_windows_dict: Dict[str, Any]) -> List[TimingWi
     return formatted
 
 
+# zone id -> (timing_windows dict it was formatted from, formatted windows)
+_timing_windows_cache: Dict[str, Tuple[Dict[str, Any], List[TimingWindowResponse]]] = {}
+
+
+def _zone_timing_windows(zone: Zone) -> List[TimingWindowResponse]:
+    """_format_timing_windows(zone.timing_windows), formatted once per zone"""
+    cached = _timing_windows_cache.get(zone.id)
+    if cached is None or cached[0] is not zone.timing_windows:
+        cached = (zone.timing_windows, _format_timing_windows(zone.timing_windows))
+        _timing_windows_cache[zone.id] = cached
+    return cached[1]
+
+
 async def _zone_score_to_response(zone_score: ZoneScore) -> ZoneRecommendationResponse:
     """Convert internal ZoneScore to frontend-compatible response"""
     zone = zone_score.zone
@@ -180,9 +194,10 @@ async def _zone_score_to_response(zone_score: ZoneScore) -> ZoneRecommendationRe
     if not venue_types:
         venue_types = ["default"]
 
+    zone_lat, zone_lon = zone.coord_tuple
     analytics_data = await analytics_service.generate_zone_analytics(
-        zone.coordinates["lat"],
-        zone.coordinates["lon"],
+        zone_lat,
+        zone_lon,
         venue_types
     )
 
@@ -203,14 +218,14 @@ async def _zone_score_to_response(zone_score: ZoneScore) -> ZoneRecommendationRe
         distance_score=zone_score.distance_score,
         dwell_time_score=zone_score.dwell_time_score,
         distance_miles=zone_score.distance_miles,
-        timing_windows=_format_timing_windows(zone.timing_windows),
+        timing_windows=_zone_timing_windows(zone),
         dwell_time_seconds=zone.dwell_time_seconds,
         cost_tier=zone.cost_tier,
         reasoning=zone_score.reasoning,
         matched_signals=[],  # TODO: Calculate from audience match
         data_sources=data_sources_response,
-        latitude=zone.coordinates["lat"],
-        longitude=zone.coordinates["lon"],
+        latitude=zone_lat,
+        longitude=zone_lon,
         analytics=analytics,
     )
 
@@ -281,11 +296,8 @@ async def get_top_recommendations(
             f"Getting top {limit} recommendations for event: {event_data.name}"
         )
 
-        # Score all zones using Claude Opus 4.6 for semantic matching
-        scored_zones = await recommendations_service.score_zones(event_data)
-
-        # Return top N
-        top_zones = scored_zones[:limit]
+        # Score all zones using Claude Opus 4.6; only the top N are materialized
+        top_zones = await recommendations_service.score_zones(event_data, limit=limit)
 
         logger.info(f"Returning top {len(top_zones)} recommendations")
 
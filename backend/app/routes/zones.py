@@ -4,28 +4,67 @@ Endpoints for fetching placement zone data
 Enhanced with dynamic zone management from Google Places + Arlington Parking
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Dict, Any, Optional
+import asyncio
 import logging
+import orjson
+from pydantic import BaseModel
 from app.services.zones import zones_service, Zone
+from app.supabase_client import get_supabase_client, execute_async
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["zones"])
 
+# Clients may keep a copy but must revalidate it on every use: zones change
+# whenever /zones/refresh or /zones/clear runs, not on a fixed schedule
+ZONES_CACHE_CONTROL = "public, no-cache"
+
+
+def _apply_cache_headers(
+    response: Response, etag: str, if_none_match: Optional[str]
+) -> Optional[Response]:
+    """
+    Set ETag/Cache-Control headers, or return a 304 if the client copy is current
+
+    Repeat GETs revalidate with If-None-Match, so an unchanged copy costs a
+    304 with no body, while a refresh or clear is visible immediately.
+    """
+    if if_none_match:
+        client_etags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in client_etags or "*" in client_etags:
+            return Response(
+                status_code=304,
+                headers={"ETag": etag, "Cache-Control": ZONES_CACHE_CONTROL},
+            )
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ZONES_CACHE_CONTROL
+    return None
+
 
 @router.get("/zones")
-async def get_zones() -> List[Zone]:
+async def get_zones(
+    response: Response,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+) -> List[Zone]:
     """
     Get all placement zones (dynamic or static)
 
     Returns:
         List of Zone objects with all properties
+        (304 Not Modified if If-None-Match matches the current ETag)
 
     Example:
         GET /api/zones
     """
     try:
         zones = await zones_service.get_all_zones()
+        etag = zones_service.current_etag("zones", zones)
+        not_modified = _apply_cache_headers(response, etag, if_none_match)
+        if not_modified is not None:
+            return not_modified
         return zones
     except FileNotFoundError as e:
         raise HTTPException(status_code=500, detail=f"Zones data not found: {str(e)}")
@@ -34,20 +73,118 @@ async def get_zones() -> List[Zone]:
 
 
 @router.get("/zones/geojson")
-async def get_zones_geojson() -> Dict[str, Any]:
+async def get_zones_geojson(
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+):
     """
     Get zones as GeoJSON FeatureCollection
-    (Optimized for map visualization)
+    (Optimized for map visualization - body is serialized once per load, not per request)
 
     Returns:
         GeoJSON FeatureCollection with all zone features
+        (304 Not Modified if If-None-Match matches the current ETag)
 
     Example:
         GET /api/zones/geojson
     """
     try:
-        geojson = zones_service.get_zones_geojson()
-        return geojson
+        geojson = await zones_service.get_zones_geojson_async()
+        etag = zones_service.current_etag("geojson", geojson)
+        response = Response(
+            content=zones_service.get_zones_geojson_bytes(), media_type="application/json"
+        )
+        not_modified = _apply_cache_headers(response, etag, if_none_match)
+        if not_modified is not None:
+            return not_modified
+        return response
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=f"Zones data not found: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load zones: {str(e)}")
+
+
+# Yield control back to the event loop every N features while streaming
+GEOJSON_STREAM_YIELD_EVERY = 50
+
+
+async def _iter_geojson_features(geojson: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """
+    Serialize a FeatureCollection one feature at a time
+    """
+    yield b'{"type":"FeatureCollection","features":['
+    for index, feature in enumerate(geojson.get("features", [])):
+        if index:
+            yield b"," + orjson.dumps(feature)
+        else:
+            yield orjson.dumps(feature)
+        if index % GEOJSON_STREAM_YIELD_EVERY == GEOJSON_STREAM_YIELD_EVERY - 1:
+            await asyncio.sleep(0)
+    yield b"]}"
+
+
+@router.get("/zones/geojson/stream")
+async def stream_zones_geojson(
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+):
+    """
+    Stream zones as a GeoJSON FeatureCollection, one feature per chunk
+    (For large zone sets - first bytes go out before the whole payload is serialized)
+
+    Returns:
+        Chunked GeoJSON FeatureCollection (same document as /zones/geojson)
+
+    Example:
+        GET /api/zones/geojson/stream
+    """
+    try:
+        geojson = await zones_service.get_zones_geojson_async()
+        etag = zones_service.current_etag("geojson", geojson)
+        response = StreamingResponse(
+            _iter_geojson_features(geojson), media_type="application/json"
+        )
+        not_modified = _apply_cache_headers(response, etag, if_none_match)
+        if not_modified is not None:
+            return not_modified
+        return response
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=f"Zones data not found: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load zones: {str(e)}")
+
+
+class NearbyZone(BaseModel):
+    """A zone with its distance from the query point"""
+    zone: Zone
+    distance_miles: float
+
+
+@router.get("/zones/near")
+async def get_zones_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=100),
+    radius_miles: Optional[float] = Query(None, gt=0),
+) -> List[NearbyZone]:
+    """
+    Get the zones nearest a point (e.g. an event venue), nearest first
+
+    Args:
+        lat, lon: Query point
+        k: Maximum number of zones to return
+        radius_miles: Only include zones within this distance
+
+    Example:
+        GET /api/zones/near?lat=38.8816&lon=-77.0910&k=5&radius_miles=2
+    """
+    try:
+        zones = await zones_service.get_all_zones()
+        if radius_miles is not None:
+            nearby = zones_service.get_zones_within_radius(zones, lat, lon, radius_miles)[:k]
+        else:
+            nearby = zones_service.get_zones_near(zones, lat, lon, k)
+        return [
+            NearbyZone(zone=zone, distance_miles=round(distance, 2)) for zone, distance in nearby
+        ]
     except FileNotFoundError as e:
         raise HTTPException(status_code=500, detail=f"Zones data not found: {str(e)}")
     except Exception as e:
@@ -55,7 +192,11 @@ async def get_zones_geojson() -> Dict[str, Any]:
 
 
 @router.get("/zones/{zone_id}")
-async def get_zone(zone_id: str) -> Zone:
+async def get_zone(
+    zone_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+) -> Zone:
     """
     Get a single zone by ID
 
@@ -75,6 +216,10 @@ async def get_zone(zone_id: str) -> Zone:
         zone = zones_service.get_zone_by_id(zone_id)
         if zone is None:
             raise HTTPException(status_code=404, detail=f"Zone not found: {zone_id}")
+        etag = zones_service.current_etag(f"zone:{zone_id}", zone)
+        not_modified = _apply_cache_headers(response, etag, if_none_match)
+        if not_modified is not None:
+            return not_modified
         return zone
     except HTTPException:
         raise
@@ -83,7 +228,10 @@ async def get_zone(zone_id: str) -> Zone:
 
 
 @router.get("/zones-count")
-async def get_zones_count() -> Dict[str, int]:
+async def get_zones_count(
+    response: Response,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+) -> Dict[str, int]:
     """
     Get total number of zones
 
@@ -96,6 +244,10 @@ async def get_zones_count() -> Dict[str, int]:
     """
     try:
         zones = await zones_service.get_all_zones()
+        etag = zones_service.current_etag("zones", zones)
+        not_modified = _apply_cache_headers(response, etag, if_none_match)
+        if not_modified is not None:
+            return not_modified
         return {"count": len(zones)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get zones count: {str(e)}")
@@ -216,18 +368,16 @@ async def clear_zones():
     - Or use POST /api/zones/import-static to re-import from file
     """
     try:
-        from app.supabase_client import get_supabase_client
         supabase = get_supabase_client()
 
-        # Count zones before deletion
-        count_before = supabase.table("zones").select("id", count="exact").execute()
-        zone_count = len(count_before.data) if count_before.data else 0
-
-        # Delete all zones
-        supabase.table("zones").delete().neq("id", "").execute()
+        # Delete all zones (off the event loop), counting rows in the same round-trip
+        result = await execute_async(
+            supabase.table("zones").delete(count="exact").neq("id", "")
+        )
+        zone_count = result.count if result.count is not None else len(result.data or [])
 
         # Clear memory cache
-        zones_service._dynamic_zones = None
+        zones_service._set_dynamic_zones(None)
         zones_service._last_refresh = None
 
         logger.info(f"Cleared {zone_count} zones from database")
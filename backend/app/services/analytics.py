@@ -6,13 +6,102 @@ Arlington parking data, and venue type patterns.
 
 import logging
 from typing import Dict, List, Any, Optional
-import httpx
 import os
 from datetime import datetime
 
+from app.http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
+# Base traffic patterns by venue type (multiplier per period of day)
+HOURLY_TRAFFIC_PATTERNS = {
+    "restaurant": {
+        "morning": 0.3, "lunch": 1.0, "afternoon": 0.4,
+        "evening": 0.9, "night": 0.2
+    },
+    "cafe": {
+        "morning": 0.9, "lunch": 0.7, "afternoon": 0.5,
+        "evening": 0.3, "night": 0.1
+    },
+    "bar": {
+        "morning": 0.1, "lunch": 0.2, "afternoon": 0.3,
+        "evening": 0.8, "night": 1.0
+    },
+    "shopping_mall": {
+        "morning": 0.4, "lunch": 0.7, "afternoon": 0.8,
+        "evening": 0.6, "night": 0.2
+    },
+    "transit_station": {
+        "morning": 1.0, "lunch": 0.6, "afternoon": 0.5,
+        "evening": 0.9, "night": 0.3
+    },
+    "park": {
+        "morning": 0.5, "lunch": 0.7, "afternoon": 0.6,
+        "evening": 0.4, "night": 0.1
+    },
+    "default": {
+        "morning": 0.5, "lunch": 0.8, "afternoon": 0.6,
+        "evening": 0.7, "night": 0.3
+    }
+}
+
+# Different venue types attract different demographics
+GENDER_DISTRIBUTIONS = {
+    "gym": {"Female": 45, "Male": 53, "Other": 2},
+    "cafe": {"Female": 55, "Male": 42, "Other": 3},
+    "bar": {"Female": 48, "Male": 50, "Other": 2},
+    "shopping_mall": {"Female": 60, "Male": 38, "Other": 2},
+    "restaurant": {"Female": 52, "Male": 45, "Other": 3},
+    "park": {"Female": 50, "Male": 47, "Other": 3},
+    "default": {"Female": 52, "Male": 45, "Other": 3}
+}
+
+# Weekday vs weekend patterns
+BUSIEST_DAYS_PATTERNS = {
+    "restaurant": {
+        "Mon": 450, "Tue": 520, "Wed": 580,
+        "Thu": 620, "Fri": 850, "Sat": 920, "Sun": 680
+    },
+    "bar": {
+        "Mon": 300, "Tue": 350, "Wed": 400,
+        "Thu": 550, "Fri": 900, "Sat": 950, "Sun": 500
+    },
+    "cafe": {
+        "Mon": 520, "Tue": 550, "Wed": 580,
+        "Thu": 600, "Fri": 650, "Sat": 800, "Sun": 750
+    },
+    "transit_station": {
+        "Mon": 850, "Tue": 900, "Wed": 880,
+        "Thu": 870, "Fri": 920, "Sat": 450, "Sun": 380
+    },
+    "shopping_mall": {
+        "Mon": 400, "Tue": 420, "Wed": 450,
+        "Thu": 480, "Fri": 700, "Sat": 950, "Sun": 880
+    },
+    "default": {
+        "Mon": 450, "Tue": 520, "Wed": 580,
+        "Thu": 620, "Fri": 850, "Sat": 920, "Sun": 680
+    }
+}
+
+_HOURLY_PATTERN_KEYS = frozenset(HOURLY_TRAFFIC_PATTERNS)
+_GENDER_KEYS = frozenset(GENDER_DISTRIBUTIONS)
+_BUSIEST_DAYS_KEYS = frozenset(BUSIEST_DAYS_PATTERNS)
+
+
+def _select_pattern_key(venue_types: List[str], pattern_keys: frozenset) -> str:
+    """
+    Pick the first venue type (in the given order) that has a pattern, else "default"
+    """
+    matches = pattern_keys.intersection(venue_types)
+    if not matches:
+        return "default"
+    if len(matches) == 1:
+        return next(iter(matches))
+    return next(venue_type for venue_type in venue_types if venue_type in matches)
+
+
 class AnalyticsService:
     """
     Service for generating real traffic analytics for placement zones
@@ -30,44 +119,44 @@ class AnalyticsService:
             return None
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                # First, find place by coordinates
-                url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-                params = {
-                    "location": f"{lat},{lon}",
-                    "radius": 50,  # 50m radius
-                    "key": self.google_api_key,
-                }
-
-                response = await client.get(url, params=params)
-                data = response.json()
-
-                if data.get("status") != "OK" or not data.get("results"):
-                    return None
-
-                # Get the first (closest) place
-                place = data["results"][0]
-                place_id = place.get("place_id")
-
-                if not place_id:
-                    return None
-
-                # Fetch detailed information
-                details_url = "https://maps.googleapis.com/maps/api/place/details/json"
-                details_params = {
-                    "place_id": place_id,
-                    "fields": "name,types,rating,user_ratings_total,opening_hours,price_level",
-                    "key": self.google_api_key,
-                }
-
-                details_response = await client.get(details_url, params=details_params)
-                details_data = details_response.json()
-
-                if details_data.get("status") == "OK":
-                    return details_data.get("result", {})
+            client = get_http_client()
+            # First, find place by coordinates
+            url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+            params = {
+                "location": f"{lat},{lon}",
+                "radius": 50,  # 50m radius
+                "key": self.google_api_key,
+            }
+
+            response = await client.get(url, params=params, timeout=10.0)
+            data = response.json()
 
+            if data.get("status") != "OK" or not data.get("results"):
                 return None
 
+            # Get the first (closest) place
+            place = data["results"][0]
+            place_id = place.get("place_id")
+
+            if not place_id:
+                return None
+
+            # Fetch detailed information
+            details_url = "https://maps.googleapis.com/maps/api/place/details/json"
+            details_params = {
+                "place_id": place_id,
+                "fields": "name,types,rating,user_ratings_total,opening_hours,price_level",
+                "key": self.google_api_key,
+            }
+
+            details_response = await client.get(details_url, params=details_params, timeout=10.0)
+            details_data = details_response.json()
+
+            if details_data.get("status") == "OK":
+                return details_data.get("result", {})
+
+            return None
+
         except Exception as e:
             logger.error(f"Error fetching place details: {e}")
             return None
@@ -78,44 +167,10 @@ class AnalyticsService:
         """
         Generate realistic hourly traffic patterns based on venue types
         """
-        # Base traffic patterns by venue type
-        patterns = {
-            "restaurant": {
-                "morning": 0.3, "lunch": 1.0, "afternoon": 0.4,
-                "evening": 0.9, "night": 0.2
-            },
-            "cafe": {
-                "morning": 0.9, "lunch": 0.7, "afternoon": 0.5,
-                "evening": 0.3, "night": 0.1
-            },
-            "bar": {
-                "morning": 0.1, "lunch": 0.2, "afternoon": 0.3,
-                "evening": 0.8, "night": 1.0
-            },
-            "shopping_mall": {
-                "morning": 0.4, "lunch": 0.7, "afternoon": 0.8,
-                "evening": 0.6, "night": 0.2
-            },
-            "transit_station": {
-                "morning": 1.0, "lunch": 0.6, "afternoon": 0.5,
-                "evening": 0.9, "night": 0.3
-            },
-            "park": {
-                "morning": 0.5, "lunch": 0.7, "afternoon": 0.6,
-                "evening": 0.4, "night": 0.1
-            },
-            "default": {
-                "morning": 0.5, "lunch": 0.8, "afternoon": 0.6,
-                "evening": 0.7, "night": 0.3
-            }
-        }
-
         # Select pattern based on venue type
-        selected_pattern = patterns["default"]
-        for venue_type in venue_types:
-            if venue_type in patterns:
-                selected_pattern = patterns[venue_type]
-                break
+        selected_pattern = HOURLY_TRAFFIC_PATTERNS[
+            _select_pattern_key(venue_types, _HOURLY_PATTERN_KEYS)
+        ]
 
         # Generate 24-hour traffic data
         hourly_data = []
@@ -157,23 +212,8 @@ class AnalyticsService:
         """
         Generate gender distribution based on venue types
         """
-        # Different venue types attract different demographics
-        type_demographics = {
-            "gym": {"Female": 45, "Male": 53, "Other": 2},
-            "cafe": {"Female": 55, "Male": 42, "Other": 3},
-            "bar": {"Female": 48, "Male": 50, "Other": 2},
-            "shopping_mall": {"Female": 60, "Male": 38, "Other": 2},
-            "restaurant": {"Female": 52, "Male": 45, "Other": 3},
-            "park": {"Female": 50, "Male": 47, "Other": 3},
-            "default": {"Female": 52, "Male": 45, "Other": 3}
-        }
-
         # Select distribution based on venue type
-        distribution = type_demographics["default"]
-        for venue_type in venue_types:
-            if venue_type in type_demographics:
-                distribution = type_demographics[venue_type]
-                break
+        distribution = GENDER_DISTRIBUTIONS[_select_pattern_key(venue_types, _GENDER_KEYS)]
 
         return [
             {"name": "Female", "value": distribution["Female"]},
@@ -187,40 +227,8 @@ class AnalyticsService:
         """
         Generate busiest days of week based on venue types
         """
-        # Weekday vs weekend patterns
-        patterns = {
-            "restaurant": {
-                "Mon": 450, "Tue": 520, "Wed": 580,
-                "Thu": 620, "Fri": 850, "Sat": 920, "Sun": 680
-            },
-            "bar": {
-                "Mon": 300, "Tue": 350, "Wed": 400,
-                "Thu": 550, "Fri": 900, "Sat": 950, "Sun": 500
-            },
-            "cafe": {
-                "Mon": 520, "Tue": 550, "Wed": 580,
-                "Thu": 600, "Fri": 650, "Sat": 800, "Sun": 750
-            },
-            "transit_station": {
-                "Mon": 850, "Tue": 900, "Wed": 880,
-                "Thu": 870, "Fri": 920, "Sat": 450, "Sun": 380
-            },
-            "shopping_mall": {
-                "Mon": 400, "Tue": 420, "Wed": 450,
-                "Thu": 480, "Fri": 700, "Sat": 950, "Sun": 880
-            },
-            "default": {
-                "Mon": 450, "Tue": 520, "Wed": 580,
-                "Thu": 620, "Fri": 850, "Sat": 920, "Sun": 680
-            }
-        }
-
         # Select pattern based on venue type
-        selected = patterns["default"]
-        for venue_type in venue_types:
-            if venue_type in patterns:
-                selected = patterns[venue_type]
-                break
+        selected = BUSIEST_DAYS_PATTERNS[_select_pattern_key(venue_types, _BUSIEST_DAYS_KEYS)]
 
         return [
             {"day": day, "traffic": traffic}
@@ -5,94 +5,271 @@ Use Claude Opus 4.6 Vision API to flag inappropriate content in uploaded images
 
 import logging
 import base64
-from typing import Dict, Any, Tuple
-import anthropic
-import os
+import asyncio
+import json
+import hashlib
+from io import BytesIO
+from typing import Dict, Any, List, Optional, Tuple
+from cachetools import TTLCache
+from PIL import Image
+from app.http_client import get_anthropic_client, llm_slot
+from app.llm_json import first_json_value
 
 logger = logging.getLogger(__name__)
 
+# Longest edge (px) for images sent to moderation - plenty for policy checks,
+# and vision models downsample larger images anyway
+MODERATION_MAX_EDGE = 768
+MODERATION_JPEG_QUALITY = 80
+
+# Max texts sent to Claude in a single moderation request
+MODERATION_BATCH_SIZE = 32
+
+# Moderation verdicts cached by content hash (identical uploads skip the API call)
+MODERATION_CACHE_SIZE = 10_000
+MODERATION_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Image moderation rubric. Kept as a frozen constant (no formatting) so tools +
+# system form an identical prefix on every call; bump the version suffix when
+# changing it rather than editing in place.
+MODERATION_SYSTEM_PROMPT_V1 = """You are a content moderator for a community flyer app.
+Analyze the image the user sends and determine if it contains inappropriate content:
+- Explicit sexual content
+- Violence or gore
+- Hate symbols or extremist content
+- Illegal activities
+- Spam or scam content
+
+Report your verdict with the report_moderation tool."""
+
+# Text moderation rubric (same frozen-constant convention as above)
+MODERATION_TEXT_SYSTEM_PROMPT_V1 = """Analyze each numbered text the user sends and determine if it contains inappropriate content:
+- Hate speech or discrimination
+- Explicit sexual content
+- Violence or threats
+- Illegal activities
+- Spam or scam content
+- Self-harm content
+
+Respond with ONLY a JSON array with one object per text, in the same order (no markdown, no explanation):
+[{"index": 0, "safe": true/false, "reason": "brief explanation", "categories": ["list of flagged categories"]}]"""
+
+# Forced tool call used to get a schema-conforming image moderation verdict
+MODERATION_TOOL = {
+    "name": "report_moderation",
+    "description": "Report the moderation verdict for the image",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "safe": {"type": "boolean"},
+            "reason": {"type": "string", "description": "Brief explanation"},
+            "categories": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Flagged categories (empty if safe)",
+            },
+        },
+        "required": ["safe", "reason", "categories"],
+        "additionalProperties": False,
+    },
+}
+
+# Local preflight for text: only near-empty texts (too short to carry abuse)
+# are passed without a Claude call; a keyword list can't tell short insults
+# or slurs from harmless text, so everything else is escalated
+PREFLIGHT_TRIVIAL_CHARS = 3
+
+
+def _preflight_text(text: str) -> Optional[Tuple[bool, Dict[str, Any]]]:
+    """
+    Cheap local check that clears trivially-safe text without calling Claude
+
+    Returns:
+        (is_safe, moderation_result) if the text is cleared locally, or None
+        if it needs full moderation
+    """
+    if len(text.strip()) >= PREFLIGHT_TRIVIAL_CHARS:
+        return None
+
+    return True, {
+        "is_safe": True,
+        "reason": "Cleared by local preflight",
+        "flagged_categories": [],
+        "source": "preflight-trivial",
+    }
+
+
+def _match_verdicts(parsed: Any, count: int) -> List[Optional[Dict[str, Any]]]:
+    """
+    Line up Claude's per-text verdicts with the `count` texts that were sent
+
+    A verdict is matched by its "index" (coerced to int, so "3" works too) or,
+    when it has no usable index, by its position in the reply. Items without
+    a boolean "safe" are ignored.
+
+    Returns:
+        One verdict dict per text, or None where the reply had no verdict
+    """
+    verdicts: List[Optional[Dict[str, Any]]] = [None] * count
+    if not isinstance(parsed, list):
+        return verdicts
+
+    unindexed = []
+    for position, item in enumerate(parsed):
+        if not isinstance(item, dict) or not isinstance(item.get("safe"), bool):
+            continue
+        try:
+            index = int(item["index"])
+        except (KeyError, TypeError, ValueError):
+            unindexed.append((position, item))
+            continue
+        if 0 <= index < count and verdicts[index] is None:
+            verdicts[index] = item
+
+    for position, item in unindexed:
+        if position < count and verdicts[position] is None:
+            verdicts[position] = item
+
+    return verdicts
+
+
+def _unmoderated_result(raw_response: str) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Result for a text Claude returned no verdict for
+
+    Fails closed, and carries an "error" entry like the failure path so the
+    caller doesn't cache it.
+    """
+    return False, {
+        "is_safe": False,
+        "reason": "No moderation verdict returned for this text",
+        "flagged_categories": [],
+        "raw_response": raw_response,
+        "error": "missing verdict",
+    }
+
+
+def _content_key(kind: str, content: bytes) -> bytes:
+    """Cache key for moderated content: kind prefix + blake2b digest of the bytes"""
+    return kind.encode() + hashlib.blake2b(content, digest_size=16).digest()
+
+
+def _shrink(raw: bytes, max_edge: int = MODERATION_MAX_EDGE) -> Tuple[bytes, str]:
+    """
+    Downscale and JPEG-recompress an image before sending it to Claude
+
+    Phone photos are often 5-10MB; moderation accuracy doesn't need that
+    resolution, and fewer bytes means a smaller base64 payload and upload.
+
+    Returns:
+        (image_bytes, media_type)
+    """
+    with Image.open(BytesIO(raw)) as image:
+        image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        buf = BytesIO()
+        image.save(buf, format="JPEG", quality=MODERATION_JPEG_QUALITY, optimize=True)
+    return buf.getvalue(), "image/jpeg"
+
 
 class ContentModerator:
     """Moderate uploaded content using Claude Opus 4.6"""
 
     def __init__(self):
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
-        self.client = anthropic.AsyncAnthropic(api_key=api_key)
-
-    async def moderate_image(self, image_content: bytes) -> Tuple[bool, Dict[str, Any]]:
+        self.client = get_anthropic_client()
+        # {content_key: (is_safe, moderation_result)} - only real verdicts are cached
+        # (results carrying an "error" entry are not)
+        self._cache: TTLCache = TTLCache(
+            maxsize=MODERATION_CACHE_SIZE, ttl=MODERATION_CACHE_TTL_SECONDS
+        )
+
+    async def moderate_image(
+        self, image_content: Optional[bytes] = None, image_url: Optional[str] = None
+    ) -> Tuple[bool, Dict[str, Any]]:
         """
         Moderate image content for inappropriate material using Claude Opus 4.6
 
+        Pass `image_url` when the image is already reachable over HTTPS (e.g. a
+        signed Supabase Storage URL) - Claude fetches it directly, skipping the
+        download/resize/base64 round-trip through this process.
+
         Args:
             image_content: Raw image bytes
+            image_url: Publicly reachable (or signed) URL of the image
 
         Returns:
             (is_safe: bool, moderation_result: dict)
         """
+        if image_url is None and image_content is None:
+            raise ValueError("Either image_content or image_url is required")
+
+        if image_url is not None:
+            cache_key = _content_key("image-url:", image_url.encode())
+        else:
+            cache_key = _content_key("image:", image_content)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            # Convert image to base64 for Claude
-            base64_image = base64.b64encode(image_content).decode("utf-8")
+            if image_url is not None:
+                image_source = {"type": "url", "url": image_url}
+            else:
+                # Shrink the image off the event loop (Pillow work is CPU-bound)
+                try:
+                    image_bytes, media_type = await asyncio.to_thread(_shrink, image_content)
+                except Exception as e:
+                    logger.warning(f"Could not downscale image for moderation, sending original: {e}")
+                    image_bytes, media_type = image_content, "image/jpeg"
+
+                # Convert image to base64 for Claude
+                image_source = {
+                    "type": "base64",
+                    "media_type": media_type,
+                    "data": base64.b64encode(image_bytes).decode("ascii"),
+                }
 
             # Use Claude Opus 4.6 Vision for content moderation
-            prompt = """Analyze this image and determine if it contains inappropriate content:
-- Explicit sexual content
-- Violence or gore
-- Hate symbols or extremist content
-- Illegal activities
-- Spam or scam content
-
-Respond with ONLY a JSON object (no markdown, no explanation):
-{"safe": true/false, "reason": "brief explanation", "categories": ["list of flagged categories"]}"""
-
-            response = await self.client.messages.create(
-                model="claude-opus-4-6",  # Claude Opus 4.6
-                max_tokens=200,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "image/jpeg",
-                                    "data": base64_image,
-                                },
-                            },
-                            {"type": "text", "text": prompt}
-                        ],
-                    }
-                ],
-            )
+            async with llm_slot():
+                response = await self.client.messages.create(
+                    model="claude-opus-4-6",  # Claude Opus 4.6
+                    max_tokens=120,
+                    tools=[MODERATION_TOOL],
+                    # Forcing the tool makes Claude return schema-conforming input
+                    tool_choice={"type": "tool", "name": MODERATION_TOOL["name"]},
+                    system=MODERATION_SYSTEM_PROMPT_V1,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [{"type": "image", "source": image_source}],
+                        }
+                    ],
+                )
 
             # Parse response
-            result_text = response.content[0].text if response.content else ""
+            result = next(
+                (block.input for block in response.content if block.type == "tool_use"),
+                None,
+            )
+            if not isinstance(result, dict) or not isinstance(result.get("safe"), bool):
+                raise ValueError("Moderation response did not include a structured verdict")
 
-            # Try to parse as JSON
-            import json
-            try:
-                result = json.loads(result_text)
-                is_safe = result.get("safe", True)
-                reason = result.get("reason", "")
-                categories = result.get("categories", [])
-            except json.JSONDecodeError:
-                # Fallback: simple keyword detection
-                is_safe = "safe" in result_text.lower() and "not" not in result_text.lower()
-                reason = result_text
-                categories = []
+            is_safe = result["safe"]
+            reason = result.get("reason", "")
+            categories = result.get("categories", [])
 
             moderation_result = {
                 "is_safe": is_safe,
                 "reason": reason,
                 "flagged_categories": categories,
-                "raw_response": result_text
+                "raw_response": result
             }
 
             if not is_safe:
                 logger.warning(f"Content flagged as unsafe: {reason}")
 
+            self._cache[cache_key] = (is_safe, moderation_result)
             return is_safe, moderation_result
 
         except Exception as e:
@@ -115,76 +292,140 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         Returns:
             (is_safe: bool, moderation_result: dict)
         """
-        try:
-            # Use Claude for text moderation
-            prompt = f"""Analyze this text and determine if it contains inappropriate content:
-- Hate speech or discrimination
-- Explicit sexual content
-- Violence or threats
-- Illegal activities
-- Spam or scam content
-- Self-harm content
+        results = await self.moderate_text_batch([text])
+        return results[0]
+
+    async def moderate_text_batch(self, texts: List[str]) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        Moderate several texts, sending up to MODERATION_BATCH_SIZE per Claude call
 
-Text to analyze: "{text}"
+        One request per batch amortizes the round-trip (and the shared
+        instructions) across many short texts.
 
-Respond with ONLY a JSON object (no markdown, no explanation):
-{{"safe": true/false, "reason": "brief explanation", "categories": ["list of flagged categories"]}}"""
+        Args:
+            texts: Texts to moderate
 
-            response = await self.client.messages.create(
-                model="claude-opus-4-6",  # Claude Opus 4.6
-                max_tokens=200,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+        Returns:
+            List of (is_safe: bool, moderation_result: dict), in input order
+        """
+        keys = [_content_key("text:", text.encode()) for text in texts]
+
+        # Only send texts that preflight didn't clear and we haven't already
+        # moderated (each distinct text once)
+        results: Dict[bytes, Tuple[bool, Dict[str, Any]]] = {}
+        pending: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in results or key in pending:
+                continue
+            verdict = _preflight_text(text)
+            if verdict is None:
+                verdict = self._cache.get(key)
+            if verdict is not None:
+                results[key] = verdict
+            else:
+                pending[key] = text
+
+        if pending:
+            pending_texts = list(pending.values())
+            batches = [
+                pending_texts[i:i + MODERATION_BATCH_SIZE]
+                for i in range(0, len(pending_texts), MODERATION_BATCH_SIZE)
+            ]
+            batch_results = await asyncio.gather(
+                *[self._moderate_text_chunk(batch) for batch in batches]
             )
+            fresh = (result for batch in batch_results for result in batch)
+            for key, result in zip(pending, fresh):
+                results[key] = result
+                if "error" not in result[1]:
+                    self._cache[key] = result
+
+        return [results[key] for key in keys]
+
+    async def _moderate_text_chunk(
+        self, texts: List[str], retry_unmatched: bool = True
+    ) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        Moderate one batch of texts with a single Claude call
+
+        Texts the reply skips or garbles are sent again once, on their own
+        (`retry_unmatched`), before being reported unmoderated.
+        """
+        try:
+            numbered_texts = "\n".join(
+                f"{index}. {json.dumps(text)}" for index, text in enumerate(texts)
+            )
+
+            # Use Claude for text moderation (the texts are the only per-call input)
+            async with llm_slot():
+                response = await self.client.messages.create(
+                    model="claude-opus-4-6",  # Claude Opus 4.6
+                    max_tokens=200 * len(texts),
+                    system=MODERATION_TEXT_SYSTEM_PROMPT_V1,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": f"Texts to analyze:\n{numbered_texts}"
+                        }
+                    ],
+                )
 
             # Parse response
             result_text = response.content[0].text if response.content else ""
 
             # Try to parse as JSON
-            import json
             try:
-                # Find JSON in response
-                json_start = result_text.find("{")
-                json_end = result_text.rfind("}") + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = result_text[json_start:json_end]
-                    result = json.loads(json_str)
-                else:
-                    raise ValueError("No JSON found in response")
-
-                is_safe = result.get("safe", True)
-                reason = result.get("reason", "")
-                categories = result.get("categories", [])
-            except (json.JSONDecodeError, ValueError):
-                # Fallback: simple keyword detection
-                is_safe = "safe" in result_text.lower()
-                reason = result_text
-                categories = []
+                # First complete JSON array in the response
+                parsed = first_json_value(result_text, "[")
+            except ValueError:
+                parsed = None
+            verdicts = _match_verdicts(parsed, len(texts))
 
-            moderation_result = {
-                "is_safe": is_safe,
-                "reason": reason,
-                "flagged_categories": categories,
-                "raw_response": result_text
-            }
+        except Exception as e:
+            logger.error(f"Text moderation failed: {str(e)}")
+            # Fail open
+            return [
+                (True, {
+                    "is_safe": True,
+                    "reason": f"Moderation service unavailable: {str(e)}",
+                    "error": str(e)
+                })
+                for _ in texts
+            ]
+
+        unmatched = [index for index, verdict in enumerate(verdicts) if verdict is None]
+        retried: Dict[int, Tuple[bool, Dict[str, Any]]] = {}
+        if unmatched and retry_unmatched:
+            logger.warning(f"No moderation verdict for {len(unmatched)} of {len(texts)} texts, retrying them")
+            retried = dict(zip(unmatched, await self._moderate_text_chunk(
+                [texts[index] for index in unmatched], retry_unmatched=False
+            )))
+
+        results = []
+        for index, result in enumerate(verdicts):
+            if index in retried:
+                results.append(retried[index])
+                continue
+            if result is None:
+                # No verdict for this text - don't guess one from the reply
+                results.append(_unmoderated_result(result_text))
+                continue
+
+            is_safe = result["safe"]
+            reason = result.get("reason", "")
+            categories = result.get("categories", [])
 
             if not is_safe:
                 logger.warning(f"Text content flagged: {categories}")
 
-            return is_safe, moderation_result
+            results.append((is_safe, {
+                "is_safe": is_safe,
+                "reason": reason,
+                "flagged_categories": categories,
+                "raw_response": result_text
+            }))
 
-        except Exception as e:
-            logger.error(f"Text moderation failed: {str(e)}")
-            # Fail open
-            return True, {
-                "is_safe": True,
-                "reason": f"Moderation service unavailable: {str(e)}",
-                "error": str(e)
-            }
+        return results
 
 
 # Global content moderator instance
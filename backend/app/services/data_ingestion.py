@@ -5,15 +5,83 @@ to generate dynamic zone recommendations
 """
 
 import os
-import httpx
+import re
+import time
 import logging
-from typing import List, Dict, Any, Optional
+import tempfile
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import asyncio
+from collections import defaultdict
+import ijson
+import orjson
+
+from app.http_client import AsyncByteReader, get_http_client
 
 logger = logging.getLogger(__name__)
 
 
+# Leading dollar amount of an ArcGIS parking rate, e.g. "$2.00/hr" -> "2.00"
+_RATE_RE = re.compile(r"\$?\s*(\d+(?:\.\d+)?)")
+
+
+# Map venue types to audience characteristics
+VENUE_TYPE_SIGNALS = {
+    # Demographics
+    "university": ["students", "young-adults", "18-24"],
+    "school": ["families", "parents", "children"],
+    "gym": ["fitness-enthusiasts", "health-conscious", "25-44"],
+    "bar": ["young-professionals", "nightlife", "21-35"],
+    "restaurant": ["foodies", "diners", "all-ages"],
+    "cafe": ["coffee-enthusiasts", "remote-workers", "young-professionals"],
+    "shopping_mall": ["shoppers", "families", "weekend-visitors"],
+    "park": ["families", "outdoor-enthusiasts", "all-ages"],
+    "library": ["students", "readers", "seniors", "families"],
+    "museum": ["art-enthusiasts", "cultural", "tourists", "families"],
+    "movie_theater": ["entertainment-seekers", "families", "date-nights"],
+
+    # Interests
+    "transit_station": ["transit", "commuters", "convenience"],
+    "subway_station": ["transit", "commuters", "urban"],
+    "bus_station": ["transit", "commuters"],
+    "store": ["shopping", "retail"],
+    "food": ["dining", "food"],
+    "health": ["wellness", "health"],
+    "entertainment": ["leisure", "entertainment"],
+
+    # Behaviors
+    "point_of_interest": ["explorers", "curious"],
+}
+
+# A venue type contributes to a category only if one of its signals is in the
+# category's trigger set; it then contributes its signals that are in the keep set
+_DEMOGRAPHIC_TRIGGERS = frozenset(["students", "families", "young-professionals"])
+_DEMOGRAPHIC_KEEP = frozenset(["students", "families", "young-professionals", "seniors", "children"])
+_INTEREST_TRIGGERS = frozenset(["transit", "shopping", "dining"])
+_INTEREST_KEEP = frozenset(["transit", "shopping", "dining", "food", "health", "wellness", "entertainment"])
+_BEHAVIOR_TRIGGERS = frozenset(["commuters", "explorers"])
+_BEHAVIOR_KEEP = frozenset(["commuters", "explorers", "shoppers", "weekend-visitors"])
+
+
+def _partition_signals(
+    signals: List[str], triggers: frozenset, keep: frozenset
+) -> frozenset:
+    """Signals from one venue type that belong to a category (empty if not triggered)"""
+    signal_set = frozenset(signals)
+    return signal_set & keep if signal_set & triggers else frozenset()
+
+
+# venue_type -> (demographics, interests, behaviors), built once at import
+_VENUE_TYPE_INDEX: Dict[str, Tuple[frozenset, frozenset, frozenset]] = {
+    venue_type: (
+        _partition_signals(signals, _DEMOGRAPHIC_TRIGGERS, _DEMOGRAPHIC_KEEP),
+        _partition_signals(signals, _INTEREST_TRIGGERS, _INTEREST_KEEP),
+        _partition_signals(signals, _BEHAVIOR_TRIGGERS, _BEHAVIOR_KEEP),
+    )
+    for venue_type, signals in VENUE_TYPE_SIGNALS.items()
+}
+
+
 class DataIngestionService:
     """
     Service for ingesting real data from Arlington and Google APIs
@@ -22,68 +90,179 @@ class DataIngestionService:
     # Arlington GIS ArcGIS REST API endpoint for parking meters
     ARLINGTON_PARKING_API = "https://gis2.arlingtonva.us/arlgis/rest/services/QAlert/QA_Parking_Meters/MapServer/0/query"
 
+    # Only the attributes we read (outFields=* serializes every column)
+    ARLINGTON_PARKING_FIELDS = "OBJECTID,METER_ID,BLOCKFACEID,FULLSTREET,METROAREA,TIMELIMIT,RATE"
+    # Features per ArcGIS page (resultRecordCount). Kept at the MapServer default
+    # maxRecordCount so a short page reliably means the last page.
+    ARLINGTON_PAGE_SIZE = 1000
+
+    # Max in-flight Google Places requests (Google's default QPS is ~10)
+    GOOGLE_PLACES_CONCURRENCY = 10
+
+    # Meters are bucketed into lat/lon cells rounded to this many decimals
+    # (3 decimals ~ 110m, about the 100m Places search radius)
+    PLACES_CELL_PRECISION = 3
+
+    # Parsed Arlington parking snapshot on local disk (the dataset changes rarely)
+    PARKING_SNAPSHOT_PATH = os.getenv(
+        "ARLINGTON_PARKING_SNAPSHOT_PATH",
+        os.path.join(tempfile.gettempdir(), "arlington_parking_meters.json"),
+    )
+    PARKING_SNAPSHOT_TTL_SECONDS = 24 * 60 * 60
+
     def __init__(self):
         self.google_api_key = os.getenv("GOOGLE_PLACES_API_KEY")
         if not self.google_api_key:
             logger.warning("GOOGLE_PLACES_API_KEY not set - Google Places features will be disabled")
 
-    async def fetch_arlington_parking_locations(self) -> List[Dict[str, Any]]:
+    async def fetch_arlington_parking_locations(
+        self, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Fetch parking meter locations from Arlington's ArcGIS API
         Returns list of parking locations with coordinates
+
+        Args:
+            limit: Stop after this many valid locations (None = fetch all).
+                The rest of the response is never downloaded or parsed.
         """
+        snapshot = await asyncio.to_thread(self._read_parking_snapshot, limit)
+        if snapshot is not None:
+            logger.info(f"Loaded {len(snapshot)} parking locations from local snapshot")
+            return snapshot
+
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Query all parking meters in Arlington
-                params = {
-                    "where": "1=1",  # Get all records
-                    "outFields": "*",  # Get all fields
-                    "f": "json",  # JSON format
-                    "returnGeometry": "true"
-                }
+            client = get_http_client()
+            # Query all parking meters in Arlington, one page at a time
+            params = {
+                "where": "1=1",  # Get all records
+                "outFields": self.ARLINGTON_PARKING_FIELDS,  # Only the fields we read
+                "orderByFields": "OBJECTID",  # Stable order for paging
+                "resultRecordCount": self.ARLINGTON_PAGE_SIZE,
+                "f": "json",  # JSON format
+                "returnGeometry": "true"
+            }
+
+            parking_locations = []
+            feature_count = 0
+            offset = 0
+            while True:
+                params["resultOffset"] = offset
+                page_count = await self._stream_parking_page(
+                    client, params, parking_locations, limit
+                )
+                feature_count += page_count
 
-                response = await client.get(self.ARLINGTON_PARKING_API, params=params)
-                response.raise_for_status()
-
-                data = response.json()
-
-                if "features" not in data:
-                    logger.error("No features in Arlington parking API response")
-                    return []
-
-                # Parse parking locations
-                parking_locations = []
-                for feature in data["features"]:
-                    try:
-                        geometry = feature.get("geometry", {})
-                        attributes = feature.get("attributes", {})
-
-                        location = {
-                            "id": attributes.get("OBJECTID"),
-                            "meter_id": attributes.get("METER_ID"),
-                            "block_face_id": attributes.get("BLOCKFACEID"),
-                            "street": attributes.get("FULLSTREET"),
-                            "metro_area": attributes.get("METROAREA"),
-                            "latitude": geometry.get("y"),
-                            "longitude": geometry.get("x"),
-                            "time_limit": attributes.get("TIMELIMIT"),
-                            "rate": attributes.get("RATE"),
-                        }
-
-                        if location["latitude"] and location["longitude"]:
-                            parking_locations.append(location)
-
-                    except Exception as e:
-                        logger.warning(f"Error parsing parking location: {e}")
-                        continue
+                # A short page is the last one; stop early once we have enough
+                if page_count < self.ARLINGTON_PAGE_SIZE:
+                    break
+                if limit is not None and len(parking_locations) >= limit:
+                    break
+                offset += page_count
+
+            if feature_count == 0:
+                logger.error("No features in Arlington parking API response")
+                return []
 
-                logger.info(f"Fetched {len(parking_locations)} parking locations from Arlington")
-                return parking_locations
+            logger.info(f"Fetched {len(parking_locations)} parking locations from Arlington")
+
+            # A response that ended before the limit holds every meter
+            complete = limit is None or len(parking_locations) < limit
+            await asyncio.to_thread(self._write_parking_snapshot, parking_locations, complete)
+            return parking_locations
 
         except Exception as e:
             logger.error(f"Error fetching Arlington parking data: {e}")
             return []
 
+    def _read_parking_snapshot(self, limit: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return parking locations from the local snapshot if it is fresh and
+        covers the request (complete, or at least `limit` entries), else None
+        """
+        path = self.PARKING_SNAPSHOT_PATH
+        try:
+            if time.time() - os.path.getmtime(path) >= self.PARKING_SNAPSHOT_TTL_SECONDS:
+                return None
+            with open(path, "rb") as f:
+                snapshot = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+        locations = snapshot.get("locations", [])
+        if snapshot.get("complete") or (limit is not None and len(locations) >= limit):
+            return locations[:limit] if limit is not None else locations
+        return None
+
+    def _write_parking_snapshot(self, locations: List[Dict[str, Any]], complete: bool) -> None:
+        """
+        Atomically replace the local parking snapshot
+        """
+        if not locations:
+            return
+        path = self.PARKING_SNAPSHOT_PATH
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps({"complete": complete, "locations": locations}))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write parking snapshot to {path}: {e}")
+
+    async def _stream_parking_page(
+        self,
+        client: Any,
+        params: Dict[str, Any],
+        parking_locations: List[Dict[str, Any]],
+        limit: Optional[int],
+    ) -> int:
+        """
+        Stream-parse one page of ArcGIS features into parking_locations
+
+        Returns:
+            Number of features read from the page (including skipped ones)
+        """
+        # Stream-parse features as bytes arrive instead of materializing the
+        # whole ArcGIS payload with response.json()
+        feature_count = 0
+        async with client.stream("GET", self.ARLINGTON_PARKING_API, params=params) as response:
+            response.raise_for_status()
+
+            features = ijson.items_async(
+                AsyncByteReader(response.aiter_bytes()), "features.item", use_float=True
+            )
+            async for feature in features:
+                feature_count += 1
+                try:
+                    geometry = feature.get("geometry") or {}
+                    latitude = geometry.get("y")
+                    longitude = geometry.get("x")
+                    if not latitude or not longitude:
+                        continue
+
+                    attributes = feature.get("attributes") or {}
+                    parking_locations.append({
+                        "id": attributes.get("OBJECTID"),
+                        "meter_id": attributes.get("METER_ID"),
+                        "block_face_id": attributes.get("BLOCKFACEID"),
+                        "street": attributes.get("FULLSTREET"),
+                        "metro_area": attributes.get("METROAREA"),
+                        "latitude": latitude,
+                        "longitude": longitude,
+                        "time_limit": attributes.get("TIMELIMIT"),
+                        "rate": attributes.get("RATE"),
+                    })
+
+                except Exception as e:
+                    logger.warning(f"Error parsing parking location: {e}")
+                    continue
+
+                # Leaving the stream context early closes the connection
+                if limit is not None and len(parking_locations) >= limit:
+                    break
+
+        return feature_count
+
     async def fetch_google_places_nearby(
         self, latitude: float, longitude: float, radius: int = 100
     ) -> List[Dict[str, Any]]:
@@ -102,38 +281,39 @@ class DataIngestionService:
             return []
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-                params = {
-                    "location": f"{latitude},{longitude}",
-                    "radius": radius,
-                    "key": self.google_api_key,
+            client = get_http_client()
+            url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+            params = {
+                "location": f"{latitude},{longitude}",
+                "radius": radius,
+                "key": self.google_api_key,
+            }
+
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+
+            # orjson parses the raw bytes directly (no intermediate str decode)
+            data = orjson.loads(response.content)
+
+            if data.get("status") != "OK":
+                logger.warning(f"Google Places API status: {data.get('status')}")
+                return []
+
+            venues = []
+            for place in data.get("results", []):
+                venue = {
+                    "place_id": place.get("place_id"),
+                    "name": place.get("name"),
+                    "types": place.get("types", []),
+                    "rating": place.get("rating"),
+                    "user_ratings_total": place.get("user_ratings_total"),
+                    "latitude": place.get("geometry", {}).get("location", {}).get("lat"),
+                    "longitude": place.get("geometry", {}).get("location", {}).get("lng"),
+                    "vicinity": place.get("vicinity"),
                 }
+                venues.append(venue)
 
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-
-                data = response.json()
-
-                if data.get("status") != "OK":
-                    logger.warning(f"Google Places API status: {data.get('status')}")
-                    return []
-
-                venues = []
-                for place in data.get("results", []):
-                    venue = {
-                        "place_id": place.get("place_id"),
-                        "name": place.get("name"),
-                        "types": place.get("types", []),
-                        "rating": place.get("rating"),
-                        "user_ratings_total": place.get("user_ratings_total"),
-                        "latitude": place.get("geometry", {}).get("location", {}).get("lat"),
-                        "longitude": place.get("geometry", {}).get("location", {}).get("lng"),
-                        "vicinity": place.get("vicinity"),
-                    }
-                    venues.append(venue)
-
-                return venues
+            return venues
 
         except Exception as e:
             logger.error(f"Error fetching Google Places data: {e}")
@@ -146,58 +326,21 @@ class DataIngestionService:
         Infer audience signals from Google Places venue types
         Maps venue types to demographics, interests, and behaviors
         """
-        demographics = []
-        interests = []
-        behaviors = []
-
-        # Map venue types to audience characteristics
-        type_mapping = {
-            # Demographics
-            "university": ["students", "young-adults", "18-24"],
-            "school": ["families", "parents", "children"],
-            "gym": ["fitness-enthusiasts", "health-conscious", "25-44"],
-            "bar": ["young-professionals", "nightlife", "21-35"],
-            "restaurant": ["foodies", "diners", "all-ages"],
-            "cafe": ["coffee-enthusiasts", "remote-workers", "young-professionals"],
-            "shopping_mall": ["shoppers", "families", "weekend-visitors"],
-            "park": ["families", "outdoor-enthusiasts", "all-ages"],
-            "library": ["students", "readers", "seniors", "families"],
-            "museum": ["art-enthusiasts", "cultural", "tourists", "families"],
-            "movie_theater": ["entertainment-seekers", "families", "date-nights"],
-
-            # Interests
-            "transit_station": ["transit", "commuters", "convenience"],
-            "subway_station": ["transit", "commuters", "urban"],
-            "bus_station": ["transit", "commuters"],
-            "store": ["shopping", "retail"],
-            "food": ["dining", "food"],
-            "health": ["wellness", "health"],
-            "entertainment": ["leisure", "entertainment"],
-
-            # Behaviors
-            "point_of_interest": ["explorers", "curious"],
-        }
+        demographics = set()
+        interests = set()
+        behaviors = set()
 
         for venue_type in venue_types:
-            if venue_type in type_mapping:
-                signals = type_mapping[venue_type]
-                # Categorize signals
-                if any(demo in signals for demo in ["students", "families", "young-professionals"]):
-                    demographics.extend([s for s in signals if s in ["students", "families", "young-professionals", "seniors", "children"]])
-                if any(interest in signals for interest in ["transit", "shopping", "dining"]):
-                    interests.extend([s for s in signals if s in ["transit", "shopping", "dining", "food", "health", "wellness", "entertainment"]])
-                if any(behavior in signals for behavior in ["commuters", "explorers"]):
-                    behaviors.extend([s for s in signals if s in ["commuters", "explorers", "shoppers", "weekend-visitors"]])
-
-        # Deduplicate
-        demographics = list(set(demographics))
-        interests = list(set(interests))
-        behaviors = list(set(behaviors))
+            entry = _VENUE_TYPE_INDEX.get(venue_type)
+            if entry:
+                demographics |= entry[0]
+                interests |= entry[1]
+                behaviors |= entry[2]
 
         return {
-            "demographics": demographics,
-            "interests": interests,
-            "behaviors": behaviors,
+            "demographics": list(demographics),
+            "interests": list(interests),
+            "behaviors": list(behaviors),
         }
 
     async def generate_zones_from_parking_data(
@@ -215,27 +358,64 @@ class DataIngestionService:
         logger.info("Starting zone generation from real data...")
 
         # Step 1: Fetch parking locations
-        parking_locations = await self.fetch_arlington_parking_locations()
+        # (only the first N for API quota management - parsing stops there)
+        parking_locations = await self.fetch_arlington_parking_locations(limit=limit)
 
         if not parking_locations:
             logger.error("No parking locations fetched - cannot generate zones")
             return []
 
-        # Limit to first N locations for API quota management
-        parking_locations = parking_locations[:limit]
-
-        # Step 2: For each parking location, get nearby venues
-        zones = []
-
+        # Step 2: Bucket meters into ~100m cells - meters on the same block
+        # return near-identical venue lists, so Places is queried once per cell
+        cells: Dict[Tuple[float, float], List[Dict[str, Any]]] = defaultdict(list)
+        parking_cells = []
         for parking in parking_locations:
+            cell_key = (
+                round(parking["latitude"], self.PLACES_CELL_PRECISION),
+                round(parking["longitude"], self.PLACES_CELL_PRECISION),
+            )
+            cells[cell_key].append(parking)
+            parking_cells.append(cell_key)
+
+        # Step 3: Fetch nearby venues for all cells concurrently
+        # (bounded by a semaphore to respect Google's QPS limit)
+        semaphore = asyncio.Semaphore(self.GOOGLE_PLACES_CONCURRENCY)
+
+        async def fetch_venues(cell_meters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            # Search from the centroid of the meters in the cell
+            latitude = sum(p["latitude"] for p in cell_meters) / len(cell_meters)
+            longitude = sum(p["longitude"] for p in cell_meters) / len(cell_meters)
             try:
-                # Fetch nearby venues from Google Places
-                venues = await self.fetch_google_places_nearby(
-                    parking["latitude"],
-                    parking["longitude"],
-                    radius=100  # 100m radius
-                )
+                async with semaphore:
+                    return await self.fetch_google_places_nearby(
+                        latitude,
+                        longitude,
+                        radius=100  # 100m radius
+                    )
+            except Exception as e:
+                # One failed cell shouldn't cancel the rest of the group
+                logger.error(f"Error fetching venues near ({latitude}, {longitude}): {e}")
+                return []
+
+        # TaskGroup: if the caller is cancelled (e.g. request timeout), all
+        # pending Places calls are torn down with it
+        async with asyncio.TaskGroup() as task_group:
+            cell_tasks = {
+                cell_key: task_group.create_task(fetch_venues(cell_meters))
+                for cell_key, cell_meters in cells.items()
+            }
+        venues_by_cell = {cell_key: task.result() for cell_key, task in cell_tasks.items()}
+        logger.info(
+            f"Queried Google Places for {len(cells)} cells covering "
+            f"{len(parking_locations)} parking locations"
+        )
+
+        # Step 4: Build zones, reusing each cell's venues for all its meters
+        zones = []
 
+        for parking, cell_key in zip(parking_locations, parking_cells):
+            venues = venues_by_cell[cell_key]
+            try:
                 if not venues:
                     continue
 
@@ -276,9 +456,6 @@ class DataIngestionService:
 
                 zones.append(zone)
 
-                # Rate limit: Small delay between Google API calls
-                await asyncio.sleep(0.1)
-
             except Exception as e:
                 logger.error(f"Error processing parking location {parking.get('id')}: {e}")
                 continue
@@ -290,21 +467,18 @@ class DataIngestionService:
         """
         Estimate cost tier based on parking rate
         """
-        if not rate:
+        # Parse rate (e.g., "$2.00/hr", "1.50 per hour")
+        match = _RATE_RE.match(str(rate).strip()) if rate else None
+        if not match:
             return "$$"
 
-        try:
-            # Parse rate (e.g., "$2.00/hr")
-            rate_value = float(rate.replace("$", "").split("/")[0])
-
-            if rate_value < 1.5:
-                return "$"
-            elif rate_value < 2.5:
-                return "$$"
-            else:
-                return "$$$"
-        except:
+        rate_value = float(match.group(1))
+        if rate_value < 1.5:
+            return "$"
+        elif rate_value < 2.5:
             return "$$"
+        else:
+            return "$$$"
 
 
 # Singleton instance
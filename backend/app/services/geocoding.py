@@ -4,10 +4,15 @@ Service for geocoding venue addresses to coordinates using Mapbox API
 """
 
 import os
+import re
+import asyncio
 import httpx
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
+from cachetools import TTLCache
 from pydantic import BaseModel
 
+from app.http_client import get_http_client
+
 
 class GeocodingResult(BaseModel):
     """Geocoding result with coordinates and metadata"""
@@ -25,12 +30,40 @@ class GeocodingError(Exception):
 
 
 # Arlington, VA bounding box (approximate)
-ARLINGTON_BOUNDS = {
-    "min_lat": 38.82,
-    "max_lat": 38.93,
-    "min_lon": -77.17,
-    "max_lon": -77.03
-}
+ARLINGTON_MIN_LAT, ARLINGTON_MAX_LAT = 38.82, 38.93
+ARLINGTON_MIN_LON, ARLINGTON_MAX_LON = -77.17, -77.03
+
+
+# Story 3.6 AC: geocoding completes within 2 seconds (fast path + fallback)
+GEOCODE_TIMEOUT = 2.0
+# Address-only fast path: budget and the relevance needed to skip the POI query
+GEOCODE_FAST_TIMEOUT = 0.7
+GEOCODE_FAST_MIN_RELEVANCE = 0.8
+
+# Max in-flight Mapbox requests when geocoding a batch of venues
+GEOCODE_CONCURRENCY = 10
+
+# Geocoding results cached by normalized address (venues don't move)
+_GEO_CACHE: TTLCache = TTLCache(maxsize=50_000, ttl=30 * 24 * 60 * 60)
+# Per-address locks so concurrent lookups of the same venue share one Mapbox call,
+# with the number of callers holding or waiting on each (dropped at zero)
+_GEO_LOCKS: Dict[str, asyncio.Lock] = {}
+_GEO_LOCK_USERS: Dict[str, int] = {}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_COMMA_SPACING_RE = re.compile(r"\s*,\s*")
+
+
+def normalize_address(venue_address: str) -> str:
+    """
+    Normalize an address for cache lookups
+
+    Lowercases, collapses whitespace and comma spacing, and drops trailing
+    punctuation, so "123 Main St ,Arlington" and "123 main st, arlington." match.
+    """
+    normalized = _WHITESPACE_RE.sub(" ", venue_address.strip().lower())
+    normalized = _COMMA_SPACING_RE.sub(", ", normalized)
+    return normalized.rstrip(" .,")
 
 
 def is_within_arlington(lat: float, lon: float) -> bool:
@@ -45,8 +78,8 @@ def is_within_arlington(lat: float, lon: float) -> bool:
         True if within Arlington bounds, False otherwise
     """
     return (
-        ARLINGTON_BOUNDS["min_lat"] <= lat <= ARLINGTON_BOUNDS["max_lat"] and
-        ARLINGTON_BOUNDS["min_lon"] <= lon <= ARLINGTON_BOUNDS["max_lon"]
+        ARLINGTON_MIN_LAT <= lat <= ARLINGTON_MAX_LAT and
+        ARLINGTON_MIN_LON <= lon <= ARLINGTON_MAX_LON
     )
 
 
@@ -74,6 +107,71 @@ async def geocode_venue(venue_address: str) -> Optional[GeocodingResult]:
     if not mapbox_api_key:
         raise GeocodingError("MAPBOX_API_KEY not configured")
 
+    cache_key = normalize_address(venue_address)
+    cached = _GEO_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    lock = _GEO_LOCKS.setdefault(cache_key, asyncio.Lock())
+    _GEO_LOCK_USERS[cache_key] = _GEO_LOCK_USERS.get(cache_key, 0) + 1
+    try:
+        async with lock:
+            # Another request may have filled the cache while we waited
+            cached = _GEO_CACHE.get(cache_key)
+            if cached is not None:
+                return cached
+
+            result = await _fetch_geocode(venue_address, mapbox_api_key)
+            if result is not None:
+                _GEO_CACHE[cache_key] = result
+            return result
+    finally:
+        # A released lock can still have queued waiters, so it is only dropped
+        # once the last caller leaves (otherwise a new caller would get a fresh
+        # lock and race the waiters to Mapbox)
+        _GEO_LOCK_USERS[cache_key] -= 1
+        if not _GEO_LOCK_USERS[cache_key]:
+            del _GEO_LOCK_USERS[cache_key]
+            del _GEO_LOCKS[cache_key]
+
+
+async def geocode_venues(
+    venue_addresses: List[str]
+) -> List[Union[Optional[GeocodingResult], GeocodingError]]:
+    """
+    Geocode several venue addresses concurrently
+
+    Lookups fan out over the shared HTTP/2 client (bounded by
+    GEOCODE_CONCURRENCY) and go through geocode_venue, so cached and
+    duplicate addresses don't cost extra Mapbox calls.
+
+    Args:
+        venue_addresses: Addresses to geocode
+
+    Returns:
+        One entry per address, in input order: a GeocodingResult, None if the
+        venue wasn't found, or the GeocodingError raised for that address
+    """
+    semaphore = asyncio.Semaphore(GEOCODE_CONCURRENCY)
+
+    async def geocode_one(venue_address: str) -> Optional[GeocodingResult]:
+        async with semaphore:
+            return await geocode_venue(venue_address)
+
+    return await asyncio.gather(
+        *[geocode_one(venue_address) for venue_address in venue_addresses],
+        return_exceptions=True
+    )
+
+
+async def _fetch_geocode(venue_address: str, mapbox_api_key: str) -> Optional[GeocodingResult]:
+    """
+    Call the Mapbox Geocoding API for a single address (uncached)
+
+    Tries a fast address-only query first (most venues are plain street
+    addresses) and only falls back to the slower address+POI ranking when
+    that misses or isn't confident enough. Both together stay within 2s.
+    """
     # Mapbox Geocoding API endpoint
     base_url = "https://api.mapbox.com/geocoding/v5/mapbox.places"
 
@@ -89,51 +187,87 @@ async def geocode_venue(venue_address: str) -> Optional[GeocodingResult]:
         "limit": 1,  # Only return top result
         "country": "us",  # Restrict to United States
         "proximity": "-77.0910,38.8816",  # Arlington center (lon,lat format for Mapbox)
-        "types": "address,poi"  # Allow addresses and points of interest
     }
 
+    client = get_http_client()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    # Fast path: address-only lookup; any failure here just falls through
     try:
-        # Story 3.6 AC: Completes within 2 seconds
-        async with httpx.AsyncClient(timeout=2.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-
-            data = response.json()
-            features = data.get("features", [])
-
-            if not features:
-                # Story 3.6 AC: Failure shows "Venue not found" message
-                return None
-
-            # Extract top result
-            feature = features[0]
-            coordinates = feature["geometry"]["coordinates"]
-            lon, lat = coordinates  # Mapbox returns [lon, lat]
-
-            # Story 3.6 AC: Coordinates validated within Arlington, VA bounds
-            within_arlington = is_within_arlington(lat, lon)
-
-            # Determine confidence based on relevance score and Arlington location
-            relevance = feature.get("relevance", 0)
-            if relevance >= 0.9 and within_arlington:
-                confidence = "High"
-            elif relevance >= 0.7:
-                confidence = "Medium"
-            else:
-                confidence = "Low"
-
-            return GeocodingResult(
-                latitude=lat,
-                longitude=lon,
-                formatted_address=feature.get("place_name", venue_address),
-                place_name=feature.get("text", venue_address),
-                within_arlington=within_arlington,
-                confidence=confidence
-            )
+        feature = await asyncio.wait_for(
+            _query_mapbox(client, url, {**params, "types": "address"}, GEOCODE_FAST_TIMEOUT),
+            GEOCODE_FAST_TIMEOUT,
+        )
+        if feature is not None and feature.get("relevance", 0) >= GEOCODE_FAST_MIN_RELEVANCE:
+            return _to_geocoding_result(feature, venue_address)
+    except Exception:
+        pass
 
+    # Story 3.6 AC: Completes within 2 seconds
+    remaining = max(GEOCODE_TIMEOUT - (loop.time() - started), 0.1)
+    try:
+        feature = await _query_mapbox(
+            client,
+            url,
+            {**params, "types": "address,poi"},  # Allow addresses and points of interest
+            remaining,
+        )
     except httpx.TimeoutException:
         raise GeocodingError("Geocoding request timed out (>2 seconds)")
     except httpx.HTTPStatusError as e:
         raise GeocodingError(f"Geocoding API error: {e.response.status_code}")
     except Exception as e:
         raise GeocodingError(f"Geocoding failed: {str(e)}")
+
+    if feature is None:
+        # Story 3.6 AC: Failure shows "Venue not found" message
+        return None
+
+    try:
+        return _to_geocoding_result(feature, venue_address)
+    except Exception as e:
+        raise GeocodingError(f"Geocoding failed: {str(e)}")
+
+
+async def _query_mapbox(
+    client: httpx.AsyncClient, url: str, params: Dict[str, Any], timeout: float
+) -> Optional[Dict[str, Any]]:
+    """
+    Run one Mapbox query and return its top feature (None if no match)
+    """
+    response = await client.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+
+    data = response.json()
+    features = data.get("features", [])
+    return features[0] if features else None
+
+
+def _to_geocoding_result(feature: Dict[str, Any], venue_address: str) -> GeocodingResult:
+    """
+    Build a GeocodingResult from a Mapbox feature
+    """
+    coordinates = feature["geometry"]["coordinates"]
+    lon, lat = coordinates  # Mapbox returns [lon, lat]
+
+    # Story 3.6 AC: Coordinates validated within Arlington, VA bounds
+    within_arlington = is_within_arlington(lat, lon)
+
+    # Determine confidence based on relevance score and Arlington location
+    relevance = feature.get("relevance", 0)
+    if relevance >= 0.9 and within_arlington:
+        confidence = "High"
+    elif relevance >= 0.7:
+        confidence = "Medium"
+    else:
+        confidence = "Low"
+
+    return GeocodingResult(
+        latitude=lat,
+        longitude=lon,
+        formatted_address=feature.get("place_name", venue_address),
+        place_name=feature.get("text", venue_address),
+        within_arlington=within_arlington,
+        confidence=confidence
+    )
@@ -5,20 +5,307 @@ Enhanced with Claude Opus 4.6 for intelligent semantic audience matching
 """
 
 import math
-import os
-import json
 import logging
 import asyncio
+import functools
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from operator import attrgetter
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from numba import njit
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from datetime import datetime
 from pydantic import BaseModel, Field
-import anthropic
 
-from app.services.zones import Zone, zones_service
+from app.http_client import get_anthropic_client, llm_slot
+from app.llm_json import first_json_value
+from app.services.zones import (
+    EARTH_RADIUS_MILES, Zone, ZoneArrays, zones_service, parse_timing_windows, timing_coverage, audience_keywords,
+    audience_keyword_mask
+)
 
 logger = logging.getLogger(__name__)
 
+# Score lookup tables (Story 4.2). Distance: upper bounds in miles (inclusive);
+# dwell time: lower bounds in seconds (inclusive). Indexed via np.searchsorted.
+_DISTANCE_THRESHOLDS = np.array([1.0, 3.0, 5.0, 10.0])
+_DISTANCE_SCORES = np.array([20.0, 15.0, 10.0, 5.0, 2.0])
+_DWELL_THRESHOLDS = np.array([20.0, 30.0, 45.0, 60.0])
+_DWELL_SCORES = np.array([2.0, 4.0, 6.0, 8.0, 10.0])
+
+# Audience match scoring rubric. Kept as a frozen constant (no formatting) so
+# the system prompt is an identical prefix on every call; bump the version
+# suffix when changing it rather than editing in place.
+AUDIENCE_MATCH_SYSTEM_PROMPT_V1 = """You are an expert in audience targeting and demographics.
+
+The user sends an event's target audience and a zone's audience profile.
+Score how well this zone's audience matches the event's target audience on a scale of 0-40 points.
+Consider:
+- Semantic overlap (e.g., "young professionals" matches "coffee enthusiasts")
+- Lifestyle compatibility (e.g., "families" matches "kid-friendly")
+- Demographic alignment
+- Likely shared interests
+
+Respond with ONLY a JSON object (no markdown, no explanation):
+{"score": <number 0-40>, "reasoning": "<brief 1-sentence explanation>"}"""
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_event_slot(event_date: str, event_time: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Event (day_bit, hour_bit, week_bit) matching the Zone.timing_coverage
+    (day_mask, hour_mask, week_mask) layout, or None if the date/time can't
+    be parsed
+    """
+    try:
+        event_day = datetime.fromisoformat(event_date).weekday()
+        event_hour = int(event_time.split(":")[0])  # HH:MM
+    except (ValueError, TypeError, IndexError, AttributeError):
+        return None
+
+    event_hour_bit = 1 << event_hour if event_hour >= 0 else 0
+    event_week_bit = 1 << (event_day * 24 + event_hour) if 0 <= event_hour < 24 else 0
+    return 1 << event_day, event_hour_bit, event_week_bit
+
+
+def _temporal_scores(arrays: ZoneArrays, slot: Optional[Tuple[int, int, int]]) -> np.ndarray:
+    """
+    Temporal alignment (0-30) for every zone at once from the ZoneArrays
+    coverage grids - same rules as _calculate_temporal_alignment
+
+    slot: _parse_event_slot result for the event (None if unparseable)
+    """
+    n = len(arrays.has_timing)
+    if slot is None:
+        return np.full(n, 15.0)  # Neutral score if date/time invalid
+
+    day_bit, hour_bit, _ = slot
+    day = day_bit.bit_length() - 1
+    hour = hour_bit.bit_length() - 1  # -1 when there is no hour bit
+    if 0 <= hour < 24:
+        week_match = arrays.week_coverage[:, day, hour]
+        hour_match = arrays.hour_coverage[:, hour]
+    else:
+        week_match = hour_match = np.zeros(n, dtype=bool)
+
+    scores = np.select(
+        [week_match, arrays.day_coverage[:, day], hour_match], [30.0, 20.0, 15.0], default=5.0
+    )
+    scores[~arrays.has_timing] = 15.0  # Neutral score if no timing data
+    return scores
+
+
+# Latitude gap (radians) beyond which a zone is certainly past the last
+# distance threshold - great-circle distance is never less than R * |dlat|
+_FAR_LAT_DELTA = _DISTANCE_THRESHOLDS[-1] / EARTH_RADIUS_MILES
+
+
+@njit(cache=True, fastmath=True)
+def _distance_kernel(
+    zone_lats, zone_lons, zone_cos_lats, dwell_times, lat_rad, lon_rad, far_lat_delta,
+    distance_thresholds, distance_scores, dwell_thresholds, dwell_scores
+):
+    """
+    Compiled per-request numeric core of score_zones
+
+    Haversine distance (miles) from the venue to each zone plus the distance
+    and dwell-time scores, using the same thresholds as the lookup tables
+    (distance upper bounds inclusive, dwell lower bounds inclusive).
+    Zones more than far_lat_delta away in latitude alone get the lowest
+    distance score without any trig; their distance is left as NaN.
+    Returns (distances, distance_scores, dwell_time_scores).
+    """
+    n = zone_lats.shape[0]
+    distances = np.empty(n)
+    distance_out = np.empty(n)
+    dwell_out = np.empty(n)
+    cos_lat = np.cos(lat_rad)
+
+    for i in range(n):
+        if abs(zone_lats[i] - lat_rad) > far_lat_delta:
+            distances[i] = np.nan
+            distance_out[i] = distance_scores[distance_scores.shape[0] - 1]
+        else:
+            a = (
+                np.sin((zone_lats[i] - lat_rad) / 2) ** 2
+                + cos_lat * zone_cos_lats[i] * np.sin((zone_lons[i] - lon_rad) / 2) ** 2
+            )
+            distance = 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(min(max(a, 0.0), 1.0)))
+            distances[i] = distance
+
+            index = 0
+            while index < distance_thresholds.shape[0] and distance > distance_thresholds[index]:
+                index += 1
+            distance_out[i] = distance_scores[index]
+
+        index = 0
+        while index < dwell_thresholds.shape[0] and dwell_times[i] >= dwell_thresholds[index]:
+            index += 1
+        dwell_out[i] = dwell_scores[index]
+
+    return distances, distance_out, dwell_out
+
+
+# Compile (or load from the on-disk cache) at import with the argument types
+# score_zones uses - float64 coordinates, int32 dwell times (ZoneArrays) - so
+# the first request doesn't pay the JIT cost
+_distance_kernel(
+    np.zeros(1), np.zeros(1), np.ones(1), np.zeros(1, dtype=np.int32), 0.0, 0.0, _FAR_LAT_DELTA,
+    _DISTANCE_THRESHOLDS, _DISTANCE_SCORES, _DWELL_THRESHOLDS, _DWELL_SCORES,
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _time_period_behavioral_context(time_period: str, zone_type: str) -> str:
+    """
+    Story 6.4: Behavioral context for a time period and zone type
+    (cached - only a handful of distinct combinations exist)
+    """
+    is_transit = zone_type == "transit"
+    is_restaurant = zone_type == "restaurant"
+    is_retail = zone_type == "retail"
+
+    # Morning behavioral patterns (6-11am)
+    if time_period == "morning":
+        if is_transit:
+            return "commuters heading to work (7-9am), high attention during morning routine, prime time for weekend event discovery"
+        elif is_restaurant:
+            return "morning coffee crowd, leisurely browsing, receptive to event information"
+        elif is_retail:
+            return "early shoppers with time to browse, unhurried pace, good attention span"
+        else:
+            return "morning foot traffic with routine patterns, consistent daily exposure"
+
+    # Lunch behavioral patterns (11am-2pm)
+    elif time_period == "lunch":
+        if is_transit:
+            return "lunch-hour commuters and office workers, mid-day breaks, good browsing time"
+        elif is_restaurant:
+            return "office workers on lunch break (11am-2pm), browsing mindset, looking for nearby activities"
+        elif is_retail:
+            return "lunch shoppers taking breaks, relaxed pace, receptive to event details"
+        else:
+            return "mid-day crowd with flexible schedule, good dwell time, walkable radius matters"
+
+    # Evening behavioral patterns (5-9pm)
+    elif time_period == "evening":
+        if is_transit:
+            return "commuters heading home (5-7pm), weekend planning mode, repetition builds awareness"
+        elif is_restaurant:
+            return "dinner crowd with leisure time, social mindset, discussing weekend plans"
+        elif is_retail:
+            return "evening shoppers unwinding, browsing for entertainment, receptive to event ideas"
+        else:
+            return "evening foot traffic with leisure mindset, good attention for event details"
+
+    # Fallback (shouldn't happen)
+    return "strategic timing for target audience behavior patterns"
+
+
+# Audience match reasoning tiers: good from 24/40 (60%), excellent from 32/40 (80%),
+# indexed by bisect_right(_AUDIENCE_REASON_THRESHOLDS, audience_match)
+_AUDIENCE_REASON_THRESHOLDS = (24.0, 32.0)
+_AUDIENCE_REASONS = (
+    None,
+    "good audience alignment",
+    "excellent audience match for your target demographics",
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_reasoning(
+    zone_name: str, zone_type: str, time_period: str, audience_bucket: int,
+    very_close: bool, distance_text: Optional[str], dwell_time_seconds: Optional[int]
+) -> str:
+    """
+    Story 4.9/6.4: Build the plain-language reasoning sentence for a zone
+
+    Args:
+        audience_bucket: 2 = excellent (>= 32/40), 1 = good (>= 24/40), 0 = neither
+        very_close: distance < 1 mile
+        distance_text: distance formatted to 0.1 mi if < 3 miles, else None
+        dwell_time_seconds: dwell time if >= 30 seconds, else None
+    """
+    reasons = []
+
+    time_context = _time_period_behavioral_context(time_period, zone_type)
+    if time_context:
+        reasons.append(time_context)
+
+    # Audience match reasoning
+    audience_reason = _AUDIENCE_REASONS[audience_bucket]
+    if audience_reason is not None:
+        reasons.append(audience_reason)
+
+    # Distance reasoning
+    if distance_text is not None:
+        if very_close:
+            reasons.append(f"very close to venue ({distance_text} mi)")
+        else:
+            reasons.append(f"walkable distance ({distance_text} mi)")
+
+    # Dwell time reasoning
+    if dwell_time_seconds is not None:
+        if dwell_time_seconds >= 45:
+            reasons.append(f"high dwell time ({dwell_time_seconds}s) for ad visibility")
+        else:
+            reasons.append(f"moderate dwell time ({dwell_time_seconds}s)")
+
+    # Capitalize first letter of first reason
+    if reasons:
+        reasons[0] = reasons[0][0].upper() + reasons[0][1:]
+
+    # Combine into sentence
+    return f"{zone_name}: {', '.join(reasons)}."
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, highest first with ties in index order -
+    the first k of a stable descending sort, without sorting every score
+    when k is smaller (np.partition finds the k-th highest score first)
+    """
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    threshold = np.partition(scores, n - k)[n - k]  # k-th highest score
+    above = np.flatnonzero(scores > threshold)
+    tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+    candidates = np.sort(np.concatenate((above, tied)))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _target_keywords(target_audience: List[str]) -> frozenset:
+    """
+    Lowercased words from the event's target audience tags
+    """
+    return frozenset(word.lower() for audience in target_audience for word in audience.split())
+
+
+def _masked_audience_match(zone_mask: int, target_mask: int) -> float:
+    """
+    Keyword fallback audience score (0-40) from keyword bitmasks
+    (zone.audience_keyword_mask, audience_keyword_mask) - the overlap is a
+    single AND + popcount
+    """
+    if not zone_mask:
+        return 0.0
+    overlap_ratio = (target_mask & zone_mask).bit_count() / zone_mask.bit_count()
+    return min(overlap_ratio * 50.0, 40.0)
+
+
+class _EventContext(NamedTuple):
+    """
+    Event-derived values used while scoring every zone, computed once per request
+    """
+    slot: Optional[Tuple[int, int, int]]  # see _parse_event_slot; None if date/time invalid
+    time_period: str
+    target_keywords: frozenset
+    target_mask: int  # target_keywords over the zone keyword vocabulary
+
 
 class EventData(BaseModel):
     """
@@ -45,6 +332,49 @@ class DataSource(BaseModel):
     last_updated: str  # ISO date, e.g., "2026-02-10"
 
 
+# Base data updated date (for demo purposes, using recent date)
+_BASE_DATE = "2026-02-10"
+
+# Story 4.10 sources whose details don't depend on the zone, shared by all zones
+_NO_METRO_SOURCE = DataSource(
+    name="Metro transit schedules",
+    status="not_detected",
+    details="No direct Metro access",
+    last_updated=_BASE_DATE
+)
+_FOOT_TRAFFIC_SOURCE = DataSource(
+    name="Arlington Open Data (foot traffic)",
+    status="detected",
+    details="Daily foot traffic patterns monitored",
+    last_updated=_BASE_DATE
+)
+_TIMING_SOURCE = DataSource(
+    name="Behavioral timing patterns",
+    status="detected",
+    details="Optimal windows identified for target audience",
+    last_updated=_BASE_DATE
+)
+_EVENT_PERMITS_SOURCE = DataSource(
+    name="Event permits database",
+    status="not_detected",
+    details="No competing events detected",
+    last_updated=_BASE_DATE
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _metro_source(line_info: str) -> DataSource:
+    """
+    Detected Metro source for a line description, shared by zones on that line
+    """
+    return DataSource(
+        name="Metro transit schedules",
+        status="detected",
+        details=f"Transit access [{line_info}]",
+        last_updated=_BASE_DATE
+    )
+
+
 class WarningCategory(BaseModel):
     """
     Story 7.5: Individual warning category with details
@@ -57,6 +387,26 @@ class WarningCategory(BaseModel):
     metric_value: Optional[float] = None  # The actual metric that triggered this
 
 
+# Story 7.5 category templates: only description and metric_value vary per
+# zone, so flagged zones copy these instead of validating a new model
+_LOW_DWELL_TEMPLATE = WarningCategory(
+    category_type="low_dwell_time", display_name="Low Dwell Time", icon="⏱️",
+    description="", severity="high"
+)
+_POOR_AUDIENCE_TEMPLATE = WarningCategory(
+    category_type="poor_audience_match", display_name="Poor Audience Match", icon="🎯",
+    description="", severity="high"
+)
+_TIMING_MISALIGNMENT_TEMPLATE = WarningCategory(
+    category_type="timing_misalignment", display_name="Timing Misalignment", icon="📅",
+    description="", severity="medium"
+)
+_VISUAL_NOISE_TEMPLATE = WarningCategory(
+    category_type="visual_noise", display_name="Visual Noise Saturation", icon="👁️",
+    description="", severity="medium"
+)
+
+
 class RiskWarning(BaseModel):
     """
     Risk warning metadata for deceptive hotspots
@@ -90,6 +440,28 @@ class ZoneScore(BaseModel):
     risk_warning: Optional[RiskWarning] = None  # Story 7.1: Risk detection
 
 
+def _rank_index(scored_zones: List[ZoneScore]) -> Dict[str, int]:
+    """
+    Map zone id -> position of its first occurrence in scored_zones
+    """
+    index: Dict[str, int] = {}
+    for position, scored_zone in enumerate(scored_zones):
+        index.setdefault(scored_zone.zone.id, position)
+    return index
+
+
+def _unflagged_pool(scored_zones: List[ZoneScore]) -> Tuple[List[ZoneScore], List[float]]:
+    """
+    Story 7.4: Unflagged zones sorted best-first, with their negated total scores
+    (ascending, for bisect) - the alternative candidates for any flagged zone
+    """
+    unflagged = sorted(
+        (sz for sz in scored_zones if not sz.risk_warning or not sz.risk_warning.is_flagged),
+        key=attrgetter("total_score"), reverse=True
+    )
+    return unflagged, [-sz.total_score for sz in unflagged]
+
+
 class RecommendationsService:
     """
     Service for scoring and ranking placement zones based on event data
@@ -100,18 +472,22 @@ class RecommendationsService:
     def __init__(self):
         self.zones_service = zones_service
         # Use Claude Opus 4.6 for semantic audience matching
-        anthropic_key = os.getenv("ANTHROPIC_API_KEY")
-        if not anthropic_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
-        self.claude_client = anthropic.AsyncAnthropic(api_key=anthropic_key)
+        self.claude_client = get_anthropic_client()
         # Cache for Claude audience match scores (to avoid repeated API calls)
         self._audience_match_cache: Dict[str, tuple[float, str]] = {}
+        # Story 4.10 data sources depend only on static zone attributes, so they
+        # are built once per zone (cleared whenever the zones list changes)
+        self._data_source_cache: Dict[str, List[DataSource]] = {}
+        self._data_source_zones: Optional[List[Zone]] = None
         logger.info("Using Claude Opus 4.6 for intelligent semantic audience matching")
 
-    async def score_zones(self, event_data: EventData) -> List[ZoneScore]:
+    async def score_zones(
+        self, event_data: EventData, limit: Optional[int] = None
+    ) -> List[ZoneScore]:
         """
         Score all zones based on event data using Claude Opus 4.6
-        Returns list of ZoneScore objects sorted by total_score (highest first)
+        Returns list of ZoneScore objects sorted by total_score (highest first),
+        truncated to the top `limit` zones if given
 
         Scoring Formula (Story 4.2 AC):
         - audience_match: 40% - uses Claude for intelligent semantic matching (batched in parallel)
@@ -122,7 +498,66 @@ class RecommendationsService:
         Final score: 0-100%
         """
         zones = await self.zones_service.get_all_zones()
+        audience_matches = await self._match_audiences(event_data, zones)
+
+        # Distances and distance/dwell scores for every zone in one compiled pass
+        distances, distance_scores, dwell_time_scores = self._score_distances_and_dwell(
+            event_data.venue_lat, event_data.venue_lon, zones
+        )
+
+        return self._rank_zones(
+            event_data, zones, audience_matches, distances, distance_scores, dwell_time_scores,
+            limit
+        )
 
+    async def score_zones_batch(
+        self, events: List[EventData], limit: Optional[int] = None
+    ) -> List[List[ZoneScore]]:
+        """
+        Score all zones for several events at once
+        Returns one list per event, each as score_zones would return it
+
+        Zone-side work (zone list, coordinate arrays, dwell-time scores, data
+        sources) is done once, and venue-to-zone distances for every event
+        come from a single (events x zones) Haversine broadcast. Claude
+        audience matching runs for every event concurrently; temporal
+        alignment and ranking run per event.
+        """
+        if not events:
+            return []
+
+        zones = await self.zones_service.get_all_zones()
+
+        distances = self._calculate_distance_matrix(
+            [event.venue_lat for event in events], [event.venue_lon for event in events], zones
+        )
+        distance_scores = _DISTANCE_SCORES[
+            np.searchsorted(_DISTANCE_THRESHOLDS, distances, side="left")
+        ]
+        dwell_time_scores = _DWELL_SCORES[np.searchsorted(
+            _DWELL_THRESHOLDS, self.zones_service.get_zone_arrays(zones).dwell_time_seconds,
+            side="right"
+        )]
+
+        # Audience matching for all events at once; each Claude call still
+        # waits for an llm_slot, so the process-wide cap holds
+        all_audience_matches = await asyncio.gather(
+            *[self._match_audiences(event_data, zones) for event_data in events]
+        )
+
+        return [
+            self._rank_zones(
+                event_data, zones, audience_matches,
+                distances[row], distance_scores[row], dwell_time_scores, limit
+            )
+            for row, (event_data, audience_matches) in enumerate(zip(events, all_audience_matches))
+        ]
+
+    async def _match_audiences(self, event_data: EventData, zones: List[Zone]) -> List[Any]:
+        """
+        Claude audience match for every zone, aligned with `zones`
+        Each entry is (score, reasoning) or the exception the call raised
+        """
         # Batch Claude API calls with rate limiting (max 5 concurrent)
         logger.info(f"Scoring {len(zones)} zones with Claude Opus 4.6 (rate-limited batch processing)...")
         audience_matches = []
@@ -146,7 +581,36 @@ class RecommendationsService:
             if i + batch_size < len(zones):
                 await asyncio.sleep(0.5)
 
-        scored_zones = []
+        return audience_matches
+
+    def _rank_zones(
+        self, event_data: EventData, zones: List[Zone], audience_matches: List[Any],
+        distances: np.ndarray, distance_scores: np.ndarray, dwell_time_scores: np.ndarray,
+        limit: Optional[int] = None
+    ) -> List[ZoneScore]:
+        """
+        Combine per-zone component scores into sorted ZoneScores
+        (reasoning, data sources, risk warnings and Story 7.4 alternatives included)
+
+        Totals are ranked for every zone first; ZoneScores are only built for
+        the top `limit` zones (all zones if None). Story 7.4 alternatives always
+        score strictly higher than the flagged zone, so they sit inside the top
+        `limit` too and truncating doesn't change them.
+        """
+        # Everything derived from the event alone is computed once, not per zone
+        target_keywords = _target_keywords(event_data.target_audience)
+        event_context = _EventContext(
+            slot=_parse_event_slot(event_data.date, event_data.time),
+            time_period=event_data.time_period or "evening",
+            target_keywords=target_keywords,
+            target_mask=audience_keyword_mask(target_keywords),
+        )
+
+        if zones is not self._data_source_zones:
+            self._data_source_cache = {}
+            self._data_source_zones = zones
+
+        audience_scores = np.empty(len(zones))
         for i, zone in enumerate(zones):
             # Get pre-computed audience match from parallel batch
             result = audience_matches[i]
@@ -154,36 +618,50 @@ class RecommendationsService:
             # Handle exceptions from failed API calls
             if isinstance(result, Exception):
                 logger.warning(f"Claude API failed for zone {zone.id}, using keyword fallback: {result}")
-                audience_match = self._keyword_based_audience_match(event_data.target_audience, zone.audience_signals)
-                match_reasoning = "Keyword-based matching (API unavailable)"
+                audience_scores[i] = _masked_audience_match(
+                    zone.audience_keyword_mask, event_context.target_mask
+                )
             else:
-                audience_match, match_reasoning = result
-            temporal_alignment = self._calculate_temporal_alignment(
-                event_data.date, event_data.time, event_data.event_type, zone.timing_windows
-            )
-            distance_miles = self._calculate_distance(
-                event_data.venue_lat, event_data.venue_lon,
-                zone.coordinates["lat"], zone.coordinates["lon"]
-            )
-            distance_score_val = self._calculate_distance_score(distance_miles)
-            dwell_time_score_val = self._calculate_dwell_time_score(zone.dwell_time_seconds)
-
-            # Calculate weighted total score (0-100)
-            total_score = (
-                audience_match +  # 0-40 points
-                temporal_alignment +  # 0-30 points
-                distance_score_val +  # 0-20 points
-                dwell_time_score_val  # 0-10 points
-            )
+                audience_scores[i] = result[0]
+        temporal_scores = _temporal_scores(
+            self.zones_service.get_zone_arrays(zones), event_context.slot
+        )
+
+        # Weighted total score (0-100): audience 0-40, temporal 0-30,
+        # distance 0-20, dwell time 0-10
+        totals = audience_scores + temporal_scores + distance_scores + dwell_time_scores
+        rounded_totals = [round(total, 1) for total in totals.tolist()]
+
+        # Sort by total_score descending (highest first), ties in zone order
+        ranking = _top_k_indices(
+            np.array(rounded_totals), len(zones) if limit is None else limit
+        ).tolist()
+
+        scored_zones = []
+        flagged_zones = []  # Story 7.4: zones that need alternatives
+        for i in ranking:
+            zone = zones[i]
+            audience_match = float(audience_scores[i])
+            temporal_alignment = float(temporal_scores[i])
+            distance_miles = float(distances[i])
+            if math.isnan(distance_miles):
+                # Skipped by the kernel's latitude prefilter - only needed once ranked
+                distance_miles = self._calculate_distance(
+                    event_data.venue_lat, event_data.venue_lon,
+                    zone.coordinates["lat"], zone.coordinates["lon"]
+                )
 
             # Generate reasoning
             reasoning = self._generate_reasoning(
                 zone, audience_match, temporal_alignment, distance_miles,
-                zone.dwell_time_seconds, event_data
+                zone.dwell_time_seconds, event_data, event_context
             )
 
             # Story 4.10: Detect data sources used for this zone
-            data_sources = self._detect_data_sources(zone, event_data)
+            data_sources = self._data_source_cache.get(zone.id)
+            if data_sources is None:
+                data_sources = self._detect_data_sources(zone, event_data)
+                self._data_source_cache[zone.id] = data_sources
 
             # Story 7.1: Detect deceptive hotspots
             # Story 7.5: Pass temporal_alignment for timing misalignment category
@@ -191,31 +669,33 @@ class RecommendationsService:
                 zone, audience_match, zone.dwell_time_seconds, temporal_alignment
             )
 
-            scored_zones.append(
-                ZoneScore(
-                    zone=zone,
-                    total_score=round(total_score, 1),
-                    audience_match_score=round(audience_match, 1),
-                    temporal_alignment_score=round(temporal_alignment, 1),
-                    distance_score=round(distance_score_val, 1),
-                    dwell_time_score=round(dwell_time_score_val, 1),
-                    distance_miles=round(distance_miles, 2),
-                    reasoning=reasoning,
-                    data_sources=data_sources,
-                    risk_warning=risk_warning,  # Story 7.1
-                )
+            # All fields are computed here from already-validated models, so
+            # skip pydantic validation (model_construct) in this per-zone loop
+            scored_zone = ZoneScore.model_construct(
+                zone=zone,
+                total_score=rounded_totals[i],
+                audience_match_score=round(audience_match, 1),
+                temporal_alignment_score=round(temporal_alignment, 1),
+                distance_score=round(float(distance_scores[i]), 1),
+                dwell_time_score=round(float(dwell_time_scores[i]), 1),
+                distance_miles=round(distance_miles, 2),
+                reasoning=reasoning,
+                data_sources=data_sources,
+                risk_warning=risk_warning,  # Story 7.1
             )
-
-        # Sort by total_score descending (highest first)
-        scored_zones.sort(key=lambda x: x.total_score, reverse=True)
-
-        # Story 7.4: Add alternatives to flagged zones
-        for scored_zone in scored_zones:
-            if scored_zone.risk_warning and scored_zone.risk_warning.is_flagged:
-                alternatives = self._select_alternative_zones(
-                    scored_zone.zone, scored_zones, max_alternatives=3
+            scored_zones.append(scored_zone)
+            if risk_warning and risk_warning.is_flagged:
+                flagged_zones.append(scored_zone)
+
+        # Story 7.4: Add alternatives to flagged zones (nothing to do if none are)
+        if flagged_zones:
+            zone_index = _rank_index(scored_zones)
+            candidate_pool = _unflagged_pool(scored_zones)
+            for scored_zone in flagged_zones:
+                scored_zone.risk_warning.alternative_zones = self._select_alternative_zones(
+                    scored_zone.zone, scored_zones, max_alternatives=3,
+                    zone_index=zone_index, candidate_pool=candidate_pool
                 )
-                scored_zone.risk_warning.alternative_zones = alternatives
 
         return scored_zones
 
@@ -243,57 +723,41 @@ class RecommendationsService:
         if cache_key in self._audience_match_cache:
             return self._audience_match_cache[cache_key]
 
-        prompt = f"""You are an expert in audience targeting and demographics.
-
-Event Target Audience: {', '.join(target_audience)}
+        # Only the audiences vary per call; the instructions are the system prompt
+        prompt = f"""Event Target Audience: {', '.join(target_audience)}
 
 Zone Audience Profile:
 - Demographics: {', '.join(zone_demographics) if zone_demographics else 'None specified'}
 - Interests: {', '.join(zone_interests) if zone_interests else 'None specified'}
-- Behaviors: {', '.join(zone_behaviors) if zone_behaviors else 'None specified'}
-
-Score how well this zone's audience matches the event's target audience on a scale of 0-40 points.
-Consider:
-- Semantic overlap (e.g., "young professionals" matches "coffee enthusiasts")
-- Lifestyle compatibility (e.g., "families" matches "kid-friendly")
-- Demographic alignment
-- Likely shared interests
-
-Respond with ONLY a JSON object (no markdown, no explanation):
-{{"score": <number 0-40>, "reasoning": "<brief 1-sentence explanation>"}}"""
+- Behaviors: {', '.join(zone_behaviors) if zone_behaviors else 'None specified'}"""
 
         try:
-            # Add 30 second timeout to prevent hanging
-            response = await asyncio.wait_for(
-                self.claude_client.messages.create(
+            # Add 35 second timeout to prevent hanging (includes waiting for
+            # a Claude slot, so a burst can't queue a request indefinitely)
+            async with asyncio.timeout(35.0), llm_slot():
+                response = await self.claude_client.messages.create(
                     model="claude-opus-4-6",  # Claude Opus 4.6
                     max_tokens=150,
+                    system=AUDIENCE_MATCH_SYSTEM_PROMPT_V1,
                     messages=[{"role": "user", "content": prompt}],
                     timeout=30.0  # 30 second timeout per API call
-                ),
-                timeout=35.0  # asyncio timeout slightly longer
-            )
+                )
 
             # Parse response
             result_text = response.content[0].text if response.content else ""
 
-            # Extract JSON
-            json_start = result_text.find("{")
-            json_end = result_text.rfind("}") + 1
-            if json_start >= 0 and json_end > json_start:
-                result = json.loads(result_text[json_start:json_end])
-                score = float(result.get("score", 0))
-                reasoning = result.get("reasoning", "")
+            # Extract JSON (first complete object; fences/extra text ignored)
+            result = first_json_value(result_text)
+            score = float(result.get("score", 0))
+            reasoning = result.get("reasoning", "")
 
-                # Clamp score to valid range
-                score = max(0.0, min(40.0, score))
+            # Clamp score to valid range
+            score = max(0.0, min(40.0, score))
 
-                # Cache result
-                self._audience_match_cache[cache_key] = (score, reasoning)
+            # Cache result
+            self._audience_match_cache[cache_key] = (score, reasoning)
 
-                return score, reasoning
-            else:
-                raise ValueError("No valid JSON in response")
+            return score, reasoning
 
         except asyncio.TimeoutError:
             logger.error(f"Claude API timeout after 30s - using keyword fallback")
@@ -309,28 +773,21 @@ Respond with ONLY a JSON object (no markdown, no explanation):
     ) -> float:
         """
         Simple keyword-based fallback for audience matching
-        Used only if Claude API fails
+        Used only if Claude API fails (_masked_audience_match is the same
+        score from precomputed keyword bitmasks)
         """
-        zone_demographics = zone_audience_signals.get("demographics", [])
-        zone_interests = zone_audience_signals.get("interests", [])
-        zone_behaviors = zone_audience_signals.get("behaviors", [])
-        all_zone_signals = zone_demographics + zone_interests + zone_behaviors
+        zone_keywords = audience_keywords(zone_audience_signals)
+        target_keywords = _target_keywords(target_audience)
 
-        if not all_zone_signals or not target_audience:
+        if not zone_keywords or not target_keywords:
             return 0.0
 
-        # Normalize to lowercase
-        target_keywords = set(word.lower() for audience in target_audience for word in audience.split())
-        zone_keywords = set(word.lower() for signal in all_zone_signals for word in signal.split())
-
         # Calculate overlap
-        matches = target_keywords.intersection(zone_keywords)
-        overlap_ratio = len(matches) / max(len(zone_keywords), 1)
+        overlap_ratio = len(target_keywords & zone_keywords) / len(zone_keywords)
 
         # Scale to 0-40 points
         return min(overlap_ratio * 50.0, 40.0)
 
-
     def _calculate_temporal_alignment(
         self, event_date: str, event_time: str, event_type: str,
         timing_windows: Dict[str, Any]
@@ -338,63 +795,30 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         """
         Calculate temporal alignment score (0-30 points)
         Checks if event timing aligns with zone optimal windows
-        """
-        optimal_windows = timing_windows.get("optimal", [])
 
-        if not optimal_windows:
+        Scores a single zone; _temporal_scores applies the same rules to
+        every zone at once when ranking.
+        """
+        parsed_windows = parse_timing_windows(timing_windows)
+        if not parsed_windows:
             return 15.0  # Neutral score if no timing data
 
-        # Parse event date to get day of week
-        try:
-            event_datetime = datetime.fromisoformat(event_date)
-            event_day = event_datetime.strftime("%A")  # e.g., "Monday"
-        except (ValueError, TypeError):
-            return 15.0  # Neutral score if date invalid
-
-        # Parse event time (HH:MM format)
-        try:
-            event_hour = int(event_time.split(":")[0])
-        except (ValueError, IndexError):
-            return 15.0  # Neutral score if time invalid
-
-        # Check if event day/time matches any optimal window
-        best_alignment_score = 0.0
-
-        for window in optimal_windows:
-            window_days = window.get("days", [])
-            window_times = window.get("times", [])
-
-            # Check day match
-            day_match = event_day in window_days
-
-            # Check time match
-            time_match = False
-            for time_range in window_times:
-                # Parse time range (e.g., "17:00-19:00")
-                try:
-                    start_time, end_time = time_range.split("-")
-                    start_hour = int(start_time.split(":")[0])
-                    end_hour = int(end_time.split(":")[0])
-
-                    if start_hour <= event_hour < end_hour:
-                        time_match = True
-                        break
-                except (ValueError, IndexError):
-                    continue
-
-            # Calculate alignment score for this window
-            if day_match and time_match:
-                alignment_score = 30.0  # Perfect match
-            elif day_match:
-                alignment_score = 20.0  # Day matches but not time
-            elif time_match:
-                alignment_score = 15.0  # Time matches but not day
-            else:
-                alignment_score = 5.0  # No match
+        event_slot = _parse_event_slot(event_date, event_time)
+        if event_slot is None:
+            return 15.0  # Neutral score if date/time invalid
+        event_day_bit, event_hour_bit, event_week_bit = event_slot
 
-            best_alignment_score = max(best_alignment_score, alignment_score)
+        # Windows collapsed into week/day/hour bitmasks: scoring is three bit tests
+        week_mask, day_mask, hour_mask = timing_coverage(parsed_windows)
 
-        return best_alignment_score
+        # Best match over all optimal windows
+        if week_mask & event_week_bit:
+            return 30.0  # Perfect match: one window covers both day and time
+        if day_mask & event_day_bit:
+            return 20.0  # Day matches but not time
+        if hour_mask & event_hour_bit:
+            return 15.0  # Time matches but not day
+        return 5.0  # No match
 
     def _calculate_distance(
         self, lat1: float, lon1: float, lat2: float, lon2: float
@@ -404,7 +828,7 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         Uses Haversine formula for accurate geographic distance
         """
         # Earth radius in miles
-        R = 3958.8
+        R = EARTH_RADIUS_MILES
 
         # Convert to radians
         lat1_rad = math.radians(lat1)
@@ -422,6 +846,55 @@ Respond with ONLY a JSON object (no markdown, no explanation):
 
         return distance
 
+    def _calculate_distances(self, lat: float, lon: float, zones: List[Zone]) -> np.ndarray:
+        """
+        Vectorized _calculate_distance from one point to every zone (miles)
+        Returns an array aligned with `zones`
+        """
+        return self.zones_service.distances_miles_from(zones, lat, lon)
+
+    def _calculate_distance_matrix(
+        self, lats: List[float], lons: List[float], zones: List[Zone]
+    ) -> np.ndarray:
+        """
+        _calculate_distances for several points at once (miles)
+        Returns an array of shape (len(lats), len(zones))
+        """
+        if not zones:
+            return np.empty((len(lats), 0))
+
+        arrays = self.zones_service.get_zone_arrays(zones)
+        lat_rad = np.radians(np.asarray(lats, dtype=float))[:, None]
+        lon_rad = np.radians(np.asarray(lons, dtype=float))[:, None]
+
+        # Haversine formula, broadcast over (events, zones)
+        a = (
+            np.sin((arrays.lat_rad[None, :] - lat_rad) / 2) ** 2
+            + np.cos(lat_rad) * arrays.cos_lat[None, :]
+            * np.sin((arrays.lon_rad[None, :] - lon_rad) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    def _score_distances_and_dwell(
+        self, lat: float, lon: float, zones: List[Zone]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Distances (miles), distance scores and dwell-time scores for all zones,
+        aligned with `zones` (see _distance_kernel). Distances of zones too far
+        north/south to score above the minimum are NaN.
+        """
+        if not zones:
+            empty = np.empty(0)
+            return empty, empty, empty
+
+        arrays = self.zones_service.get_zone_arrays(zones)
+        return _distance_kernel(
+            arrays.lat_rad, arrays.lon_rad, arrays.cos_lat, arrays.dwell_time_seconds,
+            math.radians(lat), math.radians(lon), _FAR_LAT_DELTA,
+            _DISTANCE_THRESHOLDS, _DISTANCE_SCORES,
+            _DWELL_THRESHOLDS, _DWELL_SCORES,
+        )
+
     def _calculate_distance_score(self, distance_miles: float) -> float:
         """
         Calculate distance score (0-20 points)
@@ -434,16 +907,8 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         - 5-10 miles: 5 points (far)
         - >10 miles: 2 points (very far)
         """
-        if distance_miles <= 1.0:
-            return 20.0
-        elif distance_miles <= 3.0:
-            return 15.0
-        elif distance_miles <= 5.0:
-            return 10.0
-        elif distance_miles <= 10.0:
-            return 5.0
-        else:
-            return 2.0
+        index = np.searchsorted(_DISTANCE_THRESHOLDS, distance_miles, side="left")
+        return float(_DISTANCE_SCORES[index])
 
     def _calculate_dwell_time_score(self, dwell_time_seconds: int) -> float:
         """
@@ -457,128 +922,60 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         - 20-30 seconds: 4 points (brief attention)
         - <20 seconds: 2 points (rushing past)
         """
-        if dwell_time_seconds >= 60:
-            return 10.0
-        elif dwell_time_seconds >= 45:
-            return 8.0
-        elif dwell_time_seconds >= 30:
-            return 6.0
-        elif dwell_time_seconds >= 20:
-            return 4.0
-        else:
-            return 2.0
+        index = np.searchsorted(_DWELL_THRESHOLDS, dwell_time_seconds, side="right")
+        return float(_DWELL_SCORES[index])
 
     def _detect_data_sources(self, zone: Zone, event_data: EventData) -> List[DataSource]:
         """
         Detect which data sources were used for this zone
         Story 4.10: Show data sources checked for each recommendation
         """
-        sources = []
+        # Check for Metro transit data
+        line_info = zone.metro_line_info
+        sources = [_metro_source(line_info) if line_info is not None else _NO_METRO_SOURCE]
 
-        # Base data updated date (for demo purposes, using recent date)
-        base_date = "2026-02-10"
+        # Check for foot traffic data (from Arlington Open Data, when the zone has it)
+        if zone.foot_traffic_daily is not None:
+            sources.append(_FOOT_TRAFFIC_SOURCE)
 
-        # Check for Metro transit data
-        zone_name_lower = zone.name.lower()
-        if "metro" in zone_name_lower:
-            # Extract line info from name (e.g., "Orange Line", "Blue/Orange/Silver Lines")
-            line_info = "high confidence"
-            if "orange" in zone_name_lower:
-                line_info = "Orange Line, high confidence"
-            elif "blue" in zone_name_lower:
-                line_info = "Blue/Orange/Silver Lines, high confidence"
-
-            sources.append(DataSource(
-                name="Metro transit schedules",
-                status="detected",
-                details=f"Transit access [{line_info}]",
-                last_updated=base_date
-            ))
-        else:
-            sources.append(DataSource(
-                name="Metro transit schedules",
-                status="not_detected",
-                details="No direct Metro access",
-                last_updated=base_date
-            ))
-
-        # Check for foot traffic data (all zones have this from Arlington Open Data)
-        if hasattr(zone, 'foot_traffic_daily') or 'foot_traffic_daily' in zone.dict():
-            sources.append(DataSource(
-                name="Arlington Open Data (foot traffic)",
-                status="detected",
-                details=f"Daily foot traffic patterns monitored",
-                last_updated=base_date
-            ))
-
-        # Check for timing/behavior data
-        if zone.timing_windows and len(zone.timing_windows.get("optimal", [])) > 0:
-            sources.append(DataSource(
-                name="Behavioral timing patterns",
-                status="detected",
-                details=f"Optimal windows identified for target audience",
-                last_updated=base_date
-            ))
+        # Check for timing/behavior data (one parsed entry per optimal window)
+        if zone.parsed_timing_windows:
+            sources.append(_TIMING_SOURCE)
 
         # Check for event competition (placeholder - always show as checked)
-        sources.append(DataSource(
-            name="Event permits database",
-            status="not_detected",
-            details="No competing events detected",
-            last_updated=base_date
-        ))
+        sources.append(_EVENT_PERMITS_SOURCE)
 
         return sources
 
     def _generate_reasoning(
         self, zone: Zone, audience_match: float, temporal_alignment: float,
-        distance_miles: float, dwell_time_seconds: int, event_data: EventData
+        distance_miles: float, dwell_time_seconds: int, event_data: EventData,
+        event_context: Optional[_EventContext] = None
     ) -> str:
         """
         Generate plain-language reasoning for why this zone scored as it did
         Story 4.9: Display transparent reasoning for each recommendation
         Story 6.4: Enhanced with time period behavioral insights
         """
-        reasons = []
-
         # Story 6.4: Get time period behavioral context (most important - goes first!)
-        time_period = event_data.time_period or "evening"
-        time_context = self._get_time_period_behavioral_context(
-            time_period, zone, audience_match
-        )
-        if time_context:
-            reasons.append(time_context)
-
-        # Audience match reasoning
-        if audience_match >= 32:  # 80% of 40 points
-            reasons.append(f"excellent audience match for your target demographics")
-        elif audience_match >= 24:  # 60% of 40 points
-            reasons.append(f"good audience alignment")
-
-        # Distance reasoning
-        if distance_miles < 1:
-            reasons.append(f"very close to venue ({distance_miles:.1f} mi)")
-        elif distance_miles < 3:
-            reasons.append(f"walkable distance ({distance_miles:.1f} mi)")
-
-        # Dwell time reasoning
-        if dwell_time_seconds >= 45:
-            reasons.append(f"high dwell time ({dwell_time_seconds}s) for ad visibility")
-        elif dwell_time_seconds >= 30:
-            reasons.append(f"moderate dwell time ({dwell_time_seconds}s)")
+        if event_context is not None:
+            time_period = event_context.time_period
+        else:
+            time_period = event_data.time_period or "evening"
 
-        # Capitalize first letter of first reason
-        if reasons:
-            reasons[0] = reasons[0][0].upper() + reasons[0][1:]
+        # The sentence only depends on these low-cardinality buckets, so it is
+        # built once per distinct combination and then served from cache
+        audience_bucket = bisect_right(_AUDIENCE_REASON_THRESHOLDS, audience_match)
 
-        # Combine into sentence
-        reasoning = f"{zone.name}: {', '.join(reasons)}."
+        distance_text = f"{distance_miles:.1f}" if distance_miles < 3 else None
+        dwell_key = dwell_time_seconds if dwell_time_seconds >= 30 else None
 
-        return reasoning
+        return _format_reasoning(
+            zone.name, zone.zone_type, time_period, audience_bucket,
+            distance_miles < 1, distance_text, dwell_key
+        )
 
-    def _get_time_period_behavioral_context(
-        self, time_period: str, zone: Zone, audience_match: float
-    ) -> str:
+    def _get_time_period_behavioral_context(self, time_period: str, zone: Zone) -> str:
         """
         Story 6.4: Generate time period behavioral reasoning
 
@@ -588,48 +985,7 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         - Lunch: "Office workers on break, browsing mindset, walkable activities"
         - Evening: "Commuters heading home, weekend planning mode"
         """
-        zone_name_lower = zone.name.lower()
-
-        # Identify zone type for context-specific reasoning
-        is_transit = any(keyword in zone_name_lower for keyword in ["metro", "station", "transit", "ballston", "rosslyn", "clarendon"])
-        is_restaurant = any(keyword in zone_name_lower for keyword in ["restaurant", "dining", "cafe", "coffee", "food"])
-        is_retail = any(keyword in zone_name_lower for keyword in ["retail", "shopping", "store", "shops"])
-
-        # Morning behavioral patterns (6-11am)
-        if time_period == "morning":
-            if is_transit:
-                return "commuters heading to work (7-9am), high attention during morning routine, prime time for weekend event discovery"
-            elif is_restaurant:
-                return "morning coffee crowd, leisurely browsing, receptive to event information"
-            elif is_retail:
-                return "early shoppers with time to browse, unhurried pace, good attention span"
-            else:
-                return "morning foot traffic with routine patterns, consistent daily exposure"
-
-        # Lunch behavioral patterns (11am-2pm)
-        elif time_period == "lunch":
-            if is_transit:
-                return "lunch-hour commuters and office workers, mid-day breaks, good browsing time"
-            elif is_restaurant:
-                return "office workers on lunch break (11am-2pm), browsing mindset, looking for nearby activities"
-            elif is_retail:
-                return "lunch shoppers taking breaks, relaxed pace, receptive to event details"
-            else:
-                return "mid-day crowd with flexible schedule, good dwell time, walkable radius matters"
-
-        # Evening behavioral patterns (5-9pm)
-        elif time_period == "evening":
-            if is_transit:
-                return "commuters heading home (5-7pm), weekend planning mode, repetition builds awareness"
-            elif is_restaurant:
-                return "dinner crowd with leisure time, social mindset, discussing weekend plans"
-            elif is_retail:
-                return "evening shoppers unwinding, browsing for entertainment, receptive to event ideas"
-            else:
-                return "evening foot traffic with leisure mindset, good attention for event details"
-
-        # Fallback (shouldn't happen)
-        return "strategic timing for target audience behavior patterns"
+        return _time_period_behavioral_context(time_period, zone.zone_type)
 
     def _detect_deceptive_hotspot(
         self, zone: Zone, audience_match_score: float, dwell_time_seconds: int,
@@ -645,87 +1001,74 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         Returns:
             RiskWarning with categories if zone is problematic, None otherwise
         """
-        # Get foot traffic data (from zone metadata)
-        foot_traffic_daily = getattr(zone, 'foot_traffic_daily', 0)
-
-        # Check all criteria
-        has_high_traffic = foot_traffic_daily > 1000
         has_low_dwell_time = dwell_time_seconds < 20
         has_poor_audience_match = audience_match_score < 24.0  # <60% of 40 points
         has_timing_misalignment = temporal_alignment_score < 15.0  # <50% of 30 points
 
+        # Visual noise metadata (if zone has it)
+        visual_distractions = getattr(zone, 'visual_distractions', 'medium')
+        advertising_density = getattr(zone, 'advertising_density', 0)
+        has_visual_noise = visual_distractions == "high" or advertising_density > 10
+
+        # Healthy zone: no category can trigger, so skip building any
+        if not (
+            has_low_dwell_time or has_poor_audience_match
+            or has_timing_misalignment or has_visual_noise
+        ):
+            return None
+
+        # Get foot traffic data (from zone metadata; None when not counted)
+        foot_traffic_daily = getattr(zone, 'foot_traffic_daily', None)
+        has_high_traffic = foot_traffic_daily is not None and foot_traffic_daily > 1000
+        audience_match_percent = int((audience_match_score / 40.0) * 100)
+
         # Story 7.5: Determine specific warning categories
         categories = []
 
         if has_low_dwell_time:
-            categories.append(WarningCategory(
-                category_type="low_dwell_time",
-                display_name="Low Dwell Time",
-                icon="⏱️",
-                description=f"People spend only {dwell_time_seconds}s here - may not be enough time to notice ads",
-                severity="high",
-                metric_value=float(dwell_time_seconds)
-            ))
+            categories.append(_LOW_DWELL_TEMPLATE.model_copy(update={
+                "description": f"People spend only {dwell_time_seconds}s here - may not be enough time to notice ads",
+                "metric_value": float(dwell_time_seconds),
+            }))
 
         if has_poor_audience_match:
-            audience_match_percent = int((audience_match_score / 40.0) * 100)
-            categories.append(WarningCategory(
-                category_type="poor_audience_match",
-                display_name="Poor Audience Match",
-                icon="🎯",
-                description=f"Only {audience_match_percent}% audience match - your target audience doesn't often frequent this zone",
-                severity="high",
-                metric_value=float(audience_match_percent)
-            ))
+            categories.append(_POOR_AUDIENCE_TEMPLATE.model_copy(update={
+                "description": f"Only {audience_match_percent}% audience match - your target audience doesn't often frequent this zone",
+                "metric_value": float(audience_match_percent),
+            }))
 
         if has_timing_misalignment:
             timing_percent = int((temporal_alignment_score / 30.0) * 100)
-            categories.append(WarningCategory(
-                category_type="timing_misalignment",
-                display_name="Timing Misalignment",
-                icon="📅",
-                description=f"Only {timing_percent}% timing alignment - people aren't there when you need them",
-                severity="medium",
-                metric_value=float(timing_percent)
-            ))
-
-        # Check for visual noise (if zone has metadata)
-        visual_distractions = getattr(zone, 'visual_distractions', 'medium')
-        advertising_density = getattr(zone, 'advertising_density', 0)
-        if visual_distractions == "high" or advertising_density > 10:
-            categories.append(WarningCategory(
-                category_type="visual_noise",
-                display_name="Visual Noise Saturation",
-                icon="👁️",
-                description=f"High visual clutter - your ad may compete with {advertising_density} others",
-                severity="medium",
-                metric_value=float(advertising_density) if advertising_density > 0 else None
-            ))
-
-        # If no categories triggered, no warning needed
-        if not categories:
-            return None
+            categories.append(_TIMING_MISALIGNMENT_TEMPLATE.model_copy(update={
+                "description": f"Only {timing_percent}% timing alignment - people aren't there when you need them",
+                "metric_value": float(timing_percent),
+            }))
+
+        if has_visual_noise:
+            categories.append(_VISUAL_NOISE_TEMPLATE.model_copy(update={
+                "description": f"High visual clutter - your ad may compete with {advertising_density} others",
+                "metric_value": float(advertising_density) if advertising_density > 0 else None,
+            }))
 
         # Generate overall reason with category names
         category_names = [cat.display_name for cat in categories]
-        reason = f"Multiple risk factors detected: {', '.join(category_names)}. "
+        reason_parts = [f"Multiple risk factors detected: {', '.join(category_names)}. "]
 
         if has_high_traffic:
-            reason += f"High traffic ({foot_traffic_daily}/day) but "
+            reason_parts.append(f"High traffic ({foot_traffic_daily}/day) but ")
 
         if has_low_dwell_time:
-            reason += f"people rush through ({dwell_time_seconds}s). "
+            reason_parts.append(f"people rush through ({dwell_time_seconds}s). ")
 
         if has_poor_audience_match:
-            audience_match_percent = int((audience_match_score / 40.0) * 100)
-            reason += f"Poor audience match ({audience_match_percent}%). "
-
-        reason += "Posters likely to be overlooked."
+            reason_parts.append(f"Poor audience match ({audience_match_percent}%). ")
 
-        # Calculate audience match percentage for details
-        audience_match_percent = int((audience_match_score / 40.0) * 100)
+        reason_parts.append("Posters likely to be overlooked.")
+        reason = "".join(reason_parts)
 
-        return RiskWarning(
+        # Built from values computed above and validated category copies, so
+        # skip re-validating them (model_construct), as for ZoneScore
+        return RiskWarning.model_construct(
             is_flagged=True,
             warning_type="deceptive_hotspot",  # Keep for backward compatibility
             reason=reason.strip(),
@@ -745,7 +1088,9 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         )
 
     def _select_alternative_zones(
-        self, flagged_zone: Zone, all_scored_zones: List[ZoneScore], max_alternatives: int = 3
+        self, flagged_zone: Zone, all_scored_zones: List[ZoneScore], max_alternatives: int = 3,
+        zone_index: Optional[Dict[str, int]] = None,
+        candidate_pool: Optional[Tuple[List[ZoneScore], List[float]]] = None
     ) -> List[Dict[str, Any]]:
         """
         Story 7.4: Select better alternative zones for flagged zone
@@ -756,38 +1101,39 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         3. Better audience match OR better dwell time
         4. Within reasonable distance from venue (prefer similar distance)
 
+        zone_index: zone id -> position in all_scored_zones (see _rank_index)
+        candidate_pool: unflagged zones best-first (see _unflagged_pool)
+        Pass both when selecting for several flagged zones to avoid rescanning.
+
         Returns list of alternatives with reasons why they're better
         """
-        # Find flagged zone's score
-        flagged_zone_data = next(
-            (sz for sz in all_scored_zones if sz.zone.id == flagged_zone.id),
-            None
-        )
+        if zone_index is None:
+            zone_index = _rank_index(all_scored_zones)
+        if candidate_pool is None:
+            candidate_pool = _unflagged_pool(all_scored_zones)
 
-        if not flagged_zone_data:
+        # Find flagged zone's score
+        flagged_position = zone_index.get(flagged_zone.id)
+        if flagged_position is None:
             return []
 
-        flagged_score = flagged_zone_data.total_score
+        flagged_zone_data = all_scored_zones[flagged_position]
 
-        # Filter to unflagged zones with higher scores
-        candidates = [
-            sz for sz in all_scored_zones
-            if (not sz.risk_warning or not sz.risk_warning.is_flagged)
-            and sz.total_score > flagged_score
-            and sz.zone.id != flagged_zone.id
-        ]
+        flagged_score = flagged_zone_data.total_score
 
-        # Sort by total score (best first)
-        candidates.sort(key=lambda x: x.total_score, reverse=True)
+        # Unflagged zones with higher scores: a best-first prefix of the pool
+        unflagged, negated_scores = candidate_pool
+        cutoff = bisect_left(negated_scores, -flagged_score)
+        candidates = islice(
+            (sz for sz in islice(unflagged, cutoff) if sz.zone.id != flagged_zone.id),
+            max_alternatives
+        )
 
         # Take top alternatives
         alternatives = []
-        for candidate in candidates[:max_alternatives]:
+        for candidate in candidates:
             # Find rank (1-indexed)
-            rank = next(
-                (i + 1 for i, sz in enumerate(all_scored_zones) if sz.zone.id == candidate.zone.id),
-                0
-            )
+            rank = zone_index[candidate.zone.id] + 1
 
             # Generate reason why this is better
             reasons = []
@@ -3,19 +3,42 @@ Usage Tracking Service
 Track API usage per user to enforce quotas and prevent abuse
 """
 
+import asyncio
+import contextlib
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from app.supabase_client import get_supabase_client
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
+from cachetools import TTLCache
+from app.supabase_client import get_supabase_client, execute_async
 
 logger = logging.getLogger(__name__)
 
+# Usage events are queued and inserted in batches by a background task
+USAGE_FLUSH_BATCH_SIZE = 100
+USAGE_FLUSH_INTERVAL = 0.5  # seconds to let a batch accumulate
+
+# How long a daily-limit count is trusted before re-querying the database
+USAGE_COUNT_TTL = 10  # seconds
+
 
 class UsageTracker:
     """Track and enforce usage limits per user"""
 
     def __init__(self):
         self.supabase = get_supabase_client()
+        # Rows waiting for the background writer (created on first use, inside the loop)
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        # (user_id, operation_type) -> queued rows not yet written, so limit
+        # checks count events the database hasn't seen yet
+        self._pending_counts: Dict[Tuple[str, str], int] = {}
+        # (user_id, operation_type) -> last-24h count, bumped by log_usage so it
+        # stays exact between database queries
+        self._usage_counts: TTLCache = TTLCache(maxsize=100_000, ttl=USAGE_COUNT_TTL)
+        # (monotonic time computed, ISO start of the 24h window) - a second
+        # of staleness doesn't matter for a daily limit
+        self._yesterday_cache: Tuple[float, str] = (float("-inf"), "")
 
     async def log_usage(
         self,
@@ -27,6 +50,9 @@ class UsageTracker:
         """
         Log usage event for a user
 
+        The row is queued and written by a background task in batches, so
+        the caller doesn't wait on a database round-trip.
+
         Args:
             user_id: Clerk user ID
             operation_type: Type of operation (analyze, recommend, save, etc.)
@@ -34,7 +60,7 @@ class UsageTracker:
             metadata: Additional metadata (file size, processing time, etc.)
 
         Returns:
-            True if logged successfully
+            True if queued successfully
         """
         try:
             data = {
@@ -42,20 +68,87 @@ class UsageTracker:
                 "operation_type": operation_type,
                 "cost_estimate": cost_estimate,
                 "metadata": metadata or {},
-                "created_at": datetime.utcnow().isoformat()
+                "created_at": datetime.now(timezone.utc).isoformat()
             }
 
-            result = self.supabase.table("usage_logs").insert(data).execute()
+            if self._flusher_task is None or self._flusher_task.done():
+                if self._queue is None:
+                    self._queue = asyncio.Queue()
+                self._flusher_task = asyncio.create_task(self._flush_loop())
 
-            if result.data:
-                logger.info(f"Logged usage: {operation_type} for user {user_id}")
-                return True
-            return False
+            key = (user_id, operation_type)
+            self._pending_counts[key] = self._pending_counts.get(key, 0) + 1
+            cached_count = self._usage_counts.get(key)
+            if cached_count is not None:
+                self._usage_counts[key] = cached_count + 1
+            self._queue.put_nowait(data)
+            return True
 
         except Exception as e:
             logger.error(f"Failed to log usage: {str(e)}")
             return False
 
+    async def _flush_loop(self) -> None:
+        """
+        Background writer: insert queued usage rows in batches
+        """
+        while True:
+            rows = [await self._queue.get()]
+            try:
+                await asyncio.sleep(USAGE_FLUSH_INTERVAL)
+                while len(rows) < USAGE_FLUSH_BATCH_SIZE and not self._queue.empty():
+                    rows.append(self._queue.get_nowait())
+            finally:
+                # Shielded so a shutdown cancel doesn't drop rows already taken
+                await asyncio.shield(self._write_rows(rows))
+
+    async def _write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert a batch of usage rows, then release their pending counts
+        """
+        try:
+            result = await execute_async(self.supabase.table("usage_logs").insert(rows))
+            if result.data:
+                logger.info(f"Logged {len(rows)} usage events")
+        except Exception as e:
+            logger.error(f"Failed to log usage: {str(e)}")
+        finally:
+            for row in rows:
+                key = (row["user_id"], row["operation_type"])
+                remaining = self._pending_counts.get(key, 0) - 1
+                if remaining > 0:
+                    self._pending_counts[key] = remaining
+                else:
+                    self._pending_counts.pop(key, None)
+
+    async def flush(self) -> None:
+        """
+        Stop the background writer and write any queued usage rows (app shutdown)
+        """
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher_task
+            self._flusher_task = None
+
+        if self._queue is not None:
+            rows = []
+            while not self._queue.empty():
+                rows.append(self._queue.get_nowait())
+            if rows:
+                await self._write_rows(rows)
+
+    def _window_start(self) -> str:
+        """
+        ISO timestamp 24 hours ago, recomputed at most once per second
+        """
+        now = time.monotonic()
+        computed_at, yesterday = self._yesterday_cache
+        if now - computed_at >= 1.0:
+            yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+            self._yesterday_cache = (now, yesterday)
+        return yesterday
+
     async def check_daily_limit(
         self,
         user_id: str,
@@ -74,17 +167,25 @@ class UsageTracker:
             (under_limit: bool, usage_count: int)
         """
         try:
-            # Get count of operations in last 24 hours
-            yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
+            key = (user_id, operation_type)
+            usage_count = self._usage_counts.get(key)
+
+            if usage_count is None:
+                # Get count of operations in last 24 hours
+                yesterday = self._window_start()
+
+                result = await execute_async(
+                    self.supabase.table("usage_logs")
+                    .select("id", count="exact")
+                    .eq("user_id", user_id)
+                    .eq("operation_type", operation_type)
+                    .gte("created_at", yesterday)
+                )
 
-            result = self.supabase.table("usage_logs")\
-                .select("*", count="exact")\
-                .eq("user_id", user_id)\
-                .eq("operation_type", operation_type)\
-                .gte("created_at", yesterday)\
-                .execute()
+                # Include this process's queued events not yet written
+                usage_count = (result.count or 0) + self._pending_counts.get(key, 0)
+                self._usage_counts[key] = usage_count
 
-            usage_count = result.count or 0
             under_limit = usage_count < daily_limit
 
             if not under_limit:
@@ -111,38 +212,20 @@ class UsageTracker:
             Dictionary with usage stats (total operations, cost, breakdown by type)
         """
         try:
-            # Get all usage logs for user
-            result = self.supabase.table("usage_logs")\
-                .select("*")\
-                .eq("user_id", user_id)\
-                .execute()
-
-            logs = result.data or []
-
-            # Calculate stats
-            total_operations = len(logs)
-            total_cost = sum(log.get("cost_estimate", 0) for log in logs)
-
-            # Breakdown by operation type
-            breakdown = {}
-            for log in logs:
-                op_type = log.get("operation_type", "unknown")
-                breakdown[op_type] = breakdown.get(op_type, 0) + 1
-
-            # Last 24 hours
-            yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
-            recent_logs = [
-                log for log in logs
-                if log.get("created_at", "") > yesterday
-            ]
+            # Aggregated in Postgres (migration 009) instead of fetching every log
+            result = self.supabase.rpc(
+                "get_user_usage_stats", {"p_user_id": user_id}
+            ).execute()
+
+            stats = result.data[0] if result.data else {}
 
             return {
-                "total_operations": total_operations,
-                "total_cost_usd": round(total_cost, 4),
-                "operations_last_24h": len(recent_logs),
-                "breakdown": breakdown,
-                "first_use": logs[0].get("created_at") if logs else None,
-                "last_use": logs[-1].get("created_at") if logs else None,
+                "total_operations": stats.get("total_operations") or 0,
+                "total_cost_usd": round(float(stats.get("total_cost_usd") or 0), 4),
+                "operations_last_24h": stats.get("operations_last_24h") or 0,
+                "breakdown": stats.get("breakdown") or {},
+                "first_use": stats.get("first_use"),
+                "last_use": stats.get("last_use"),
             }
 
         except Exception as e:
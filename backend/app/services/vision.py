@@ -3,30 +3,231 @@ Story 3.2: OpenAI Vision API Integration for Event Extraction
 Analyzes uploaded flyers with OpenAI Vision API to extract event details
 """
 
-import os
+import asyncio
 import base64
+import hashlib
 import logging
+import os
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
-import anthropic
+from io import BytesIO
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, List, NamedTuple, Optional, Tuple
 import httpx
+import ijson
+from cachetools import TTLCache
 from dotenv import load_dotenv
-import asyncio
+from PIL import Image
+from app.http_client import AsyncByteReader, get_anthropic_client, llm_slot
+
+if TYPE_CHECKING:
+    import anthropic
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Anthropic client for Claude Opus 4.6
-def get_anthropic_client() -> anthropic.AsyncAnthropic:
-    """Get or create Anthropic Claude client"""
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
-    return anthropic.AsyncAnthropic(api_key=api_key)
+# Longest edge (px) for flyers sent to Claude - it downsamples anything larger
+# server-side, so this keeps small print legible while dropping wasted bytes
+FLYER_MAX_EDGE = 1568
+FLYER_JPEG_QUALITY = 85
+# Uploads at or under this size that already fit FLYER_MAX_EDGE are sent as-is
+FLYER_REENCODE_MIN_BYTES = 500_000
+_FLYER_MEDIA_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png"}
+
+# Output cap for the extraction tool call - a filled-in schema is ~150 tokens,
+# and a lower cap shortens worst-case generation time
+FLYER_MAX_TOKENS = 300
+
+
+class VisionTimeouts(NamedTuple):
+    """
+    Per-stage time budgets (seconds) for one flyer analysis
+    """
+    encode: float  # resize + base64 (worker thread)
+    llm: float  # Claude call, including the wait for a shared slot
+    total: float  # whole analysis; the Claude call gets whatever encode left
+
+
+# Story 3.2 AC: response within 45 seconds
+VISION_TIMEOUTS = VisionTimeouts(
+    encode=float(os.getenv("FLYER_ENCODE_TIMEOUT", "10")),
+    llm=float(os.getenv("FLYER_LLM_TIMEOUT", "40")),
+    total=float(os.getenv("FLYER_TOTAL_TIMEOUT", "45")),
+)
+
+# Successful analyses cached by content hash (re-uploads skip the Claude call)
+FLYER_CACHE_SIZE = 256
+FLYER_CACHE_TTL_SECONDS = 24 * 60 * 60
+_analysis_cache: TTLCache = TTLCache(maxsize=FLYER_CACHE_SIZE, ttl=FLYER_CACHE_TTL_SECONDS)
+
+# Flyer extraction instructions. Kept as a frozen constant (no formatting) so
+# tools + system form an identical prefix on every call and only the image
+# varies; bump the version suffix when changing it rather than editing in place.
+FLYER_SYSTEM_PROMPT_V1 = """You extract event details from flyer images for a community events app.
+Analyze the event flyer image the user sends and report the event information with the report_flyer_details tool.
+
+Target audience should describe who would be interested in this event (e.g., "young professionals", "families", "students", "fitness enthusiasts", "foodies", "coffee enthusiasts").
+
+If any information is unclear or missing, note it briefly in extraction_notes and mark confidence as Medium or Low."""
+
+# Structured extraction schema; the tool is forced so the reply is always
+# a decoded dict rather than free text that has to be searched for JSON
+FLYER_EXTRACTION_TOOL = {
+    "name": "report_flyer_details",
+    "description": "Report the event details extracted from the flyer",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "event_name": {"type": "string", "description": "Name of the event"},
+            "event_date": {
+                "type": "string",
+                "description": "Date of the event (ISO format YYYY-MM-DD if possible, otherwise as text)",
+            },
+            "event_time": {
+                "type": "string",
+                "description": "Time of the event (e.g., '7:00 PM', '2-5 PM')",
+            },
+            "venue": {"type": "string", "description": "Venue name and/or address"},
+            "target_audience": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Audience types interested in this event",
+            },
+            "confidence": {"type": "string", "enum": ["High", "Medium", "Low"]},
+            "extraction_notes": {
+                "type": "string",
+                "description": "One short sentence on warnings or missing information (empty if none)",
+            },
+        },
+        "required": [
+            "event_name", "event_date", "event_time", "venue",
+            "target_audience", "confidence", "extraction_notes",
+        ],
+        "additionalProperties": False,
+    },
+}
+# Scalar fields stream_flyer_fields reports as soon as their value is complete
+_STREAMED_STRING_FIELDS = frozenset(
+    ["event_name", "event_date", "event_time", "venue", "confidence", "extraction_notes"]
+)
+FLYER_REQUIRED_FIELDS = frozenset(
+    ["event_name", "event_date", "event_time", "venue", "target_audience"]
+)
+
+
+def _prepare_flyer_image(raw: bytes, max_edge: int = FLYER_MAX_EDGE) -> Tuple[bytes, str]:
+    """
+    Downscale and JPEG-recompress a flyer before base64-encoding it
+
+    A 5MB phone photo becomes ~7MB of base64 text; shrinking first cuts the
+    request payload and the str allocation by an order of magnitude.
+
+    Small uploads that already fit are passed through untouched - re-encoding
+    them saves nothing and would add JPEG artifacts to crisp PNG text.
+
+    Returns:
+        (image_bytes, media_type)
+    """
+    with Image.open(BytesIO(raw)) as image:
+        # Header-only checks; pixel data isn't decoded unless we resize
+        media_type = _FLYER_MEDIA_TYPES.get(image.format)
+        if media_type and len(raw) <= FLYER_REENCODE_MIN_BYTES and max(image.size) <= max_edge:
+            return raw, media_type
+
+        image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        buf = BytesIO()
+        image.save(buf, format="JPEG", quality=FLYER_JPEG_QUALITY, optimize=True)
+    return buf.getvalue(), "image/jpeg"
+
+
+def _flyer_request(image_base64: str, media_type: str) -> Dict[str, Any]:
+    """
+    Messages API parameters for extracting event details from one flyer
+    """
+    return dict(
+        model="claude-opus-4-6",  # Claude Opus 4.6
+        max_tokens=FLYER_MAX_TOKENS,
+        tools=[FLYER_EXTRACTION_TOOL],
+        # Forcing the tool makes Claude return schema-conforming input
+        tool_choice={"type": "tool", "name": FLYER_EXTRACTION_TOOL["name"]},
+        system=FLYER_SYSTEM_PROMPT_V1,
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": media_type,
+                            "data": image_base64,
+                        },
+                    },
+                ],
+            }
+        ],
+    )
+
+
+def _flyer_result(response: "anthropic.types.Message", started: float) -> Dict[str, Any]:
+    """
+    Validate and normalize the extraction tool call from a finished response,
+    logging duration and cost
+
+    Raises:
+        VisionAnalysisError: If the response has no usable tool call
+    """
+    if response.stop_reason == "max_tokens":
+        logger.warning(
+            f"Flyer extraction hit max_tokens={FLYER_MAX_TOKENS} "
+            f"({response.usage.output_tokens} output tokens)"
+        )
+
+    # The forced tool call carries the already-decoded extraction
+    result = next(
+        (block.input for block in response.content if block.type == "tool_use"),
+        None,
+    )
+    if not isinstance(result, dict) or not FLYER_REQUIRED_FIELDS.issubset(result):
+        logger.error(f"Claude returned no structured flyer details: {str(response.content)[:200]}")
+        raise VisionAnalysisError(
+            "AI extraction returned invalid data. Please enter event details manually."
+        )
+
+    # Ensure confidence is set
+    if result.get("confidence") not in ("High", "Medium", "Low"):
+        result["confidence"] = "Medium"
+
+    # Ensure extraction_notes is set
+    result.setdefault("extraction_notes", "")
+
+    # Story 3.2 AC: API costs logged
+    duration = time.perf_counter() - started
+    # Claude API uses input_tokens + output_tokens instead of total_tokens
+    tokens_used = (response.usage.input_tokens + response.usage.output_tokens) if response.usage else 0
+    logger.info(
+        f"Flyer analysis complete in {duration:.2f}s using {tokens_used} tokens"
+    )
+    # Claude Opus pricing: $15/1M input, $75/1M output tokens
+    input_cost = (response.usage.input_tokens * 0.000015) if response.usage else 0
+    output_cost = (response.usage.output_tokens * 0.000075) if response.usage else 0
+    logger.info(f"Estimated cost: ${(input_cost + output_cost):.4f}")
+
+    return result
+
+
+async def _stream_message(
+    client: "anthropic.AsyncAnthropic", **params: Any
+) -> "anthropic.types.Message":
+    """
+    Run a Messages request over the streaming API (inside a shared Claude
+    slot) and return the final message
+    """
+    async with llm_slot(), client.messages.stream(**params) as stream:
+        return await stream.get_final_message()
 
 
 class VisionAnalysisError(Exception):
@@ -35,8 +236,139 @@ class VisionAnalysisError(Exception):
     pass
 
 
+async def _encode_flyer(file_content: bytes, file_type: str) -> Tuple[str, str]:
+    """
+    Check the upload type, then downscale and base64-encode the flyer for Claude
+
+    Returns:
+        (image_base64, media_type)
+
+    Raises:
+        VisionAnalysisError: If the file type is unsupported or the image can't be read
+    """
+    # Check file type
+    if file_type == "application/pdf":
+        logger.warning("PDF upload detected - not supported")
+        raise VisionAnalysisError(
+            "PDF files are not supported. Please convert to JPG or PNG and try again."
+        )
+    elif file_type not in ["image/jpeg", "image/png"]:
+        raise VisionAnalysisError(f"Unsupported file type: {file_type}")
+
+    # Resize off the event loop, then encode the (much smaller) image for Claude
+    try:
+        image_bytes, media_type = await asyncio.to_thread(
+            _prepare_flyer_image, file_content
+        )
+    except Exception as e:
+        logger.error(f"Failed to decode flyer image: {str(e)}")
+        raise VisionAnalysisError(
+            "Could not read the uploaded image. Please upload a valid JPG or PNG."
+        )
+    image_base64 = base64.b64encode(image_bytes).decode('ascii')
+
+    return image_base64, media_type
+
+
+def _flyer_timeouts(timeout: Optional[float]) -> VisionTimeouts:
+    """
+    VISION_TIMEOUTS, with `total` overridden by a caller-supplied timeout
+    """
+    return VISION_TIMEOUTS if timeout is None else VISION_TIMEOUTS._replace(total=timeout)
+
+
+async def _encode_within(
+    file_content: bytes, file_type: str, timeouts: VisionTimeouts
+) -> Tuple[str, str]:
+    """
+    _encode_flyer bounded by the encode budget (and never past the total)
+    """
+    try:
+        return await asyncio.wait_for(
+            _encode_flyer(file_content, file_type),
+            timeout=min(timeouts.encode, timeouts.total),
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"Flyer encoding timed out after {timeouts.encode} seconds")
+        raise VisionAnalysisError(
+            "AI extraction timed out. Please try again or enter event details manually."
+        )
+
+
+def _llm_budget(timeouts: VisionTimeouts, started: float) -> float:
+    """
+    Seconds the Claude call may take: the llm budget, capped by what is left
+    of the total since `started` (a time.perf_counter() value)
+
+    Raises:
+        VisionAnalysisError: If the total budget is already spent
+    """
+    remaining = timeouts.total - (time.perf_counter() - started)
+    if remaining <= 0:
+        logger.error(f"Flyer analysis exceeded {timeouts.total} seconds before the Claude call")
+        raise VisionAnalysisError(
+            "AI extraction timed out. Please try again or enter event details manually."
+        )
+    return min(timeouts.llm, remaining)
+
+
+async def _extract_flyer_details(
+    image_base64: str, media_type: str, timeout: float
+) -> Dict[str, Any]:
+    """
+    Extract event details from an encoded flyer with Claude (see analyze_flyer)
+
+    Raises:
+        VisionAnalysisError: If API call fails or times out
+    """
+    # Deferred so importing this module doesn't load the SDK (already cached
+    # in sys.modules once get_anthropic_client has run)
+    import anthropic
+
+    try:
+        started = time.perf_counter()
+        logger.info(f"Starting flyer analysis at {datetime.now().isoformat()}")
+
+        # Use Claude Opus 4.6 Vision API to analyze the flyer image directly
+        logger.info("Analyzing flyer with Claude Opus 4.6 Vision...")
+
+        try:
+            # SDK retries (backing off on 429s) still end at the caller's
+            # deadline - wait_for bounds the slot wait and every attempt
+            client = get_anthropic_client().with_options(timeout=timeout)
+            # Streamed so the response arrives as it is generated rather than
+            # after an idle wait; cancelling on timeout closes the stream
+            response = await asyncio.wait_for(
+                _stream_message(client, **_flyer_request(image_base64, media_type)),
+                timeout=timeout,
+            )
+        except (anthropic.APITimeoutError, asyncio.TimeoutError):
+            logger.error(f"Claude API call timed out after {timeout:.1f} seconds")
+            raise VisionAnalysisError(
+                "AI extraction timed out. Please try again or enter event details manually."
+            )
+
+        return _flyer_result(response, started)
+
+    except VisionAnalysisError:
+        # Re-raise our custom errors
+        raise
+    except httpx.TimeoutException:
+        # Story 3.2 AC: Errors logged with fallback message
+        logger.error("HTTP timeout during OpenAI API call")
+        raise VisionAnalysisError(
+            "Connection timed out. Please check your network and try again."
+        )
+    except Exception as e:
+        # Story 3.2 AC: Errors logged with fallback message
+        logger.error(f"Unexpected error during flyer analysis: {str(e)}")
+        raise VisionAnalysisError(
+            "AI extraction unavailable. Please enter event details manually."
+        )
+
+
 async def analyze_flyer(
-    file_content: bytes, file_type: str, timeout: float = 45.0
+    file_content: bytes, file_type: str, timeout: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Analyze uploaded flyer using Claude Opus 4.6 Vision API
@@ -52,7 +384,9 @@ async def analyze_flyer(
     Args:
         file_content: Raw bytes of the uploaded file
         file_type: MIME type (e.g., 'image/jpeg', 'image/png', 'application/pdf')
-        timeout: Maximum time to wait for API response (default 45 seconds)
+        timeout: Total time budget in seconds (default VISION_TIMEOUTS.total,
+            45s); encoding and the Claude call also have their own
+            VISION_TIMEOUTS budgets within it
 
     Returns:
         Dict containing:
@@ -67,162 +401,103 @@ async def analyze_flyer(
     Raises:
         VisionAnalysisError: If API call fails or times out
     """
-    try:
-        start_time = datetime.now()
-        logger.info(f"Starting flyer analysis at {start_time.isoformat()}")
-
-        # Check file type
-        if file_type == "application/pdf":
-            logger.warning("PDF upload detected - not supported")
-            raise VisionAnalysisError(
-                "PDF files are not supported. Please convert to JPG or PNG and try again."
-            )
-        elif file_type not in ["image/jpeg", "image/png"]:
-            raise VisionAnalysisError(f"Unsupported file type: {file_type}")
-
-        # Use Claude Opus 4.6 Vision API to analyze the flyer image directly
-        logger.info("Analyzing flyer with Claude Opus 4.6 Vision...")
+    return await _analyze_cached(file_content, file_type, _flyer_timeouts(timeout))
 
-        # Encode image to base64 for Claude
-        image_base64 = base64.b64encode(file_content).decode('utf-8')
 
-        # Determine media type
-        media_type = "image/jpeg" if file_type == "image/jpeg" else "image/png"
-
-        prompt = """Analyze this event flyer image and extract event information in JSON format.
-
-Return ONLY a JSON object (no markdown, no explanation) with this structure:
-{{
-  "event_name": "Name of the event",
-  "event_date": "Date of the event (convert to ISO format YYYY-MM-DD if possible, otherwise return as text)",
-  "event_time": "Time of the event (e.g., '7:00 PM', '2-5 PM')",
-  "venue": "Venue name and/or address",
-  "target_audience": ["List", "of", "audience", "types"],
-  "confidence": "High|Medium|Low",
-  "extraction_notes": "Any warnings or missing information"
-}}
-
-Target audience should describe who would be interested in this event (e.g., "young professionals", "families", "students", "fitness enthusiasts", "foodies", "coffee enthusiasts").
+def _cache_key(file_content: bytes, file_type: str) -> bytes:
+    """
+    _analysis_cache key: the MIME type plus a content hash
+    """
+    return file_type.encode() + hashlib.blake2b(file_content, digest_size=16).digest()
 
-If any information is unclear or missing, note it in extraction_notes and mark confidence as Medium or Low.
 
-Analyze the visual design, readability, and overall quality of the flyer as well."""
+async def _analyze_cached(
+    file_content: bytes, file_type: str, timeouts: VisionTimeouts
+) -> Dict[str, Any]:
+    """
+    analyze_flyer with the content-hash cache
+    """
+    cache_key = _cache_key(file_content, file_type)
+    cached = _analysis_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Flyer analysis served from cache")
+        return dict(cached)
 
-        try:
-            client = get_anthropic_client()
-            response = await asyncio.wait_for(
-                client.messages.create(
-                    model="claude-opus-4-6",  # Claude Opus 4.6
-                    max_tokens=1024,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "image",
-                                    "source": {
-                                        "type": "base64",
-                                        "media_type": media_type,
-                                        "data": image_base64,
-                                    },
-                                },
-                                {
-                                    "type": "text",
-                                    "text": prompt
-                                }
-                            ],
-                        }
-                    ],
-                ),
-                timeout=timeout,
-            )
-        except asyncio.TimeoutError:
-            logger.error(f"Claude API call timed out after {timeout} seconds")
-            raise VisionAnalysisError(
-                "AI extraction timed out. Please try again or enter event details manually."
-            )
+    started = time.perf_counter()
+    image_base64, media_type = await _encode_within(file_content, file_type, timeouts)
+    result = await _extract_flyer_details(
+        image_base64, media_type, _llm_budget(timeouts, started)
+    )
 
-        # Extract response text from Claude
-        content = response.content[0].text if response.content else None
-        if not content:
-            raise VisionAnalysisError("No response from Claude vision analysis")
+    _analysis_cache[cache_key] = result
+    return dict(result)
 
-        # Parse JSON response
-        import json
 
-        try:
-            # Try to find JSON in the response (GPT sometimes adds explanation before/after)
-            json_start = content.find("{")
-            json_end = content.rfind("}") + 1
-            if json_start >= 0 and json_end > json_start:
-                json_str = content[json_start:json_end]
-                result = json.loads(json_str)
-            else:
-                raise ValueError("No JSON found in response")
-
-            # Validate required fields
-            required_fields = [
-                "event_name",
-                "event_date",
-                "event_time",
-                "venue",
-                "target_audience",
-            ]
-            for field in required_fields:
-                if field not in result:
-                    result[field] = (
-                        "" if field != "target_audience" else []
-                    )  # Provide defaults
-
-            # Ensure confidence is set
-            if "confidence" not in result or result["confidence"] not in [
-                "High",
-                "Medium",
-                "Low",
-            ]:
-                result["confidence"] = "Medium"
-
-            # Ensure extraction_notes is set
-            if "extraction_notes" not in result:
-                result["extraction_notes"] = ""
-
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"Failed to parse AI response as JSON: {content[:200]}")
-            raise VisionAnalysisError(
-                "AI extraction returned invalid data. Please enter event details manually."
-            )
+async def stream_flyer_fields(
+    file_content: bytes, file_type: str, timeout: Optional[float] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Analyze a flyer like analyze_flyer, yielding each field as soon as Claude
+    has generated it
 
-        # Story 3.2 AC: API costs logged
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        # Claude API uses input_tokens + output_tokens instead of total_tokens
-        tokens_used = (response.usage.input_tokens + response.usage.output_tokens) if response.usage else 0
-        logger.info(
-            f"Flyer analysis complete in {duration:.2f}s using {tokens_used} tokens"
-        )
-        # Claude Opus pricing: $15/1M input, $75/1M output tokens
-        input_cost = (response.usage.input_tokens * 0.000015) if response.usage else 0
-        output_cost = (response.usage.output_tokens * 0.000075) if response.usage else 0
-        logger.info(f"Estimated cost: ${(input_cost + output_cost):.4f}")
+    The tool-call JSON is parsed incrementally (ijson) as it streams in, so
+    event_name can be shown while later fields are still being generated.
 
-        return result
+    Yields:
+        {"field": name, "value": value} per extracted field (target_audience
+        once its list is complete), then {"result": dict} - the same
+        validated dict analyze_flyer returns
 
-    except VisionAnalysisError:
-        # Re-raise our custom errors
-        raise
-    except httpx.TimeoutException:
-        # Story 3.2 AC: Errors logged with fallback message
-        logger.error("HTTP timeout during OpenAI API call")
+    Raises:
+        VisionAnalysisError: If the file is unsupported, the call fails or a
+        stage runs past its VISION_TIMEOUTS budget (`timeout` overrides the
+        total, as for analyze_flyer)
+    """
+    cache_key = _cache_key(file_content, file_type)
+    cached = _analysis_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Flyer analysis served from cache")
+        for field, value in cached.items():
+            yield {"field": field, "value": value}
+        yield {"result": dict(cached)}
+        return
+
+    timeouts = _flyer_timeouts(timeout)
+    started = time.perf_counter()
+    image_base64, media_type = await _encode_within(file_content, file_type, timeouts)
+    llm_timeout = _llm_budget(timeouts, started)
+
+    import anthropic
+
+    client = get_anthropic_client().with_options(timeout=llm_timeout)
+    try:
+        async with asyncio.timeout(llm_timeout), llm_slot():
+            async with client.messages.stream(**_flyer_request(image_base64, media_type)) as stream:
+                tool_json = (
+                    event.partial_json.encode()
+                    async for event in stream
+                    if event.type == "input_json"
+                )
+                audience: List[str] = []
+                async for prefix, event, value in ijson.parse_async(AsyncByteReader(tool_json)):
+                    if prefix == "target_audience.item" and event == "string":
+                        audience.append(value)
+                    elif prefix == "target_audience" and event == "end_array":
+                        yield {"field": "target_audience", "value": audience}
+                    elif prefix in _STREAMED_STRING_FIELDS and event == "string":
+                        yield {"field": prefix, "value": value}
+                response = await stream.get_final_message()
+    except (anthropic.APITimeoutError, TimeoutError):
+        logger.error(f"Claude API call timed out after {llm_timeout:.1f} seconds")
         raise VisionAnalysisError(
-            "Connection timed out. Please check your network and try again."
+            "AI extraction timed out. Please try again or enter event details manually."
         )
     except Exception as e:
-        # Story 3.2 AC: Errors logged with fallback message
-        logger.error(f"Unexpected error during flyer analysis: {str(e)}")
+        logger.error(f"Unexpected error during streamed flyer analysis: {str(e)}")
         raise VisionAnalysisError(
             "AI extraction unavailable. Please enter event details manually."
         )
 
-
-# Import asyncio for timeout handling
-import asyncio
+    result = _flyer_result(response, started)
+    _analysis_cache[cache_key] = result
+    yield {"result": dict(result)}
@@ -4,18 +4,161 @@ Handles loading and serving placement zone data for Arlington, VA
 Enhanced with dynamic zone generation from Google Places + Arlington Parking
 """
 
-import json
+import asyncio
 import os
+import re
+import hashlib
 import logging
+import math
+import threading
+import aiofiles
+import ijson
+import orjson
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+import numpy as np
 from datetime import datetime, timedelta
-from pydantic import BaseModel, Field
-from app.supabase_client import get_supabase_client
+from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter
+from app.supabase_client import get_supabase_client, execute_async
 
 logger = logging.getLogger(__name__)
 
 
+WEEKDAY_BITS = {
+    day: 1 << index
+    for index, day in enumerate(
+        ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    )
+}
+
+
+# "HH:MM-HH:MM"; only the hours are used for alignment
+_TIME_RANGE_RE = re.compile(r"(\d{1,2}):[0-5]\d-(\d{1,2}):[0-5]\d")
+
+
+def parse_timing_windows(timing_windows: Dict[str, Any]) -> List[Tuple[int, int]]:
+    """
+    Parse optimal timing windows into (day_bitmask, hour_bitmask) pairs
+
+    Day bits follow datetime.weekday() (Monday = bit 0); hour bit h is set when
+    a "HH:MM-HH:MM" range covers start_hour <= h < end_hour.
+
+    Raises:
+        ValueError: If a day name or time range is malformed
+    """
+    parsed = []
+    for window in timing_windows.get("optimal", []):
+        day_mask = 0
+        for day in window.get("days", []):
+            if day not in WEEKDAY_BITS:
+                raise ValueError(f"Unknown day in timing window: {day!r}")
+            day_mask |= WEEKDAY_BITS[day]
+
+        hour_mask = 0
+        for time_range in window.get("times", []):
+            match = _TIME_RANGE_RE.fullmatch(time_range) if isinstance(time_range, str) else None
+            if match is None:
+                raise ValueError(f"Malformed time range in timing window: {time_range!r}")
+            start_hour, end_hour = int(match.group(1)), int(match.group(2))
+            if start_hour > 23 or end_hour > 24:
+                raise ValueError(f"Hour out of range in timing window: {time_range!r}")
+            for hour in range(start_hour, end_hour):
+                hour_mask |= 1 << hour
+
+        parsed.append((day_mask, hour_mask))
+    return parsed
+
+
+def timing_coverage(parsed_windows: List[Tuple[int, int]]) -> Tuple[int, int, int]:
+    """
+    Collapse parsed timing windows into (week_mask, day_mask, hour_mask)
+
+    week_mask has bit day * 24 + hour set for every (day, hour) covered by a
+    single window; day_mask and hour_mask OR together all windows' day and
+    hour masks.
+    """
+    week_mask = day_mask = hour_mask = 0
+    for window_days, window_hours in parsed_windows:
+        day_mask |= window_days
+        hour_mask |= window_hours
+        for day in range(7):
+            if window_days >> day & 1:
+                week_mask |= window_hours << (day * 24)
+    return week_mask, day_mask, hour_mask
+
+
+# Zone-type keywords matched against the lowercased zone name, in priority order
+ZONE_TYPE_KEYWORDS = (
+    ("transit", ("metro", "station", "transit", "ballston", "rosslyn", "clarendon")),
+    ("restaurant", ("restaurant", "dining", "cafe", "coffee", "food")),
+    ("retail", ("retail", "shopping", "store", "shops")),
+)
+
+
+def classify_zone_name(name: str) -> Tuple[str, Optional[str]]:
+    """
+    Classify a zone by name
+
+    Returns:
+        (zone_type, metro_line_info): zone_type is "transit", "restaurant",
+        "retail" or "other"; metro_line_info describes Metro access for
+        "metro" zones (e.g. "Orange Line, high confidence"), else None
+    """
+    name_lower = name.lower()
+
+    zone_type = "other"
+    for candidate, keywords in ZONE_TYPE_KEYWORDS:
+        if any(keyword in name_lower for keyword in keywords):
+            zone_type = candidate
+            break
+
+    metro_line_info = None
+    if "metro" in name_lower:
+        # Extract line info from name (e.g., "Orange Line", "Blue/Orange/Silver Lines")
+        metro_line_info = "high confidence"
+        if "orange" in name_lower:
+            metro_line_info = "Orange Line, high confidence"
+        elif "blue" in name_lower:
+            metro_line_info = "Blue/Orange/Silver Lines, high confidence"
+
+    return zone_type, metro_line_info
+
+
+def audience_keywords(audience_signals: Dict[str, Any]) -> frozenset:
+    """
+    Lowercased words from a zone's demographics, interests and behaviors
+    """
+    signals = (
+        audience_signals.get("demographics", [])
+        + audience_signals.get("interests", [])
+        + audience_signals.get("behaviors", [])
+    )
+    return frozenset(word.lower() for signal in signals for word in signal.split())
+
+
+# Interned zone audience keyword -> bit position, grown as zones are built
+_AUDIENCE_KEYWORD_BITS: Dict[str, int] = {}
+
+
+def audience_keyword_mask(keywords: frozenset, extend: bool = False) -> int:
+    """
+    Bitmask of keywords over the interned zone audience vocabulary
+
+    extend: give unseen keywords a new bit (zone keywords). Otherwise unseen
+    keywords are dropped - no zone has them, so they can never match.
+    """
+    bits = _AUDIENCE_KEYWORD_BITS
+    mask = 0
+    for word in keywords:
+        bit = bits.get(word)
+        if bit is None:
+            if not extend:
+                continue
+            bit = bits[word] = len(bits)
+        mask |= 1 << bit
+    return mask
+
+
 class Zone(BaseModel):
     """
     Placement zone model matching GeoJSON feature properties
@@ -29,6 +172,195 @@ class Zone(BaseModel):
     cost_tier: str
     foot_traffic_daily: Optional[int] = None
 
+    # (timing_windows it was parsed from, parsed windows, timing_coverage) - not serialized
+    _timing_parsed: Optional[
+        Tuple[Dict[str, Any], List[Tuple[int, int]], Tuple[int, int, int]]
+    ] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        # Validate timing windows at load time so scoring never sees bad config,
+        # and intern audience keywords so event masks cover every loaded zone
+        self._timing()
+        self._keywords()
+
+    # (audience_signals dict it was built from, keyword set, keyword mask) - not serialized
+    _audience_keywords: Optional[Tuple[Dict[str, Any], frozenset, int]] = PrivateAttr(
+        default=None
+    )
+
+    def _keywords(self) -> Tuple[Dict[str, Any], frozenset, int]:
+        cached = self._audience_keywords
+        if cached is None or cached[0] is not self.audience_signals:
+            keywords = audience_keywords(self.audience_signals)
+            cached = (
+                self.audience_signals, keywords, audience_keyword_mask(keywords, extend=True)
+            )
+            self._audience_keywords = cached
+        return cached
+
+    @property
+    def audience_keyword_set(self) -> frozenset:
+        """
+        audience_keywords(self.audience_signals), built once per zone
+        """
+        return self._keywords()[1]
+
+    @property
+    def audience_keyword_mask(self) -> int:
+        """
+        audience_keyword_set as a bitmask (see audience_keyword_mask)
+        """
+        return self._keywords()[2]
+
+    # (coordinates dict it was read from, (lat, lon)) - not serialized
+    _coords: Optional[Tuple[Dict[str, float], Tuple[float, float]]] = PrivateAttr(default=None)
+
+    @property
+    def coord_tuple(self) -> Tuple[float, float]:
+        """
+        (lat, lon), unpacked once from the coordinates dict
+        """
+        cached = self._coords
+        if cached is None or cached[0] is not self.coordinates:
+            cached = (self.coordinates, (self.coordinates["lat"], self.coordinates["lon"]))
+            self._coords = cached
+        return cached[1]
+
+    # (name it was classified from, zone_type, metro_line_info) - not serialized
+    _classification: Optional[Tuple[str, str, Optional[str]]] = PrivateAttr(default=None)
+
+    def _classify(self) -> Tuple[str, str, Optional[str]]:
+        cached = self._classification
+        if cached is None or cached[0] is not self.name:
+            cached = (self.name, *classify_zone_name(self.name))
+            self._classification = cached
+        return cached
+
+    @property
+    def zone_type(self) -> str:
+        """
+        "transit", "restaurant", "retail" or "other", classified once from the name
+        """
+        return self._classify()[1]
+
+    @property
+    def metro_line_info(self) -> Optional[str]:
+        """
+        Metro access description for Metro zones, else None
+        """
+        return self._classify()[2]
+
+    @property
+    def parsed_timing_windows(self) -> List[Tuple[int, int]]:
+        """
+        Optimal timing windows as (day_bitmask, hour_bitmask), parsed once per zone
+        """
+        return self._timing()[1]
+
+    @property
+    def timing_coverage(self) -> Tuple[int, int, int]:
+        """
+        timing_coverage(self.parsed_timing_windows), built once per zone
+        """
+        return self._timing()[2]
+
+    def _timing(self) -> Tuple[Dict[str, Any], List[Tuple[int, int]], Tuple[int, int, int]]:
+        cached = self._timing_parsed
+        if cached is None or cached[0] is not self.timing_windows:
+            parsed = parse_timing_windows(self.timing_windows)
+            cached = (self.timing_windows, parsed, timing_coverage(parsed))
+            self._timing_parsed = cached
+        return cached
+
+
+# Validates a whole list of zone dicts in one pydantic-core call
+_ZONE_LIST_ADAPTER = TypeAdapter(List[Zone])
+
+
+def _local_naive(timestamp: str) -> datetime:
+    """
+    Database timestamp (ISO 8601 with offset) as a naive local datetime,
+    comparable with the datetime.now() values the zones cache uses
+    """
+    parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _construct_zones(rows: List[Dict[str, Any]]) -> List[Zone]:
+    """
+    Build Zones from trusted internal rows (our database, our zone generator)
+    without pydantic field validation
+
+    model_post_init still runs, so malformed timing windows are still
+    rejected at load time; keys that aren't Zone fields are dropped.
+    """
+    fields = Zone.model_fields
+    return [
+        Zone.model_construct(**{key: value for key, value in row.items() if key in fields})
+        for row in rows
+    ]
+
+
+class ZoneArrays(NamedTuple):
+    """
+    Struct-of-arrays view of a zones list for vectorized scoring, aligned by index
+    """
+    lat_rad: np.ndarray  # float64
+    lon_rad: np.ndarray  # float64
+    cos_lat: np.ndarray  # float64, cos(lat_rad) for the Haversine formula
+    dwell_time_seconds: np.ndarray  # int32
+    # Zone.timing_coverage unpacked into boolean grids (see timing_coverage)
+    has_timing: np.ndarray  # bool (n,), False when a zone has no optimal windows
+    week_coverage: np.ndarray  # bool (n, 7, 24), [zone, weekday, hour]
+    day_coverage: np.ndarray  # bool (n, 7)
+    hour_coverage: np.ndarray  # bool (n, 24)
+    # Latitude-sorted index: zones in a north/south band are one contiguous
+    # slice of lat_order, found by binary search on sorted_lat_rad
+    lat_order: np.ndarray  # intp, zone indices by ascending latitude
+    sorted_lat_rad: np.ndarray  # float64, lat_rad[lat_order]
+
+
+# Mean Earth radius used by all Haversine distances
+EARTH_RADIUS_MILES = 3958.8
+
+
+def _haversine_miles(
+    arrays: ZoneArrays, lat: float, lon: float, indices: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Great-circle distance (miles) from (lat, lon) to each zone in `arrays`,
+    or only to the zones at `indices` (result aligned with `indices`)
+    """
+    zone_lats, zone_lons, zone_cos_lats = arrays.lat_rad, arrays.lon_rad, arrays.cos_lat
+    if indices is not None:
+        zone_lats, zone_lons, zone_cos_lats = zone_lats[indices], zone_lons[indices], zone_cos_lats[indices]
+
+    lat_rad = math.radians(lat)
+    a = (
+        np.sin((zone_lats - lat_rad) / 2) ** 2
+        + math.cos(lat_rad) * zone_cos_lats * np.sin((zone_lons - math.radians(lon)) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _mask_bits(masks: List[int], width: int) -> np.ndarray:
+    """
+    Unpack int bitmasks into a bool (len(masks), width) array, bit 0 first
+    """
+    nbytes = (width + 7) // 8
+    packed = np.frombuffer(
+        b"".join(mask.to_bytes(nbytes, "little") for mask in masks), dtype=np.uint8
+    ).reshape(len(masks), nbytes)
+    return np.unpackbits(packed, axis=1, bitorder="little")[:, :width].astype(bool)
+
+
+# Rows per upsert request when saving zones (keeps PostgREST payloads bounded)
+ZONE_UPSERT_CHUNK_SIZE = 500
+# Upsert chunks in flight at once
+ZONE_UPSERT_CONCURRENCY = 4
+
 
 class ZonesService:
     """
@@ -38,15 +370,31 @@ class ZonesService:
 
     def __init__(self, use_dynamic_zones: bool = True, cache_ttl_hours: int = 24):
         self._zones: Optional[List[Zone]] = None
+        self._zones_by_id: Dict[str, Zone] = {}
+        # Serializes the static GeoJSON parse so concurrent cold starts load it once
+        self._load_lock = threading.Lock()
         self._zones_geojson: Optional[Dict[str, Any]] = None
         self._use_dynamic_zones = use_dynamic_zones
         self._cache_ttl = timedelta(hours=cache_ttl_hours)
         self._last_refresh: Optional[datetime] = None
         self._dynamic_zones: Optional[List[Zone]] = None
-
-    def _load_zones(self) -> None:
+        self._dynamic_zones_by_id: Dict[str, Zone] = {}
+        # In-progress get_all_zones refresh, awaited by concurrent callers
+        self._refresh_inflight: Optional["asyncio.Future[None]"] = None
+        # (zones list, its ZoneArrays) - rebuilt whenever a different list is scored
+        self._numpy_cache: Optional[Tuple[List[Zone], ZoneArrays]] = None
+        # (GeoJSON dict, its serialized bytes) - re-encoded only when the dict changes
+        self._geojson_bytes: Optional[Tuple[Dict[str, Any], bytes]] = None
+        # ETag cache: {kind: (source object, etag)} - recomputed when the source changes
+        self._etags: Dict[str, Tuple[Any, str]] = {}
+
+    @staticmethod
+    def _static_zones_file() -> Path:
         """
-        Load zones from GeoJSON file
+        Path to zones.geojson
+
+        Raises:
+            FileNotFoundError: If the file is missing
         """
         # Get the data directory path
         current_dir = Path(__file__).parent.parent
@@ -54,31 +402,77 @@ class ZonesService:
 
         if not zones_file.exists():
             raise FileNotFoundError(f"Zones data file not found: {zones_file}")
+        return zones_file
 
-        # Load the GeoJSON file
-        with open(zones_file, "r") as f:
-            self._zones_geojson = json.load(f)
-
-        # Parse zones into Zone objects
-        self._zones = []
-        for feature in self._zones_geojson.get("features", []):
-            properties = feature["properties"]
-            geometry = feature["geometry"]
-
-            zone = Zone(
-                id=feature["id"],
-                name=properties["name"],
-                coordinates={
-                    "lon": geometry["coordinates"][0],
-                    "lat": geometry["coordinates"][1]
-                },
-                audience_signals=properties["audience_signals"],
-                timing_windows=properties["timing_windows"],
-                dwell_time_seconds=properties["dwell_time_seconds"],
-                cost_tier=properties["cost_tier"],
-                foot_traffic_daily=properties.get("foot_traffic_daily")
-            )
-            self._zones.append(zone)
+    def _load_zones(self) -> None:
+        """
+        Load zones from GeoJSON file
+
+        Features are stream-parsed one at a time (ijson), so the whole
+        FeatureCollection tree is never built just to create Zone objects;
+        the raw GeoJSON is only loaded if get_zones_geojson asks for it.
+        """
+        with open(self._static_zones_file(), "rb") as f:
+            # Parse zones into Zone objects
+            zones = _ZONE_LIST_ADAPTER.validate_python([
+                {
+                    "id": feature["id"],
+                    "name": feature["properties"]["name"],
+                    "coordinates": {
+                        "lon": feature["geometry"]["coordinates"][0],
+                        "lat": feature["geometry"]["coordinates"][1]
+                    },
+                    "audience_signals": feature["properties"]["audience_signals"],
+                    "timing_windows": feature["properties"]["timing_windows"],
+                    "dwell_time_seconds": feature["properties"]["dwell_time_seconds"],
+                    "cost_tier": feature["properties"]["cost_tier"],
+                    "foot_traffic_daily": feature["properties"].get("foot_traffic_daily")
+                }
+                for feature in ijson.items(f, "features.item", use_float=True)
+            ])
+
+        # Swap in the fully built data at once (readers never see a partial list)
+        self._zones_by_id = {zone.id: zone for zone in zones}
+        self._zones = zones
+
+    def _ensure_geojson_loaded(self) -> Dict[str, Any]:
+        """
+        Raw zones.geojson FeatureCollection, parsed on first use (thread-safe)
+        """
+        if self._zones_geojson is None:
+            with self._load_lock:
+                if self._zones_geojson is None:
+                    with open(self._static_zones_file(), "rb") as f:
+                        self._zones_geojson = orjson.loads(f.read())
+        return self._zones_geojson
+
+    def load_static_zones(self) -> List[Zone]:
+        """
+        Static zones from zones.geojson, parsed on first use (thread-safe)
+
+        Called at app startup so the first request doesn't pay for the parse.
+        """
+        if self._zones is None:
+            with self._load_lock:
+                if self._zones is None:
+                    self._load_zones()
+        return self._zones
+
+    async def load_static_zones_async(self) -> List[Zone]:
+        """
+        load_static_zones for async callers - the first (cold) parse runs in a
+        worker thread so the event loop isn't blocked on file I/O
+        """
+        if self._zones is None:
+            return await asyncio.to_thread(self.load_static_zones)
+        return self._zones
+
+    def _set_dynamic_zones(self, zones: Optional[List[Zone]]) -> None:
+        """
+        Replace the dynamic zones list together with its ID index
+        """
+        self._dynamic_zones_by_id = {zone.id: zone for zone in zones or ()}
+        self._dynamic_zones = zones
 
     async def _load_zones_from_database(self) -> bool:
         """
@@ -92,14 +486,15 @@ class ZonesService:
             logger.info("Loading zones from database...")
 
             # Query all zones - use latitude/longitude columns (simpler than PostGIS)
-            result = supabase.table("zones").select("*").execute()
+            result = await execute_async(supabase.table("zones").select("*"))
 
             if not result.data:
                 logger.info("No zones found in database")
                 return False
 
             # Convert database records to Zone objects
-            self._dynamic_zones = []
+            rows = []
+            refreshed_at: List[datetime] = []
             for record in result.data:
                 # Use latitude/longitude columns (added in migration 008)
                 lat = record.get("latitude")
@@ -116,17 +511,25 @@ class ZonesService:
                     logger.warning(f"Zone {record.get('id')} has invalid coordinates")
                     continue
 
-                zone = Zone(
-                    id=record["id"],
-                    name=record["name"],
-                    coordinates={"lat": lat, "lon": lon},
-                    audience_signals=record["audience_signals"],
-                    timing_windows=record["timing_windows"],
-                    dwell_time_seconds=record["dwell_time_seconds"],
-                    cost_tier=record["cost_tier"],
-                    foot_traffic_daily=record.get("foot_traffic_daily")
-                )
-                self._dynamic_zones.append(zone)
+                if record.get("refreshed_at"):
+                    refreshed_at.append(_local_naive(record["refreshed_at"]))
+
+                rows.append({
+                    "id": record["id"],
+                    "name": record["name"],
+                    "coordinates": {"lat": lat, "lon": lon},
+                    "audience_signals": record["audience_signals"],
+                    "timing_windows": record["timing_windows"],
+                    "dwell_time_seconds": record["dwell_time_seconds"],
+                    "cost_tier": record["cost_tier"],
+                    "foot_traffic_daily": record.get("foot_traffic_daily")
+                })
+
+            # Rows were typed/checked above; skip re-validating our own data
+            self._set_dynamic_zones(_construct_zones(rows))
+            # Freshness is shared through the table: the oldest row decides
+            # (None for rows saved before refreshed_at existed)
+            self._last_refresh = min(refreshed_at) if refreshed_at else None
 
             logger.info(f"Loaded {len(self._dynamic_zones)} zones from database")
             return True
@@ -148,9 +551,7 @@ class ZonesService:
         try:
             supabase = get_supabase_client()
             logger.info(f"Saving {len(zones)} zones to database...")
-
-            # Clear existing zones
-            supabase.table("zones").delete().neq("id", "").execute()
+            refreshed_at = (self._last_refresh or datetime.now()).astimezone().isoformat()
 
             # Prepare zone records for database
             records = []
@@ -171,16 +572,32 @@ class ZonesService:
                     "timing_windows": zone.timing_windows,
                     "dwell_time_seconds": zone.dwell_time_seconds,
                     "cost_tier": zone.cost_tier,
+                    # Always present: bulk upserts need the same keys in every row,
+                    # and a stale count must be overwritten with NULL
+                    "foot_traffic_daily": zone.foot_traffic_daily,
+                    "refreshed_at": refreshed_at,
                 }
 
-                if zone.foot_traffic_daily:
-                    record["foot_traffic_daily"] = zone.foot_traffic_daily
-
                 records.append(record)
 
-            # Batch insert zones
+            # Upsert in bounded chunks, then drop zones that are no longer
+            # generated - readers never see an empty table mid-save
             if records:
-                supabase.table("zones").insert(records).execute()
+                semaphore = asyncio.Semaphore(ZONE_UPSERT_CONCURRENCY)
+
+                async def upsert_chunk(chunk: List[Dict[str, Any]]) -> None:
+                    async with semaphore:
+                        await execute_async(supabase.table("zones").upsert(chunk, on_conflict="id"))
+
+                await asyncio.gather(*(
+                    upsert_chunk(records[start:start + ZONE_UPSERT_CHUNK_SIZE])
+                    for start in range(0, len(records), ZONE_UPSERT_CHUNK_SIZE)
+                ))
+                await execute_async(
+                    supabase.table("zones").delete().not_.in_(
+                        "id", [record["id"] for record in records]
+                    )
+                )
                 logger.info(f"Successfully saved {len(records)} zones to database")
                 return True
             else:
@@ -205,23 +622,11 @@ class ZonesService:
 
             if not zone_dicts:
                 logger.warning("No dynamic zones generated, falling back to static zones")
-                self._load_zones()  # Fallback to static
+                await self.load_static_zones_async()  # Fallback to static
                 return
 
-            # Convert to Zone objects
-            self._dynamic_zones = []
-            for zone_dict in zone_dicts:
-                zone = Zone(
-                    id=zone_dict["id"],
-                    name=zone_dict["name"],
-                    coordinates=zone_dict["coordinates"],
-                    audience_signals=zone_dict["audience_signals"],
-                    timing_windows=zone_dict["timing_windows"],
-                    dwell_time_seconds=zone_dict["dwell_time_seconds"],
-                    cost_tier=zone_dict["cost_tier"],
-                    foot_traffic_daily=zone_dict.get("foot_traffic_daily")
-                )
-                self._dynamic_zones.append(zone)
+            # Convert to Zone objects (generator output is already typed)
+            self._set_dynamic_zones(_construct_zones(zone_dicts))
 
             self._last_refresh = datetime.now()
             logger.info(f"Loaded {len(self._dynamic_zones)} dynamic zones from APIs")
@@ -232,7 +637,7 @@ class ZonesService:
         except Exception as e:
             logger.error(f"Error loading dynamic zones: {e}")
             logger.info("Falling back to static zones")
-            self._load_zones()  # Fallback to static
+            await self.load_static_zones_async()  # Fallback to static
 
     def _is_cache_valid(self) -> bool:
         """
@@ -260,28 +665,48 @@ class ZonesService:
             if self._dynamic_zones and self._is_cache_valid():
                 return self._dynamic_zones
 
-            # Try loading from database first (fast, no API calls)
-            if self._dynamic_zones is None:
-                logger.info("No zones in memory, checking database...")
-                loaded_from_db = await self._load_zones_from_database()
-                if loaded_from_db and self._dynamic_zones:
-                    logger.info("Using zones from database")
-                    self._last_refresh = datetime.now()
-                    return self._dynamic_zones
-
-            # If database is empty or cache expired, refresh from APIs
-            if self._dynamic_zones is None or not self._is_cache_valid():
-                logger.info("Cache expired or no zones in database, fetching from APIs...")
-                await self._load_dynamic_zones()
+            # Single-flight: concurrent callers at cache expiry share one
+            # refresh (one database read / one round of API calls)
+            refresh = self._refresh_inflight
+            if refresh is None:
+                refresh = asyncio.ensure_future(self._refresh_dynamic_zones())
+                self._refresh_inflight = refresh
+                refresh.add_done_callback(self._clear_refresh_inflight)
+            # Shielded so one caller being cancelled doesn't cancel the others' refresh
+            await asyncio.shield(refresh)
 
             # Return dynamic zones if available, otherwise fall back to static
             if self._dynamic_zones:
                 return self._dynamic_zones
 
         # Fall back to static zones
-        if self._zones is None:
-            self._load_zones()
-        return self._zones
+        return await self.load_static_zones_async()
+
+    async def _refresh_dynamic_zones(self) -> None:
+        """
+        Reload dynamic zones for get_all_zones: database first, then the APIs
+        if the database is empty or the cache has expired
+        """
+        # Try loading from database first (fast, no API calls) - the table is
+        # shared by every worker, so another one may already have refreshed it
+        cold_start = self._dynamic_zones is None
+        logger.info("Zones missing or expired in memory, checking database...")
+        loaded_from_db = await self._load_zones_from_database()
+        if loaded_from_db and self._dynamic_zones:
+            if self._last_refresh is None and cold_start:
+                # Rows without refreshed_at: trusted on a cold start, as before
+                self._last_refresh = datetime.now()
+            if self._is_cache_valid():
+                logger.info("Using zones from database")
+                return
+
+        # If database is empty or its zones expired too, refresh from APIs
+        logger.info("Cache expired or no zones in database, fetching from APIs...")
+        await self._load_dynamic_zones()
+
+    def _clear_refresh_inflight(self, refresh: "asyncio.Future[None]") -> None:
+        if self._refresh_inflight is refresh:
+            self._refresh_inflight = None
 
     async def refresh_zones(self) -> int:
         """
@@ -291,7 +716,7 @@ class ZonesService:
             Number of zones loaded
         """
         logger.info("Force refreshing zones...")
-        self._dynamic_zones = None
+        self._set_dynamic_zones(None)
         self._last_refresh = None
         await self._load_dynamic_zones()
         return len(self._dynamic_zones) if self._dynamic_zones else 0
@@ -310,8 +735,8 @@ class ZonesService:
         logger.info("Importing static zones from zones.geojson to database...")
 
         try:
-            # Load static zones from GeoJSON file
-            self._load_zones()
+            # Load static zones from GeoJSON file (parsed in a worker thread)
+            await asyncio.to_thread(self._load_zones)
 
             if not self._zones:
                 logger.error("No static zones found in zones.geojson")
@@ -321,13 +746,14 @@ class ZonesService:
             supabase = get_supabase_client()
 
             # Check if database already has zones
-            existing = supabase.table("zones").select("id", count="exact").execute()
+            existing = await execute_async(supabase.table("zones").select("id", count="exact"))
             if existing.data and len(existing.data) > 0:
                 logger.warning(f"Database already has {len(existing.data)} zones")
                 logger.info("Use refresh_zones() to update with new data, or manually clear database first")
                 return 0
 
             # Prepare zone records for database
+            imported_at = datetime.now().astimezone().isoformat()
             records = []
             for zone in self._zones:
                 lon = zone.coordinates["lon"]
@@ -338,6 +764,7 @@ class ZonesService:
                     "id": zone.id,
                     "name": zone.name,
                     "location": location_wkt,
+                    "refreshed_at": imported_at,
                     "audience_signals": zone.audience_signals,
                     "timing_windows": zone.timing_windows,
                     "dwell_time_seconds": zone.dwell_time_seconds,
@@ -351,11 +778,11 @@ class ZonesService:
 
             # Batch insert zones
             if records:
-                supabase.table("zones").insert(records).execute()
+                await execute_async(supabase.table("zones").insert(records))
                 logger.info(f"Successfully imported {len(records)} static zones to database")
 
                 # Update memory cache
-                self._dynamic_zones = self._zones
+                self._set_dynamic_zones(self._zones)
                 self._last_refresh = datetime.now()
 
                 return len(records)
@@ -367,35 +794,199 @@ class ZonesService:
             logger.error(f"Error importing static zones to database: {e}")
             raise
 
+    def get_zone_arrays(self, zones: List[Zone]) -> ZoneArrays:
+        """
+        Numeric zone columns for vectorized scoring, cached per zones list
+        (reloads hand out a new list, so a stale snapshot is never reused)
+        """
+        cached = self._numpy_cache
+        if cached is not None and cached[0] is zones and len(cached[1].lat_rad) == len(zones):
+            return cached[1]
+
+        coords = np.array([zone.coord_tuple for zone in zones], dtype=np.float64).reshape(-1, 2)
+        lat_rad = np.radians(coords[:, 0])
+        coverage = [zone.timing_coverage for zone in zones]
+        lat_order = np.argsort(lat_rad, kind="stable")
+        arrays = ZoneArrays(
+            lat_rad=lat_rad,
+            lon_rad=np.radians(coords[:, 1]),
+            cos_lat=np.cos(lat_rad),
+            dwell_time_seconds=np.fromiter(
+                (zone.dwell_time_seconds for zone in zones), dtype=np.int32, count=len(zones)
+            ),
+            has_timing=np.fromiter(
+                (bool(zone.parsed_timing_windows) for zone in zones), dtype=bool, count=len(zones)
+            ),
+            week_coverage=_mask_bits([week for week, _, _ in coverage], 7 * 24).reshape(-1, 7, 24),
+            day_coverage=_mask_bits([day for _, day, _ in coverage], 7),
+            hour_coverage=_mask_bits([hour for _, _, hour in coverage], 24),
+            lat_order=lat_order,
+            sorted_lat_rad=lat_rad[lat_order],
+        )
+        self._numpy_cache = (zones, arrays)
+        return arrays
+
+    def distances_miles_from(self, zones: List[Zone], lat: float, lon: float) -> np.ndarray:
+        """
+        Haversine distance (miles) from a point to every zone in one
+        vectorized pass over the ZoneArrays columns
+
+        Returns:
+            float64 array aligned with `zones`
+        """
+        if not zones:
+            return np.empty(0)
+        return _haversine_miles(self.get_zone_arrays(zones), lat, lon)
+
+    def get_zones_within_radius(
+        self, zones: List[Zone], lat: float, lon: float, radius_miles: float
+    ) -> List[Tuple[Zone, float]]:
+        """
+        Zones within `radius_miles` of a point, nearest first
+
+        Great-circle distance is never less than R * |dlat|, so only the
+        latitude band found by binary search on ZoneArrays.sorted_lat_rad is
+        measured with Haversine.
+
+        Returns:
+            (zone, distance_miles) pairs sorted by distance
+        """
+        if not zones:
+            return []
+
+        arrays = self.get_zone_arrays(zones)
+        band = radius_miles / EARTH_RADIUS_MILES
+        lat_rad = math.radians(lat)
+        start = np.searchsorted(arrays.sorted_lat_rad, lat_rad - band, side="left")
+        stop = np.searchsorted(arrays.sorted_lat_rad, lat_rad + band, side="right")
+        candidates = arrays.lat_order[start:stop]
+
+        distances = _haversine_miles(arrays, lat, lon, candidates)
+        inside = distances <= radius_miles
+        return self._by_distance(zones, candidates[inside], distances[inside])
+
+    def get_zones_near(
+        self, zones: List[Zone], lat: float, lon: float, k: int
+    ) -> List[Tuple[Zone, float]]:
+        """
+        The `k` zones nearest a point (fewer if there aren't k zones)
+
+        Returns:
+            (zone, distance_miles) pairs sorted by distance
+        """
+        if not zones or k <= 0:
+            return []
+
+        distances = self.distances_miles_from(zones, lat, lon)
+        if k < len(zones):
+            nearest = np.argpartition(distances, k - 1)[:k]
+        else:
+            nearest = np.arange(len(zones))
+        return self._by_distance(zones, nearest, distances[nearest])
+
+    @staticmethod
+    def _by_distance(
+        zones: List[Zone], indices: np.ndarray, distances: np.ndarray
+    ) -> List[Tuple[Zone, float]]:
+        """
+        (zone, distance) pairs for `indices`, nearest first (ties in zone order)
+        """
+        order = np.lexsort((indices, distances))
+        return [
+            (zones[index], distance)
+            for index, distance in zip(indices[order].tolist(), distances[order].tolist())
+        ]
+
     def get_zone_by_id(self, zone_id: str) -> Optional[Zone]:
         """
         Get a single zone by ID
 
+        Dynamic zones (database / API generated) are checked first, then the
+        static zones - both through ID indexes built when each list is loaded.
+
         Args:
             zone_id: Zone identifier
 
         Returns:
             Zone object or None if not found
         """
-        if self._zones is None:
-            self._load_zones()
-
-        for zone in self._zones:
-            if zone.id == zone_id:
-                return zone
-        return None
+        zone = self._dynamic_zones_by_id.get(zone_id)
+        if zone is not None:
+            return zone
+        self.load_static_zones()
+        return self._zones_by_id.get(zone_id)
 
     def get_zones_geojson(self) -> Dict[str, Any]:
         """
         Get raw GeoJSON data (for map visualization)
 
+        Returns:
+            GeoJSON FeatureCollection
+        """
+        return self._ensure_geojson_loaded()
+
+    async def get_zones_geojson_async(self) -> Dict[str, Any]:
+        """
+        get_zones_geojson for async callers - a cold load reads the file with
+        aiofiles so the event loop isn't blocked on disk I/O
+
         Returns:
             GeoJSON FeatureCollection
         """
         if self._zones_geojson is None:
-            self._load_zones()
+            async with aiofiles.open(self._static_zones_file(), "rb") as f:
+                geojson = orjson.loads(await f.read())
+            # Keep the first loaded dict if a concurrent load won (ETags key on
+            # it); no lock here - waiting on it would block the event loop
+            if self._zones_geojson is None:
+                self._zones_geojson = geojson
         return self._zones_geojson
 
+    def get_zones_geojson_bytes(self) -> bytes:
+        """
+        GeoJSON FeatureCollection serialized as JSON bytes, cached per load
+
+        Returns:
+            UTF-8 JSON body for the /zones/geojson response
+        """
+        geojson = self.get_zones_geojson()
+        cached = self._geojson_bytes
+        if cached is None or cached[0] is not geojson:
+            cached = (geojson, orjson.dumps(geojson))
+            self._geojson_bytes = cached
+        return cached[1]
+
+    def current_etag(self, kind: str, source: Any) -> str:
+        """
+        Get a strong ETag for the data currently served by a zones endpoint
+
+        The hash is only recomputed when `source` is a different object than last
+        time (i.e. after a refresh/reload swapped the zones list or GeoJSON).
+
+        Args:
+            kind: Cache slot name (e.g. "zones", "geojson", or a zone ID)
+            source: Zone, list of Zone objects, or GeoJSON dict being served
+
+        Returns:
+            Quoted ETag string
+        """
+        cached = self._etags.get(kind)
+        if cached is not None and cached[0] is source:
+            return cached[1]
+
+        digest = hashlib.blake2b(digest_size=16)
+        if isinstance(source, Zone):
+            digest.update(source.model_dump_json().encode())
+        elif isinstance(source, list):
+            for zone in source:
+                digest.update(zone.model_dump_json().encode())
+        else:
+            digest.update(orjson.dumps(source, option=orjson.OPT_SORT_KEYS))
+
+        etag = f'"{digest.hexdigest()}"'
+        self._etags[kind] = (source, etag)
+        return etag
+
     def get_zones_count(self) -> int:
         """
         Get total number of zones
@@ -403,9 +994,7 @@ class ZonesService:
         Returns:
             Number of zones
         """
-        if self._zones is None:
-            self._load_zones()
-        return len(self._zones)
+        return len(self.load_static_zones())
 
 
 # Global singleton instance
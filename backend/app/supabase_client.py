@@ -4,8 +4,9 @@ Supabase client initialization for backend services.
 Provides connection to Supabase PostgreSQL with PostGIS support.
 """
 import os
+import asyncio
 from supabase import create_client, Client
-from typing import Optional
+from typing import Any, Optional
 
 _supabase_client: Optional[Client] = None
 
@@ -37,6 +38,23 @@ def get_supabase_client() -> Client:
     return _supabase_client
 
 
+async def execute_async(query: Any) -> Any:
+    """
+    Run a Supabase query builder's blocking `.execute()` in a worker thread.
+
+    The supabase-py client is synchronous; calling `.execute()` directly inside
+    an `async def` handler stalls the event loop for the whole Postgres round-trip.
+
+    Args:
+        query: A prepared query builder (e.g. `client.table("zones").select("*")`)
+
+    Returns:
+        The APIResponse returned by `.execute()`
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, query.execute)
+
+
 async def verify_connection() -> dict:
     """
     Verify Supabase connection with a test query.
@@ -0,0 +1,43 @@
+-- Aggregate a user's usage stats in the database
+-- get_user_stats used to fetch every usage_logs row for the user and sum them in Python
+
+-- Covers the per-user 24h window and first/last use lookups
+CREATE INDEX IF NOT EXISTS idx_usage_logs_user_created
+    ON public.usage_logs(user_id, created_at DESC);
+
+CREATE OR REPLACE FUNCTION public.get_user_usage_stats(p_user_id TEXT)
+RETURNS TABLE (
+    total_operations BIGINT,
+    total_cost_usd NUMERIC,
+    operations_last_24h BIGINT,
+    breakdown JSONB,
+    first_use TIMESTAMPTZ,
+    last_use TIMESTAMPTZ
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH per_type AS (
+        SELECT operation_type, COUNT(*) AS operation_count
+        FROM public.usage_logs
+        WHERE user_id = p_user_id
+        GROUP BY operation_type
+    )
+    SELECT
+        COUNT(*),
+        COALESCE(SUM(cost_estimate), 0),
+        COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '1 day'),
+        COALESCE(
+            (SELECT jsonb_object_agg(operation_type, operation_count) FROM per_type),
+            '{}'::jsonb
+        ),
+        MIN(created_at),
+        MAX(created_at)
+    FROM public.usage_logs
+    WHERE user_id = p_user_id;
+$$;
+
+COMMENT ON FUNCTION public.get_user_usage_stats(TEXT) IS 'Usage totals, 24h count and per-operation breakdown for one user';
+
+-- Runs as the caller, so usage_logs RLS policies still apply
+GRANT EXECUTE ON FUNCTION public.get_user_usage_stats(TEXT) TO authenticated, service_role;
@@ -0,0 +1,8 @@
+-- Add refreshed_at column to zones table
+-- Lets every backend worker tell whether the stored zones are still fresh,
+-- so only one of them re-fetches from Google Places + Arlington Parking per TTL
+
+ALTER TABLE zones
+ADD COLUMN IF NOT EXISTS refreshed_at TIMESTAMP WITH TIME ZONE;
+
+COMMENT ON COLUMN zones.refreshed_at IS 'When this zone was last regenerated from the external APIs';
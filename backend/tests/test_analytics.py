@@ -0,0 +1,75 @@
+"""
+Tests for the zone analytics service
+"""
+
+from app.services.analytics import (
+    AnalyticsService,
+    BUSIEST_DAYS_PATTERNS,
+    GENDER_DISTRIBUTIONS,
+    HOURLY_TRAFFIC_PATTERNS,
+    _select_pattern_key,
+)
+
+
+class TestPatternSelection:
+    """Test picking a venue-type pattern from the module tables"""
+
+    def test_first_matching_venue_type_wins(self):
+        """With several matches, the caller's order decides"""
+        keys = frozenset(HOURLY_TRAFFIC_PATTERNS)
+
+        assert _select_pattern_key(["gym", "bar", "cafe"], keys) == "bar"
+        assert _select_pattern_key(["cafe", "bar"], keys) == "cafe"
+
+    def test_single_and_missing_matches(self):
+        """One match is used directly; no match falls back to the default pattern"""
+        keys = frozenset(GENDER_DISTRIBUTIONS)
+
+        assert _select_pattern_key(["point_of_interest", "gym"], keys) == "gym"
+        assert _select_pattern_key(["point_of_interest"], keys) == "default"
+        assert _select_pattern_key([], keys) == "default"
+
+
+class TestGeneratedAnalytics:
+    """Test the analytics generated from the selected patterns"""
+
+    def test_hourly_traffic_uses_selected_pattern(self):
+        """Hourly traffic scales the base volume by the venue's period multipliers"""
+        hourly = AnalyticsService().generate_hourly_traffic_from_venue_type(["bar", "cafe"])
+        by_hour = {entry["hour"]: entry["traffic"] for entry in hourly}
+
+        assert len(hourly) == 24
+        assert hourly[0]["hour"] == "12 AM" and hourly[12]["hour"] == "12 PM"
+        assert by_hour["8 AM"] == int(500 * HOURLY_TRAFFIC_PATTERNS["bar"]["morning"])
+        assert by_hour["11 PM"] == int(500 * HOURLY_TRAFFIC_PATTERNS["bar"]["night"])
+
+    def test_gender_distribution_uses_selected_pattern(self):
+        """Gender split comes from the first venue type with a distribution"""
+        distribution = AnalyticsService().generate_gender_distribution(["museum", "gym", "cafe"])
+
+        assert distribution == [
+            {"name": name, "value": GENDER_DISTRIBUTIONS["gym"][name]}
+            for name in ("Female", "Male", "Other")
+        ]
+
+    def test_busiest_days_default_pattern(self):
+        """Unknown venue types get the default weekly pattern, Monday first"""
+        days = AnalyticsService().generate_busiest_days(["laundry"])
+
+        assert [day["day"] for day in days] == ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        assert [day["traffic"] for day in days] == list(BUSIEST_DAYS_PATTERNS["default"].values())
+
+    def test_patterns_not_mutated_by_generation(self):
+        """Shared module tables come back unchanged after generating analytics"""
+        before = (
+            repr(HOURLY_TRAFFIC_PATTERNS), repr(GENDER_DISTRIBUTIONS), repr(BUSIEST_DAYS_PATTERNS)
+        )
+        service = AnalyticsService()
+        for venue_types in (["bar"], ["cafe", "gym"], []):
+            service.generate_hourly_traffic_from_venue_type(venue_types)
+            service.generate_gender_distribution(venue_types)
+            service.generate_busiest_days(venue_types)
+
+        assert before == (
+            repr(HOURLY_TRAFFIC_PATTERNS), repr(GENDER_DISTRIBUTIONS), repr(BUSIEST_DAYS_PATTERNS)
+        )
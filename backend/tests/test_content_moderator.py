@@ -0,0 +1,161 @@
+"""
+Tests for the content moderation service
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.content_moderator import ContentModerator
+
+# Long enough that the local preflight always escalates them to Claude
+TEXTS = [
+    "Join us Saturday for the Clarendon block party with live music and food trucks",
+    "Free yoga in the park every Sunday morning, bring your own mat and water",
+    "Lost cat near Ballston Metro, answers to Miso, please call if you see her",
+]
+
+
+def _reply(payload) -> SimpleNamespace:
+    """Claude message with a single text block"""
+    text = payload if isinstance(payload, str) else json.dumps(payload)
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+def _moderator(*replies) -> ContentModerator:
+    """ContentModerator whose Claude client returns `replies` in order"""
+    moderator = ContentModerator()
+    moderator.client = SimpleNamespace(
+        messages=SimpleNamespace(create=AsyncMock(side_effect=list(replies)))
+    )
+    return moderator
+
+
+def _sent_texts(create: AsyncMock, call: int) -> str:
+    """User message content of the given Claude call"""
+    return create.call_args_list[call].kwargs["messages"][0]["content"]
+
+
+class TestTextModeration:
+    """Test text moderation against a stubbed Claude client"""
+
+    @pytest.mark.asyncio
+    async def test_verdicts_matched_by_coerced_index(self):
+        """Out-of-order replies with string indexes map back to the right texts"""
+        moderator = _moderator(_reply([
+            {"index": "2", "safe": True, "reason": "ok", "categories": []},
+            {"index": 0, "safe": False, "reason": "spam", "categories": ["spam"]},
+            {"index": 1.0, "safe": True, "reason": "ok", "categories": []},
+        ]))
+
+        results = await moderator.moderate_text_batch(TEXTS)
+
+        assert [is_safe for is_safe, _ in results] == [False, True, True]
+        assert results[0][1]["flagged_categories"] == ["spam"]
+        assert moderator.client.messages.create.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_unindexed_verdicts_matched_by_position(self):
+        """Verdicts without an index are matched by their place in the reply"""
+        moderator = _moderator(_reply(
+            "Here you go:\n```json\n"
+            + json.dumps([
+                {"safe": True, "reason": "ok", "categories": []},
+                {"safe": False, "reason": "scam", "categories": ["scam"]},
+                {"safe": True, "reason": "ok", "categories": []},
+            ])
+            + "\n```"
+        ))
+
+        results = await moderator.moderate_text_batch(TEXTS)
+
+        assert [is_safe for is_safe, _ in results] == [True, False, True]
+
+    @pytest.mark.asyncio
+    async def test_partial_reply_remoderates_missing_texts(self):
+        """Texts the reply skipped are sent again on their own, then cached"""
+        moderator = _moderator(
+            _reply([{"index": 0, "safe": True, "reason": "ok", "categories": []}]),
+            _reply([
+                {"index": 0, "safe": True, "reason": "ok", "categories": []},
+                {"index": 1, "safe": False, "reason": "threat", "categories": ["violence"]},
+            ]),
+        )
+        create = moderator.client.messages.create
+
+        results = await moderator.moderate_text_batch(TEXTS)
+
+        assert [is_safe for is_safe, _ in results] == [True, True, False]
+        assert all("error" not in result for _, result in results)
+        assert create.await_count == 2
+        assert TEXTS[0] not in _sent_texts(create, 1)
+        assert TEXTS[1] in _sent_texts(create, 1) and TEXTS[2] in _sent_texts(create, 1)
+
+        # Every text got a real verdict, so none are sent again
+        await moderator.moderate_text_batch(TEXTS)
+        assert create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_garbled_reply_fails_closed_and_is_not_cached(self):
+        """No usable verdict even after the retry: unsafe, and moderated again next time"""
+        garbled = "These all look safe to me."
+        moderator = _moderator(
+            _reply(garbled),
+            _reply([{"index": 0, "reason": "missing verdict"}]),
+            _reply([{"index": 0, "safe": True, "reason": "ok", "categories": []}]),
+        )
+        create = moderator.client.messages.create
+
+        is_safe, result = await moderator.moderate_text(TEXTS[0])
+
+        assert is_safe is False
+        assert "error" in result
+        assert create.await_count == 2
+
+        is_safe, result = await moderator.moderate_text(TEXTS[0])
+
+        assert is_safe is True
+        assert create.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_moderate_text_returns_single_verdict(self):
+        """moderate_text sends one text and returns its verdict"""
+        moderator = _moderator(_reply([
+            {"index": 0, "safe": False, "reason": "hate speech", "categories": ["hate"]},
+        ]))
+
+        is_safe, result = await moderator.moderate_text(TEXTS[2])
+
+        assert is_safe is False
+        assert result["reason"] == "hate speech"
+        assert result["flagged_categories"] == ["hate"]
+
+
+class TestTextPreflight:
+    """Test the local preflight in front of text moderation"""
+
+    @pytest.mark.asyncio
+    async def test_trivial_text_cleared_without_claude(self):
+        """Near-empty text is passed locally"""
+        moderator = _moderator()
+
+        is_safe, result = await moderator.moderate_text(" ok ")
+
+        assert is_safe is True
+        assert result["source"] == "preflight-trivial"
+        moderator.client.messages.create.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_short_abuse_escalated_to_claude(self):
+        """Short text is still moderated by Claude, whatever words it uses"""
+        moderator = _moderator(_reply([
+            {"index": 0, "safe": False, "reason": "harassment", "categories": ["hate"]},
+        ]))
+
+        is_safe, result = await moderator.moderate_text("go back home, vermin")
+
+        assert is_safe is False
+        assert "source" not in result
+        moderator.client.messages.create.assert_awaited_once()
@@ -0,0 +1,182 @@
+"""
+Tests for the data ingestion service
+"""
+
+import contextlib
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import ijson
+import orjson
+import pytest
+
+from app.http_client import AsyncByteReader
+from app.services.data_ingestion import DataIngestionService
+
+
+async def _chunked(body: bytes, size: int):
+    yield b""
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def _meter_features(count: int):
+    """ArcGIS parking meter features, one per OBJECTID"""
+    return [
+        {
+            "attributes": {
+                "OBJECTID": i, "METER_ID": f"M{i}", "FULLSTREET": "Wilson Blvd", "RATE": "$2.00/hr",
+            },
+            "geometry": {"x": -77.1 + i * 0.01, "y": 38.88},
+        }
+        for i in range(count)
+    ]
+
+
+class _FakeArcGIS:
+    """HTTP client stub serving ArcGIS pages by resultOffset/resultRecordCount"""
+
+    def __init__(self, features):
+        self.features = features
+        self.offsets = []
+        self.fields = []
+
+    @contextlib.asynccontextmanager
+    async def stream(self, method, url, params=None):
+        offset = params["resultOffset"]
+        self.offsets.append(offset)
+        self.fields.append(params["outFields"])
+        body = orjson.dumps({"features": self.features[offset:offset + params["resultRecordCount"]]})
+        yield SimpleNamespace(raise_for_status=lambda: None, aiter_bytes=lambda: _chunked(body, 64))
+
+
+@pytest.fixture
+def arcgis(tmp_path):
+    """Two-feature ArcGIS pages over five meters, with no local snapshot"""
+    fake = _FakeArcGIS(_meter_features(5))
+    with patch("app.services.data_ingestion.get_http_client", return_value=fake), \
+            patch.object(DataIngestionService, "ARLINGTON_PAGE_SIZE", 2), \
+            patch.object(DataIngestionService, "PARKING_SNAPSHOT_PATH", str(tmp_path / "parking.json")):
+        yield fake
+
+
+class TestAsyncByteReader:
+    """Test the async file-like wrapper used to stream-parse ArcGIS responses"""
+
+    @pytest.mark.asyncio
+    async def test_items_async_sees_whole_multi_chunk_body(self):
+        """ijson's read(0) probe must not swallow the first chunk"""
+        features = [
+            {"attributes": {"OBJECTID": i, "METER_ID": f"M{i}"}, "geometry": {"x": -77.1, "y": 38.88}}
+            for i in range(50)
+        ]
+        body = orjson.dumps({"features": features})
+
+        reader = AsyncByteReader(_chunked(body, 37))
+        parsed = [item async for item in ijson.items_async(reader, "features.item", use_float=True)]
+
+        assert parsed[0] == features[0]
+        assert parsed == features
+
+    @pytest.mark.asyncio
+    async def test_read_respects_size_and_keeps_leftover(self):
+        """Bytes beyond the requested size are returned by the next read"""
+        reader = AsyncByteReader(_chunked(b"abcdefgh", 5))
+
+        assert await reader.read(0) == b""
+        assert await reader.read(3) == b"abc"
+        assert await reader.read(3) == b"de"
+        assert await reader.read() == b"fgh"
+        assert await reader.read() == b""
+
+
+class TestParkingPaging:
+    """Test paging through the ArcGIS parking meter layer"""
+
+    @pytest.mark.asyncio
+    async def test_pages_until_short_page(self, arcgis):
+        """Offsets advance by the page size until a page comes back short"""
+        locations = await DataIngestionService().fetch_arlington_parking_locations()
+
+        assert arcgis.offsets == [0, 2, 4]
+        assert [location["id"] for location in locations] == [0, 1, 2, 3, 4]
+        assert set(arcgis.fields) == {DataIngestionService.ARLINGTON_PARKING_FIELDS}
+
+    @pytest.mark.asyncio
+    async def test_limit_stops_paging(self, arcgis):
+        """No further pages are requested once the limit is reached"""
+        locations = await DataIngestionService().fetch_arlington_parking_locations(limit=3)
+
+        assert arcgis.offsets == [0, 2]
+        assert [location["meter_id"] for location in locations] == ["M0", "M1", "M2"]
+
+
+class TestParkingSnapshot:
+    """Test the on-disk parking snapshot"""
+
+    @pytest.mark.asyncio
+    async def test_complete_fetch_served_from_snapshot(self, arcgis):
+        """A full fetch is written to disk and serves later requests of any size"""
+        fetched = await DataIngestionService().fetch_arlington_parking_locations()
+        requested = len(arcgis.offsets)
+
+        assert await DataIngestionService().fetch_arlington_parking_locations() == fetched
+        assert await DataIngestionService().fetch_arlington_parking_locations(limit=2) == fetched[:2]
+        assert len(arcgis.offsets) == requested
+
+    @pytest.mark.asyncio
+    async def test_partial_snapshot_only_serves_smaller_limits(self, arcgis):
+        """A limited fetch isn't reused for a larger or unlimited request"""
+        await DataIngestionService().fetch_arlington_parking_locations(limit=3)
+        requested = len(arcgis.offsets)
+
+        assert len(await DataIngestionService().fetch_arlington_parking_locations(limit=3)) == 3
+        assert len(arcgis.offsets) == requested
+
+        assert len(await DataIngestionService().fetch_arlington_parking_locations()) == 5
+        assert len(arcgis.offsets) > requested
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_ignored(self, arcgis):
+        """A snapshot older than the TTL is refetched"""
+        await DataIngestionService().fetch_arlington_parking_locations()
+        requested = len(arcgis.offsets)
+
+        stale = time.time() - DataIngestionService.PARKING_SNAPSHOT_TTL_SECONDS - 1
+        os.utime(DataIngestionService.PARKING_SNAPSHOT_PATH, (stale, stale))
+        await DataIngestionService().fetch_arlington_parking_locations()
+
+        assert len(arcgis.offsets) > requested
+
+
+class TestPlacesCellBucketing:
+    """Test that Places is queried once per ~100m cell of meters"""
+
+    @pytest.mark.asyncio
+    async def test_meters_in_one_cell_share_a_places_query(self):
+        """Meters rounding to the same cell get one query, from their centroid"""
+        meters = [
+            {"id": 1, "meter_id": "M1", "street": "Wilson Blvd", "metro_area": "Ballston",
+             "latitude": 38.88210, "longitude": -77.11160, "rate": "$1.00/hr"},
+            {"id": 2, "meter_id": "M2", "street": "Wilson Blvd", "metro_area": "Ballston",
+             "latitude": 38.88230, "longitude": -77.11170, "rate": "$2.00/hr"},
+            {"id": 3, "meter_id": "M3", "street": "Clarendon Blvd", "metro_area": None,
+             "latitude": 38.88670, "longitude": -77.09530, "rate": None},
+        ]
+        venues = [{"types": ["cafe", "transit_station"]}]
+        service = DataIngestionService()
+
+        with patch.object(service, "fetch_arlington_parking_locations", new=AsyncMock(return_value=meters)), \
+                patch.object(service, "fetch_google_places_nearby", new=AsyncMock(return_value=venues)) as places:
+            zones = await service.generate_zones_from_parking_data(limit=3)
+
+        queried = sorted(call.args for call in places.await_args_list)
+        assert len(queried) == 2
+        assert queried[0][:2] == pytest.approx((38.8822, -77.11165))
+        assert queried[1][:2] == pytest.approx((38.8867, -77.0953))
+
+        assert [zone["id"] for zone in zones] == ["parking-M1", "parking-M2", "parking-M3"]
+        assert zones[0]["audience_signals"] == zones[1]["audience_signals"]
+        assert [zone["cost_tier"] for zone in zones] == ["$", "$$", "$$"]
@@ -3,16 +3,29 @@ Story 3.6: Test Venue Geocoding to Lat/Lon
 Tests for geocoding service and API endpoint
 """
 
+import asyncio
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, Mock
 from app.services.geocoding import (
     geocode_venue,
+    geocode_venues,
     is_within_arlington,
+    normalize_address,
     GeocodingError,
     GeocodingResult,
+    _GEO_CACHE,
+    _GEO_LOCKS,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_geocode_cache():
+    """Start every test with an empty geocoding cache"""
+    _GEO_CACHE.clear()
+    yield
+    _GEO_CACHE.clear()
+
+
 class TestArlingtonBounds:
     """Test Story 3.6 AC: Coordinates validated within Arlington, VA bounds"""
 
@@ -26,8 +39,8 @@ class TestArlingtonBounds:
 
     def test_is_within_arlington_invalid_coordinates(self):
         """Test coordinates outside Arlington bounds return False"""
-        # Washington DC (south of Arlington)
-        assert is_within_arlington(38.9072, -77.0369) is False
+        # US Capitol, Washington DC (east of Arlington)
+        assert is_within_arlington(38.8899, -77.0091) is False
 
         # Falls Church (west of Arlington)
         assert is_within_arlington(38.8823, -77.1711) is False
@@ -37,7 +50,7 @@ class TestGeocodeVenue:
     """Test Story 3.6: Implement Venue Geocoding to Lat/Lon"""
 
     @pytest.mark.asyncio
-    @patch("app.services.geocoding.httpx.AsyncClient")
+    @patch("app.services.geocoding.get_http_client")
     async def test_geocode_venue_success(self, mock_client):
         """
         Story 3.6 AC: Address geocoded to lat/lon using Mapbox Geocoding API
@@ -58,7 +71,7 @@ class TestGeocodeVenue:
 
         mock_client_instance = AsyncMock()
         mock_client_instance.get.return_value = mock_response
-        mock_client.return_value.__aenter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
 
         # Mock environment variable
         with patch("os.getenv", return_value="test_mapbox_key"):
@@ -72,7 +85,7 @@ class TestGeocodeVenue:
         assert result.confidence == "High"  # relevance 0.95 + within Arlington
 
     @pytest.mark.asyncio
-    @patch("app.services.geocoding.httpx.AsyncClient")
+    @patch("app.services.geocoding.get_http_client")
     async def test_geocode_venue_not_found(self, mock_client):
         """
         Story 3.6 AC: Failure shows "Venue not found" message
@@ -84,7 +97,7 @@ class TestGeocodeVenue:
 
         mock_client_instance = AsyncMock()
         mock_client_instance.get.return_value = mock_response
-        mock_client.return_value.__aenter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
 
         with patch("os.getenv", return_value="test_mapbox_key"):
             result = await geocode_venue("Nonexistent Address XYZ")
@@ -93,7 +106,7 @@ class TestGeocodeVenue:
         assert result is None
 
     @pytest.mark.asyncio
-    @patch("app.services.geocoding.httpx.AsyncClient")
+    @patch("app.services.geocoding.get_http_client")
     async def test_geocode_venue_timeout(self, mock_client):
         """
         Story 3.6 AC: Completes within 2 seconds (timeout handling)
@@ -101,7 +114,7 @@ class TestGeocodeVenue:
         # Mock timeout exception
         mock_client_instance = AsyncMock()
         mock_client_instance.get.side_effect = Exception("Timeout")
-        mock_client.return_value.__aenter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
 
         with patch("os.getenv", return_value="test_mapbox_key"):
             with pytest.raises(GeocodingError, match="Geocoding failed"):
@@ -115,7 +128,7 @@ class TestGeocodeVenue:
                 await geocode_venue("123 Main St")
 
     @pytest.mark.asyncio
-    @patch("app.services.geocoding.httpx.AsyncClient")
+    @patch("app.services.geocoding.get_http_client")
     async def test_geocode_venue_medium_confidence(self, mock_client):
         """Test medium confidence for addresses outside Arlington"""
         # Mock response for address outside Arlington
@@ -134,7 +147,7 @@ class TestGeocodeVenue:
 
         mock_client_instance = AsyncMock()
         mock_client_instance.get.return_value = mock_response
-        mock_client.return_value.__aenter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
 
         with patch("os.getenv", return_value="test_mapbox_key"):
             result = await geocode_venue("100 Main St, Falls Church, VA")
@@ -142,3 +155,189 @@ class TestGeocodeVenue:
         assert result is not None
         assert result.within_arlington is False
         assert result.confidence == "Medium"  # relevance 0.75, not in Arlington
+
+
+class TestGeocodeFastPath:
+    """Address-only lookup first; address+POI only when that isn't good enough"""
+
+    @staticmethod
+    def _response(relevance):
+        response = Mock()
+        response.json.return_value = {
+            "features": [
+                {
+                    "geometry": {"coordinates": [-77.0910, 38.8816]},
+                    "place_name": "123 Main St, Arlington, VA 22201",
+                    "text": "123 Main St",
+                    "relevance": relevance,
+                }
+            ]
+        }
+        response.raise_for_status = Mock()
+        return response
+
+    @pytest.mark.asyncio
+    @patch("app.services.geocoding.get_http_client")
+    async def test_confident_address_match_skips_poi_query(self, mock_client):
+        """A relevant address-only match is returned without a second call"""
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get.return_value = self._response(0.95)
+        mock_client.return_value = mock_client_instance
+
+        with patch("os.getenv", return_value="test_mapbox_key"):
+            result = await geocode_venue("123 Main St, Arlington, VA")
+
+        assert result.confidence == "High"
+        assert mock_client_instance.get.call_count == 1
+        assert mock_client_instance.get.call_args.kwargs["params"]["types"] == "address"
+
+    @pytest.mark.asyncio
+    @patch("app.services.geocoding.get_http_client")
+    async def test_weak_address_match_falls_back_to_poi_query(self, mock_client):
+        """A low-relevance address-only match triggers the address+POI query"""
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get.side_effect = [self._response(0.5), self._response(0.95)]
+        mock_client.return_value = mock_client_instance
+
+        with patch("os.getenv", return_value="test_mapbox_key"):
+            result = await geocode_venue("Arlington Farmers Market")
+
+        assert result.confidence == "High"
+        assert mock_client_instance.get.call_count == 2
+        assert mock_client_instance.get.call_args.kwargs["params"]["types"] == "address,poi"
+
+
+class TestGeocodeCache:
+    """Repeat lookups of the same venue should not hit Mapbox again"""
+
+    def test_normalize_address(self):
+        """Case, whitespace, comma spacing and trailing punctuation are ignored"""
+        assert normalize_address("  123 Main St ,Arlington,  VA. ") == "123 main st, arlington, va"
+        assert normalize_address("123 MAIN   ST, Arlington, VA") == "123 main st, arlington, va"
+
+    @pytest.mark.asyncio
+    @patch("app.services.geocoding.get_http_client")
+    async def test_geocode_venue_cached_by_normalized_address(self, mock_client):
+        """Second lookup with equivalent address is served from cache"""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "features": [
+                {
+                    "geometry": {"coordinates": [-77.0910, 38.8816]},
+                    "place_name": "123 Main St, Arlington, VA 22201",
+                    "text": "123 Main St",
+                    "relevance": 0.95,
+                }
+            ]
+        }
+        mock_response.raise_for_status = Mock()
+
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get.return_value = mock_response
+        mock_client.return_value = mock_client_instance
+
+        with patch("os.getenv", return_value="test_mapbox_key"):
+            first = await geocode_venue("123 Main St, Arlington, VA")
+            second = await geocode_venue("123 main st,  Arlington, VA.")
+
+        assert first == second
+        assert mock_client_instance.get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_lock(self):
+        """Callers queued behind a failed lookup don't race a newcomer to Mapbox"""
+        result = GeocodingResult(
+            latitude=38.8816,
+            longitude=-77.0910,
+            formatted_address="123 Main St, Arlington, VA 22201",
+            place_name="123 Main St",
+            within_arlington=True,
+            confidence="High",
+        )
+        first_gate, second_gate = asyncio.Event(), asyncio.Event()
+        calls = 0
+
+        async def fake_fetch(venue_address, mapbox_api_key):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await first_gate.wait()
+                raise GeocodingError("Geocoding timeout")
+            await second_gate.wait()
+            return result
+
+        async def settle():
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+        address = "123 Main St, Arlington, VA"
+        with patch("os.getenv", return_value="test_mapbox_key"), \
+                patch("app.services.geocoding._fetch_geocode", side_effect=fake_fetch):
+            first = asyncio.create_task(geocode_venue(address))
+            second = asyncio.create_task(geocode_venue(address))
+            await settle()
+
+            # First lookup fails (not cached); the queued second one retries
+            first_gate.set()
+            with pytest.raises(GeocodingError):
+                await first
+            await settle()
+            assert calls == 2
+
+            # A newcomer must queue behind the second lookup, not start its own
+            third = asyncio.create_task(geocode_venue(address))
+            await settle()
+            second_gate.set()
+
+            assert await second == result
+            assert await third == result
+
+        assert calls == 2
+        assert normalize_address(address) not in _GEO_LOCKS
+
+
+class TestGeocodeVenues:
+    """Batch geocoding fans out per address and keeps input order"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.geocoding.get_http_client")
+    async def test_geocode_venues_returns_results_in_order(self, mock_client):
+        """Found, not-found and failed lookups each map to their own slot"""
+        found = Mock()
+        found.json.return_value = {
+            "features": [
+                {
+                    "geometry": {"coordinates": [-77.0910, 38.8816]},
+                    "place_name": "123 Main St, Arlington, VA 22201",
+                    "text": "123 Main St",
+                    "relevance": 0.95,
+                }
+            ]
+        }
+        found.raise_for_status = Mock()
+        not_found = Mock()
+        not_found.json.return_value = {"features": []}
+        not_found.raise_for_status = Mock()
+
+        async def fake_get(url, params=None, timeout=None):
+            if "Nowhere" in url:
+                return not_found
+            if "Timeout" in url:
+                raise Exception("Timeout")
+            return found
+
+        mock_client_instance = AsyncMock()
+        mock_client_instance.get.side_effect = fake_get
+        mock_client.return_value = mock_client_instance
+
+        with patch("os.getenv", return_value="test_mapbox_key"):
+            results = await geocode_venues([
+                "123 Main St, Arlington, VA",
+                "Nowhere Lane",
+                "Timeout Blvd",
+            ])
+
+        assert isinstance(results[0], GeocodingResult)
+        assert results[0].latitude == 38.8816
+        assert results[1] is None
+        assert isinstance(results[2], GeocodingError)
@@ -3,13 +3,21 @@ Tests for Story 4.2: Recommendation Scoring Algorithm
 Validates scoring formula and component calculations
 """
 
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
 import pytest
 from app.services.recommendations import (
     RecommendationsService,
     EventData,
     ZoneScore,
+    _masked_audience_match,
+    _parse_event_slot,
+    _temporal_scores,
+    _top_k_indices,
 )
-from app.services.zones import Zone
+from app.services.zones import Zone, audience_keyword_mask, parse_timing_windows, zones_service
 
 
 @pytest.fixture
@@ -193,6 +201,21 @@ def test_audience_match_empty_target(recommendations_service):
     assert score == 0.0, "Empty target audience should score 0"
 
 
+def test_keyword_fallback_with_precomputed_masks(recommendations_service, sample_zone):
+    """Precomputed zone/target keyword bitmasks should give the same fallback score"""
+    target_audience = ["young-professionals", "coffee"]
+
+    raw = recommendations_service._keyword_based_audience_match(
+        target_audience, sample_zone.audience_signals
+    )
+    masked = _masked_audience_match(
+        sample_zone.audience_keyword_mask,
+        audience_keyword_mask(frozenset(["young-professionals", "coffee"]))
+    )
+
+    assert raw == masked > 0.0
+
+
 # ============================================================================
 # Temporal Alignment Tests (30% of score)
 # ============================================================================
@@ -251,6 +274,53 @@ def test_temporal_alignment_no_timing_data(recommendations_service):
     assert score == 15.0, f"No timing data should score 15 points (neutral), got {score}"
 
 
+def test_zone_timing_windows_parsed_once(sample_zone):
+    """Zones keep their timing windows pre-parsed into day/hour bitmasks"""
+    assert sample_zone.parsed_timing_windows == parse_timing_windows(sample_zone.timing_windows)
+
+    # Monday-Friday bits, hours 17 and 18
+    assert sample_zone.parsed_timing_windows == [(0b0011111, (1 << 17) | (1 << 18))]
+
+
+def test_temporal_alignment_perfect_match_needs_a_single_window(recommendations_service):
+    """Day from one window and time from another is a day match, not a perfect match"""
+    timing_windows = {
+        "optimal": [
+            {"days": ["Thursday"], "times": ["08:00-10:00"]},
+            {"days": ["Saturday"], "times": ["17:00-19:00"]},
+        ]
+    }
+
+    # 2026-02-19 is a Thursday
+    split = recommendations_service._calculate_temporal_alignment(
+        "2026-02-19", "18:00", "workshop", timing_windows
+    )
+    perfect = recommendations_service._calculate_temporal_alignment(
+        "2026-02-19", "09:00", "workshop", timing_windows
+    )
+
+    assert split == 20.0
+    assert perfect == 30.0
+
+
+def test_vectorized_temporal_scores_match_scalar(recommendations_service):
+    """Coverage-grid scoring over ZoneArrays should equal the per-zone scores"""
+    zones = zones_service.load_static_zones()
+    arrays = zones_service.get_zone_arrays(zones)
+
+    for event_date, event_time in [
+        ("2026-02-20", "18:00"), ("2026-02-22", "09:00"), ("2026-02-20", "25:00"), ("bad", "18:00")
+    ]:
+        expected = [
+            recommendations_service._calculate_temporal_alignment(
+                event_date, event_time, "workshop", zone.timing_windows
+            )
+            for zone in zones
+        ]
+        scores = _temporal_scores(arrays, _parse_event_slot(event_date, event_time))
+        assert scores.tolist() == expected
+
+
 # ============================================================================
 # Distance Score Tests (20% of score)
 # ============================================================================
@@ -268,6 +338,133 @@ def test_distance_calculation_accuracy(recommendations_service):
     assert 0.5 < distance < 2.0, f"Distance should be ~1 mile, got {distance}"
 
 
+def test_vectorized_distances_match_scalar(recommendations_service, sample_zone):
+    """Vectorized distances should match the scalar Haversine per zone"""
+    far_zone = sample_zone.model_copy(update={"id": "far", "coordinates": {"lat": 38.95, "lon": -77.3}})
+    zones = [sample_zone, far_zone]
+
+    distances = recommendations_service._calculate_distances(38.8816, -77.0910, zones)
+
+    for zone, distance in zip(zones, distances):
+        expected = recommendations_service._calculate_distance(
+            38.8816, -77.0910, zone.coordinates["lat"], zone.coordinates["lon"]
+        )
+        assert distance == pytest.approx(expected)
+
+
+def test_distance_matrix_matches_per_event_distances(recommendations_service, sample_zone):
+    """Each row of the batch distance matrix should match single-event distances"""
+    far_zone = sample_zone.model_copy(update={"id": "far", "coordinates": {"lat": 38.95, "lon": -77.3}})
+    zones = [sample_zone, far_zone]
+    venues = [(38.8816, -77.0910), (38.8700, -77.1000)]
+
+    matrix = recommendations_service._calculate_distance_matrix(
+        [lat for lat, _ in venues], [lon for _, lon in venues], zones
+    )
+
+    assert matrix.shape == (2, 2)
+    for row, (lat, lon) in zip(matrix, venues):
+        assert row == pytest.approx(recommendations_service._calculate_distances(lat, lon, zones))
+
+
+def test_compiled_scores_match_scalar_helpers(recommendations_service, sample_zone):
+    """Compiled distance/dwell scoring should agree with the scalar helpers"""
+    far_zone = sample_zone.model_copy(
+        update={"id": "far", "coordinates": {"lat": 38.95, "lon": -77.3}, "dwell_time_seconds": 20}
+    )
+    zones = [sample_zone, far_zone]
+
+    distances, distance_scores, dwell_scores = recommendations_service._score_distances_and_dwell(
+        38.8816, -77.0910, zones
+    )
+
+    for zone, distance, distance_score, dwell_score in zip(
+        zones, distances, distance_scores, dwell_scores
+    ):
+        assert distance == pytest.approx(recommendations_service._calculate_distance(
+            38.8816, -77.0910, zone.coordinates["lat"], zone.coordinates["lon"]
+        ))
+        assert distance_score == recommendations_service._calculate_distance_score(distance)
+        assert dwell_score == recommendations_service._calculate_dwell_time_score(
+            zone.dwell_time_seconds
+        )
+
+
+def test_far_latitude_zone_skips_haversine_but_reports_distance(
+    recommendations_service, sample_event, sample_zone
+):
+    """Zones filtered out by latitude score the minimum and still show their real distance"""
+    # A foot traffic count keeps the ranking below on the usual hotspot path
+    near_zone = sample_zone.model_copy(update={"foot_traffic_daily": 800})
+    far_zone = near_zone.model_copy(
+        update={"id": "far-north", "coordinates": {"lat": 39.2, "lon": -77.0910}}
+    )
+    zones = [near_zone, far_zone]
+
+    component_scores = recommendations_service._score_distances_and_dwell(
+        sample_event.venue_lat, sample_event.venue_lon, zones
+    )
+    assert not np.isnan(component_scores[0][0])
+    assert np.isnan(component_scores[0][1])
+    assert component_scores[1][1] == recommendations_service._calculate_distance_score(100.0)
+
+    ranked = recommendations_service._rank_zones(
+        sample_event, zones, [(20.0, ""), (20.0, "")], *component_scores
+    )
+    far_score = next(sz for sz in ranked if sz.zone.id == "far-north")
+    assert far_score.distance_miles == round(recommendations_service._calculate_distance(
+        sample_event.venue_lat, sample_event.venue_lon, 39.2, -77.0910
+    ), 2)
+
+
+def test_top_k_indices_match_stable_sort_prefix():
+    """Partition-based top-k should equal the first k of a stable descending sort"""
+    scores = [30.5, 20.0, 30.5, 10.0, 20.0, 20.0, 45.1]
+    full = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+
+    for k in range(len(scores) + 2):
+        assert _top_k_indices(np.array(scores), k).tolist() == full[:k]
+
+
+def test_ranking_limit_is_prefix_of_full_ranking(recommendations_service, sample_event, sample_zone):
+    """Top-N ranking should match the first N of the full ranking, warnings included"""
+    zones = [
+        sample_zone.model_copy(update={"id": f"zone-{i}", "dwell_time_seconds": 10 + 15 * i})
+        for i in range(4)
+    ]
+    audience_matches = [(10.0 * i, "") for i in range(4)]
+    component_scores = recommendations_service._score_distances_and_dwell(
+        sample_event.venue_lat, sample_event.venue_lon, zones
+    )
+
+    full = recommendations_service._rank_zones(
+        sample_event, zones, audience_matches, *component_scores
+    )
+    top = recommendations_service._rank_zones(
+        sample_event, zones, audience_matches, *component_scores, limit=2
+    )
+
+    assert len(top) == 2
+    assert [(sz.zone.id, sz.total_score, sz.risk_warning) for sz in top] == [
+        (sz.zone.id, sz.total_score, sz.risk_warning) for sz in full[:2]
+    ]
+
+
+def test_deceptive_hotspot_without_foot_traffic_count(recommendations_service, sample_zone):
+    """Zones with no foot traffic count are still checked, just never 'high traffic'"""
+    assert sample_zone.foot_traffic_daily is None
+
+    warning = recommendations_service._detect_deceptive_hotspot(sample_zone, 10.0, 10, 5.0)
+
+    assert warning.is_flagged
+    assert "High traffic" not in warning.reason
+    assert warning.details["foot_traffic_daily"] is None
+
+    counted = sample_zone.model_copy(update={"foot_traffic_daily": 5000})
+    warning = recommendations_service._detect_deceptive_hotspot(counted, 10.0, 10, 5.0)
+    assert "High traffic (5000/day)" in warning.reason
+
+
 def test_distance_score_very_close(recommendations_service):
     """Very close zones (<1 mile) should score 20 points"""
     score = recommendations_service._calculate_distance_score(0.5)
@@ -477,3 +674,41 @@ def test_different_events_produce_different_rankings(recommendations_service):
         assert top_zone_1 != top_zone_2, (
             "Different events should rank zones differently"
         )
+
+
+@pytest.mark.asyncio
+async def test_score_zones_batch_matches_audiences_concurrently(recommendations_service, sample_event):
+    """Every event's audience matching is in flight at once; results keep event order"""
+    zones = zones_service.load_static_zones()
+    family_event = sample_event.model_copy(update={"target_audience": ["families"]})
+    in_flight = peak = 0
+
+    async def fake_match_audiences(event_data, zones):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        score = 40.0 if event_data is sample_event else 0.0
+        return [(score, "stub")] * len(zones)
+
+    with patch.object(recommendations_service.zones_service, "get_all_zones",
+                      new=AsyncMock(return_value=zones)), \
+            patch.object(recommendations_service, "_match_audiences", side_effect=fake_match_audiences):
+        results = await recommendations_service.score_zones_batch([sample_event, family_event])
+
+    assert peak == 2
+    assert [len(scored) for scored in results] == [len(zones), len(zones)]
+    assert {scored.audience_match_score for scored in results[0]} == {40.0}
+    assert {scored.audience_match_score for scored in results[1]} == {0.0}
+
+
+def test_first_json_value_ignores_fences_and_trailing_braces():
+    """Claude replies wrapped in code fences or followed by text still parse"""
+    from app.llm_json import first_json_value
+
+    reply = 'Sure:\n```json\n{"score": 32, "reasoning": "Tech {crowd}"}\n```\nHope this helps {:}'
+    assert first_json_value(reply) == {"score": 32, "reasoning": "Tech {crowd}"}
+    assert first_json_value('[{"index": 0}] ]', "[") == [{"index": 0}]
+    with pytest.raises(ValueError):
+        first_json_value("no json here")
@@ -2,7 +2,9 @@
 Tests for Supabase connection and PostGIS setup.
 """
 import pytest
-from app.supabase_client import get_supabase_client, verify_connection
+import threading
+from unittest.mock import MagicMock
+from app.supabase_client import get_supabase_client, verify_connection, execute_async
 import os
 
 
@@ -55,3 +57,16 @@ async def test_postgis_verification():
 
     if result["status"] == "connected":
         assert result.get("postgis_enabled") is True
+
+
+@pytest.mark.asyncio
+async def test_execute_async_runs_query_off_event_loop():
+    """Test that execute_async runs the blocking execute() in a worker thread."""
+    main_thread = threading.get_ident()
+    query = MagicMock()
+    query.execute.side_effect = lambda: threading.get_ident()
+
+    worker_thread = await execute_async(query)
+
+    query.execute.assert_called_once()
+    assert worker_thread != main_thread
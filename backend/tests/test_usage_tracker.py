@@ -0,0 +1,118 @@
+"""
+Tests for the usage tracking service
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.usage_tracker import UsageTracker
+
+
+class _FakeUsageLogs:
+    """Stand-in for execute_async against a stubbed usage_logs table"""
+
+    def __init__(self, stored_count: int = 0):
+        self.stored_count = stored_count
+        self.inserted = []
+        self.count_queries = 0
+
+    async def execute(self, query):
+        if query.kind == "insert":
+            self.inserted.extend(query.rows)
+            return SimpleNamespace(data=query.rows, count=None)
+        self.count_queries += 1
+        return SimpleNamespace(data=[], count=self.stored_count)
+
+
+def _fake_supabase() -> MagicMock:
+    """Supabase client whose usage_logs queries record what they'd run"""
+    table = MagicMock()
+    table.insert.side_effect = lambda rows: SimpleNamespace(kind="insert", rows=rows)
+    table.select.return_value.eq.return_value.eq.return_value.gte.return_value = (
+        SimpleNamespace(kind="count")
+    )
+    supabase = MagicMock()
+    supabase.table.return_value = table
+    return supabase
+
+
+@pytest.fixture
+def usage_logs():
+    """Stubbed usage_logs table with one event already stored"""
+    logs = _FakeUsageLogs(stored_count=1)
+    with patch("app.services.usage_tracker.execute_async", side_effect=logs.execute):
+        yield logs
+
+
+@pytest.fixture
+def tracker():
+    """UsageTracker backed by the stubbed Supabase client"""
+    with patch("app.services.usage_tracker.get_supabase_client", return_value=_fake_supabase()):
+        return UsageTracker()
+
+
+class TestDailyLimit:
+    """Daily limits must count events that are queued but not yet written"""
+
+    @pytest.mark.asyncio
+    async def test_limit_counts_queued_events(self, tracker, usage_logs):
+        """A fresh count includes this process's unflushed events"""
+        await tracker.log_usage("user_1", "analyze")
+        await tracker.log_usage("user_1", "analyze")
+
+        under_limit, usage_count = await tracker.check_daily_limit("user_1", "analyze", 3)
+
+        assert (under_limit, usage_count) == (False, 3)
+        assert usage_logs.inserted == []
+        await tracker.flush()
+
+    @pytest.mark.asyncio
+    async def test_cached_count_bumped_by_new_events(self, tracker, usage_logs):
+        """Events logged after a count is cached are added to it without a re-query"""
+        assert await tracker.check_daily_limit("user_1", "analyze", 3) == (True, 1)
+
+        await tracker.log_usage("user_1", "analyze")
+        await tracker.log_usage("user_1", "analyze")
+
+        assert await tracker.check_daily_limit("user_1", "analyze", 3) == (False, 3)
+        assert usage_logs.count_queries == 1
+        await tracker.flush()
+
+    @pytest.mark.asyncio
+    async def test_counts_are_per_user_and_operation(self, tracker, usage_logs):
+        """Queued events only count toward their own user and operation type"""
+        await tracker.log_usage("user_1", "analyze")
+        await tracker.log_usage("user_2", "analyze")
+        await tracker.log_usage("user_1", "save")
+
+        assert await tracker.check_daily_limit("user_1", "analyze", 3) == (True, 2)
+        await tracker.flush()
+
+
+class TestFlush:
+    """Shutdown flush writes every queued row"""
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_pending_rows(self, tracker, usage_logs):
+        """Queued rows are inserted and their pending counts released"""
+        await tracker.log_usage("user_1", "analyze", cost_estimate=0.02)
+        await tracker.log_usage("user_1", "recommend")
+        await tracker.log_usage("user_2", "analyze", metadata={"file_size": 1024})
+
+        await tracker.flush()
+
+        assert [(row["user_id"], row["operation_type"]) for row in usage_logs.inserted] == [
+            ("user_1", "analyze"), ("user_1", "recommend"), ("user_2", "analyze"),
+        ]
+        assert usage_logs.inserted[0]["cost_estimate"] == 0.02
+        assert usage_logs.inserted[2]["metadata"] == {"file_size": 1024}
+        assert tracker._pending_counts == {}
+
+    @pytest.mark.asyncio
+    async def test_flush_with_nothing_queued(self, tracker, usage_logs):
+        """Flushing an idle tracker writes nothing"""
+        await tracker.flush()
+
+        assert usage_logs.inserted == []
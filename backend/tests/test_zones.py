@@ -3,7 +3,7 @@ Tests for Zones Service and API - Story 4.1
 """
 
 import pytest
-from app.services.zones import zones_service, Zone
+from app.services.zones import zones_service, Zone, classify_zone_name
 
 
 class TestZonesService:
@@ -85,6 +85,21 @@ class TestZonesService:
         assert zone.id == "ballston-metro"
         assert "Ballston Metro" in zone.name
 
+    def test_get_zone_by_id_finds_dynamic_zones(self):
+        """Should index dynamic (database/API) zones by ID too"""
+        from app.services.zones import ZonesService
+
+        service = ZonesService()
+        static_zone = zones_service.get_zone_by_id("ballston-metro")
+        dynamic_zone = static_zone.model_copy(update={"id": "dynamic-only-zone"})
+        service._set_dynamic_zones([dynamic_zone])
+
+        assert service.get_zone_by_id("dynamic-only-zone") is dynamic_zone
+        assert service.get_zone_by_id("ballston-metro") is not None
+
+        service._set_dynamic_zones(None)
+        assert service.get_zone_by_id("dynamic-only-zone") is None
+
     def test_get_zone_by_id_not_found(self):
         """Should return None for non-existent zone"""
         zone = zones_service.get_zone_by_id("non-existent-zone")
@@ -111,6 +126,15 @@ class TestZonesService:
         assert "coordinates" in feature["geometry"]
         assert len(feature["geometry"]["coordinates"]) == 2  # [lon, lat]
 
+    def test_geojson_bytes_match_geojson(self):
+        """Pre-serialized GeoJSON body should decode to the served FeatureCollection"""
+        import json
+
+        body = zones_service.get_zones_geojson_bytes()
+
+        assert json.loads(body) == zones_service.get_zones_geojson()
+        assert zones_service.get_zones_geojson_bytes() is body
+
     def test_sample_zones_present(self):
         """Should include sample zones from acceptance criteria"""
         zones = zones_service.get_all_zones()
@@ -152,3 +176,210 @@ class TestZonesService:
             # Dwell time should be between 10 seconds and 2 minutes
             assert 10 <= zone.dwell_time_seconds <= 120, \
                 f"Zone {zone.id} has unreasonable dwell time: {zone.dwell_time_seconds}"
+
+    def test_current_etag_stable_for_same_data(self):
+        """Should return the same quoted ETag while the data is unchanged"""
+        geojson = zones_service.get_zones_geojson()
+
+        etag = zones_service.current_etag("geojson", geojson)
+        assert etag.startswith('"') and etag.endswith('"')
+        assert zones_service.current_etag("geojson", geojson) == etag
+
+    def test_current_etag_changes_with_data(self):
+        """Should recompute the ETag when the served data changes"""
+        zone = zones_service.get_zone_by_id("ballston-metro")
+        changed = zone.model_copy(update={"dwell_time_seconds": zone.dwell_time_seconds + 1})
+
+        assert zones_service.current_etag("test", zone) != zones_service.current_etag("test", changed)
+
+    def test_zone_responses_revalidate_with_etag(self):
+        """Clients must revalidate cached zones (refresh/clear can change them any time)"""
+        from fastapi import Response
+        from app.routes.zones import _apply_cache_headers
+
+        response = Response()
+        assert _apply_cache_headers(response, '"abc"', None) is None
+        assert response.headers["ETag"] == '"abc"'
+        assert "no-cache" in response.headers["Cache-Control"]
+        assert "max-age" not in response.headers["Cache-Control"]
+
+        not_modified = _apply_cache_headers(Response(), '"abc"', 'W/"abc"')
+        assert not_modified.status_code == 304
+        assert not_modified.headers["Cache-Control"] == response.headers["Cache-Control"]
+
+    def test_zone_classification_from_name(self):
+        """Zone type and Metro line info are derived from the zone name"""
+        assert classify_zone_name("Ballston Metro - Orange Line") == (
+            "transit", "Orange Line, high confidence"
+        )
+        assert classify_zone_name("Clarendon Coffee Row") == ("transit", None)
+        assert classify_zone_name("Wilson Blvd Cafe") == ("restaurant", None)
+        assert classify_zone_name("Pentagon City Shops") == ("retail", None)
+        assert classify_zone_name("Quiet Street") == ("other", None)
+
+        zone = zones_service.get_zone_by_id("ballston-metro")
+        assert (zone.zone_type, zone.metro_line_info) == classify_zone_name(zone.name)
+
+    @pytest.mark.parametrize("window", [
+        {"days": ["Funday"], "times": ["17:00-19:00"]},
+        {"days": ["Monday"], "times": ["5pm-7pm"]},
+        {"days": ["Monday"], "times": ["17:00-25:00"]},
+    ])
+    def test_malformed_timing_windows_rejected_at_load(self, window):
+        """Bad timing config fails when the zone is built, not during scoring"""
+        zone = zones_service.get_zone_by_id("ballston-metro")
+        data = zone.model_dump()
+        data["timing_windows"] = {"optimal": [window]}
+
+        with pytest.raises(ValueError):
+            Zone(**data)
+
+
+class TestZonesSpatialQueries:
+    """Test nearest-zone and radius queries"""
+
+    VENUE = (38.8816, -77.0910)  # Arlington, VA center
+
+    def test_zones_near_sorted_and_limited(self):
+        """Should return the k nearest zones, nearest first"""
+        zones = zones_service.load_static_zones()
+        everything = zones_service.get_zones_near(zones, *self.VENUE, len(zones))
+        nearest = zones_service.get_zones_near(zones, *self.VENUE, 3)
+
+        distances = [distance for _, distance in everything]
+        assert distances == sorted(distances)
+        assert len(everything) == len(zones)
+        assert nearest == everything[:3]
+
+    @pytest.mark.parametrize("radius_miles", [0.5, 1.0, 2.5, 100.0])
+    def test_radius_query_matches_full_scan(self, radius_miles):
+        """Latitude-band radius search should match filtering every zone"""
+        zones = zones_service.load_static_zones()
+        everything = zones_service.get_zones_near(zones, *self.VENUE, len(zones))
+
+        within = zones_service.get_zones_within_radius(zones, *self.VENUE, radius_miles)
+
+        assert within == [(zone, d) for zone, d in everything if d <= radius_miles]
+
+
+class TestZonesAsyncLoad:
+    """Test the async static-zone loader"""
+
+    @pytest.mark.asyncio
+    async def test_async_load_returns_cached_zones(self):
+        """Async loader should return the same list the sync accessor caches"""
+        zones = await zones_service.load_static_zones_async()
+
+        assert zones is zones_service.load_static_zones()
+        assert len(zones) > 0
+
+    @pytest.mark.asyncio
+    async def test_async_geojson_matches_sync(self):
+        """Async GeoJSON load should return the same FeatureCollection as the sync one"""
+        from app.services.zones import ZonesService
+
+        service = ZonesService()
+        geojson = await service.get_zones_geojson_async()
+
+        assert geojson["type"] == "FeatureCollection"
+        assert geojson == zones_service.get_zones_geojson()
+        assert await service.get_zones_geojson_async() is geojson
+
+
+class TestZonesRefreshSingleFlight:
+    """Test that concurrent callers share one dynamic-zone refresh"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_refresh(self):
+        """Only one database/API load runs for a burst of get_all_zones calls"""
+        import asyncio
+        from unittest.mock import AsyncMock, patch
+        from app.services.zones import ZonesService
+
+        service = ZonesService()
+        zones = zones_service.load_static_zones()
+
+        async def slow_generate(limit):
+            await asyncio.sleep(0.05)
+            return [zone.model_dump() for zone in zones]
+
+        generate = AsyncMock(side_effect=slow_generate)
+        with patch.object(service, "_load_zones_from_database", new=AsyncMock(return_value=False)) as load_db, \
+                patch.object(service, "_save_zones_to_database", new=AsyncMock(return_value=True)), \
+                patch("app.services.data_ingestion.data_ingestion_service.generate_zones_from_parking_data", new=generate):
+            results = await asyncio.gather(*(service.get_all_zones() for _ in range(10)))
+
+        assert load_db.await_count == 1
+        assert generate.await_count == 1
+        assert all(result is results[0] for result in results)
+        assert len(results[0]) == len(zones)
+
+    @pytest.mark.asyncio
+    async def test_expired_cache_uses_zones_refreshed_by_another_worker(self):
+        """Fresh database rows replace an expired in-memory cache without API calls"""
+        from datetime import datetime, timedelta
+        from unittest.mock import AsyncMock, patch
+        from app.services.zones import ZonesService
+
+        service = ZonesService()
+        zones = zones_service.load_static_zones()
+        service._set_dynamic_zones(zones)
+        service._last_refresh = datetime.now() - timedelta(days=30)
+
+        async def load_fresh_rows():
+            service._set_dynamic_zones(zones[:1])
+            service._last_refresh = datetime.now()
+            return True
+
+        generate = AsyncMock()
+        with patch.object(service, "_load_zones_from_database", new=AsyncMock(side_effect=load_fresh_rows)), \
+                patch("app.services.data_ingestion.data_ingestion_service.generate_zones_from_parking_data", new=generate):
+            result = await service.get_all_zones()
+
+        generate.assert_not_awaited()
+        assert [zone.id for zone in result] == [zones[0].id]
+
+
+class TestTrustedZoneConstruction:
+    """Test building zones from trusted rows without field validation"""
+
+    def test_constructed_zone_matches_validated_zone(self):
+        """Constructed zones should equal validated ones and keep derived data"""
+        from app.services.zones import _construct_zones
+
+        zone = zones_service.get_zone_by_id("ballston-metro")
+        row = {**zone.model_dump(), "generator_only_key": "ignored"}
+
+        constructed = _construct_zones([row])[0]
+
+        assert constructed.model_dump() == zone.model_dump()
+        assert constructed.timing_coverage == zone.timing_coverage
+        assert constructed.audience_keyword_mask == zone.audience_keyword_mask
+
+    def test_constructed_zone_still_rejects_bad_timing(self):
+        """Timing windows are still checked when validation is skipped"""
+        from app.services.zones import _construct_zones
+
+        row = zones_service.get_zone_by_id("ballston-metro").model_dump()
+        row["timing_windows"] = {"optimal": [{"days": ["Funday"], "times": ["17:00-19:00"]}]}
+
+        with pytest.raises(ValueError):
+            _construct_zones([row])
+
+
+class TestZonesGeoJSONStream:
+    """Test the streaming GeoJSON serializer"""
+
+    @pytest.mark.asyncio
+    async def test_stream_matches_geojson(self):
+        """Streamed chunks should join into the same FeatureCollection"""
+        import json
+        from app.routes.zones import _iter_geojson_features
+
+        geojson = zones_service.get_zones_geojson()
+        chunks = [chunk async for chunk in _iter_geojson_features(geojson)]
+
+        assert len(chunks) == len(geojson["features"]) + 2
+        streamed = json.loads(b"".join(chunks))
+        assert streamed["type"] == "FeatureCollection"
+        assert streamed["features"] == geojson["features"]